@@ -0,0 +1,142 @@
+"""
+Control de admisión y descarte de carga
+Limita las consultas en curso por worker; el exceso espera poco en una
+cola acotada o se rechaza de inmediato con 503 y Retry-After
+"""
+
+import asyncio
+import math
+import time
+from typing import Dict, Optional
+
+from config import ADMISION_MAX_EN_CURSO, ADMISION_MAX_ESPERA, ADMISION_ESPERA_SEGUNDOS
+
+
+class Rechazado(Exception):
+    """El request no se admite; retry_after en segundos"""
+
+    def __init__(self, motivo: str, retry_after: int):
+        super().__init__(motivo)
+        self.retry_after = retry_after
+
+
+class ControlAdmision:
+    """
+    Semáforo de consultas en curso con cola de espera acotada
+
+    - Hasta max_en_curso requests se atienden a la vez
+    - Hasta max_espera más esperan turno, cada uno como máximo
+      espera_segundos; si la cola está llena se rechaza sin esperar
+    - Retry-After se estima con el throughput actual: duración media
+      (EWMA) de los requests atendidos y cupos disponibles
+    """
+
+    # Peso de la última muestra en el promedio móvil de duración
+    ALFA = 0.2
+
+    def __init__(self, max_en_curso: int, max_espera: int, espera_segundos: float):
+        self.max_en_curso = max_en_curso
+        self.max_espera = max_espera
+        self.espera_segundos = espera_segundos
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self.en_curso = 0
+        self.en_espera = 0
+        self.admitidos = 0
+        self.rechazados = 0
+        self._duracion_media: Optional[float] = None
+
+    @property
+    def semaforo(self) -> asyncio.Semaphore:
+        # Se crea en el primer uso, dentro del event loop del worker
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.max_en_curso)
+        return self._semaforo
+
+    def throughput(self) -> Optional[float]:
+        """Requests por segundo que el worker completa a plena carga"""
+        if not self._duracion_media:
+            return None
+        return self.max_en_curso / self._duracion_media
+
+    def retry_after(self) -> int:
+        """Segundos estimados hasta que se desocupe la cola actual"""
+        throughput = self.throughput()
+        if throughput is None:
+            return 1
+        return max(1, min(60, math.ceil((self.en_espera + 1) / throughput)))
+
+    def _rechazar(self, motivo: str):
+        self.rechazados += 1
+        raise Rechazado(motivo, self.retry_after())
+
+    async def entrar(self) -> float:
+        """
+        Espera un cupo (o rechaza)
+
+        Returns:
+            Instante de admisión, para pasarlo a salir()
+
+        Raises:
+            Rechazado: Cola llena o espera agotada
+        """
+        semaforo = self.semaforo
+        if semaforo.locked():
+            if self.en_espera >= self.max_espera:
+                self._rechazar("Cola de espera llena")
+
+            self.en_espera += 1
+            try:
+                await asyncio.wait_for(semaforo.acquire(), self.espera_segundos)
+            except asyncio.TimeoutError:
+                self._rechazar("Tiempo de espera agotado")
+            finally:
+                self.en_espera -= 1
+        else:
+            await semaforo.acquire()
+
+        self.en_curso += 1
+        self.admitidos += 1
+        return time.perf_counter()
+
+    def salir(self, admitido_en: float):
+        """Libera el cupo y actualiza la duración media"""
+        duracion = time.perf_counter() - admitido_en
+        if self._duracion_media is None:
+            self._duracion_media = duracion
+        else:
+            self._duracion_media += self.ALFA * (duracion - self._duracion_media)
+
+        self.en_curso -= 1
+        self.semaforo.release()
+
+    def estadisticas(self) -> Dict:
+        throughput = self.throughput()
+        return {
+            'en_curso': self.en_curso,
+            'en_espera': self.en_espera,
+            'max_en_curso': self.max_en_curso,
+            'max_espera': self.max_espera,
+            'admitidos': self.admitidos,
+            'rechazados': self.rechazados,
+            'duracion_media_ms': round(self._duracion_media * 1000, 1) if self._duracion_media else None,
+            'throughput_rps': round(throughput, 1) if throughput else None
+        }
+
+
+# Rutas que nunca se limitan (salud, estado y administración)
+RUTAS_EXENTAS = ('/health', '/api/estado', '/api/fuentes', '/api/admin', '/docs', '/openapi.json')
+
+
+def exenta(ruta: str) -> bool:
+    return ruta == '/' or ruta.startswith(RUTAS_EXENTAS)
+
+
+_control: Optional[ControlAdmision] = None
+
+
+def obtener_control() -> ControlAdmision:
+    """Control de admisión del worker"""
+    global _control
+    if _control is None:
+        _control = ControlAdmision(ADMISION_MAX_EN_CURSO, ADMISION_MAX_ESPERA, ADMISION_ESPERA_SEGUNDOS)
+    return _control
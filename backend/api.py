@@ -3,15 +3,41 @@ API REST para Sistema de Autodiagnóstico Tributario
 Versión 2.0 - Con arquitectura de services
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, validator
+# Primero: marca el inicio del reporte de arranque
+import arranque
+
+import asyncio
+import hmac
+import json
+import os
+from contextlib import aclosing
 from datetime import datetime
-from typing import Optional
+from typing import Callable, List, Optional
+
+with arranque.etapa('fastapi'):
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+    from pydantic import BaseModel, ValidationError, validator
 
 # Importar services
-from services.verificacion_service import VerificacionService
-from services.compliance_service import ComplianceService
+with arranque.etapa('services'):
+    from services.verificacion_service import VerificacionService
+    from services.snapshot_service import SnapshotService
+    from services.analitica_service import AnaliticaService
+    from services.calentador_service import iniciar_calentador, detener_calentador, obtener_calentador
+    from config import SNAPSHOTS_HABILITADOS, ADMIN_TOKEN, DIAN_HABILITADO, LOTE_MAX_NITS, CALENTADOR_HABILITADO
+    from pool_parseo import cerrar_pool_parseo
+    from nit import normalizar_nit
+    from cache.fabrica import estadisticas as estadisticas_cache, cerrar_caches
+    import trazas
+    from trazas import Traza, span, usar_traza
+    import perfilador
+    import admision
+    import popularidad
+    from integrations.resiliencia import obtener_presupuesto
+    from integrations.ica import pools as pools_ica
+    from integrations.dian_integration import obtener_pool_sesiones, cerrar_pool_sesiones
 
 # Crear aplicación
 app = FastAPI(
@@ -20,34 +46,227 @@ app = FastAPI(
     description="Sistema de verificación de cumplimiento tributario para empresas colombianas"
 )
 
+logger = trazas.obtener_logger('api')
+
+
+@app.middleware("http")
+async def trazar_request(request: Request, call_next):
+    """
+    Abre una traza por request (respeta un X-Trace-Id entrante),
+    la devuelve en la cabecera X-Trace-Id y la exporta cuando termina de
+    enviarse el cuerpo (en un stream SSE, al cerrarse el stream)
+    
+    Las rutas de salud, estado y administración no se exportan
+    
+    Si hay un perfil por fracción de requests en curso, decide si este
+    request se perfila (sin perfil activo solo se lee una variable)
+    """
+    traza = Traza(request.headers.get('x-trace-id'), f"{request.method} {request.url.path}")
+    muestreador = perfilador.activo
+    with usar_traza(traza):
+        if muestreador is None:
+            respuesta = await call_next(request)
+        else:
+            with muestreador.request():
+                respuesta = await call_next(request)
+    respuesta.headers['X-Trace-Id'] = traza.trace_id
+    if not admision.exenta(request.url.path):
+        respuesta.body_iterator = _CuerpoConCierre(respuesta.body_iterator, lambda: trazas.exportar(traza))
+    return respuesta
+
+
+class _CuerpoConCierre:
+    """
+    Cuerpo de una respuesta que llama a al_cerrar una sola vez: al agotarse
+    o fallar, al cerrarse o, si se descarta sin empezar a enviarlo (el
+    cliente se fue antes), al recolectarse
+
+    Un generador con finally no alcanza: si nunca arrancó, cerrarlo no
+    ejecuta su finally
+    """
+
+    def __init__(self, cuerpo, al_cerrar: Callable[[], None]):
+        self._cuerpo = cuerpo
+        self._al_cerrar = al_cerrar
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._cuerpo.__anext__()
+        except BaseException:
+            self._cerrar()
+            raise
+
+    async def aclose(self):
+        try:
+            if hasattr(self._cuerpo, 'aclose'):
+                await self._cuerpo.aclose()
+        finally:
+            self._cerrar()
+
+    def _cerrar(self):
+        al_cerrar, self._al_cerrar = self._al_cerrar, None
+        if al_cerrar is not None:
+            al_cerrar()
+
+    def __del__(self):
+        self._cerrar()
+
+
+@app.middleware("http")
+async def registrar_primera_respuesta(request: Request, call_next):
+    """Registra el tiempo hasta la primera respuesta del proceso"""
+    respuesta = await call_next(request)
+    arranque.marcar_respuesta()
+    return respuesta
+
+
+@app.middleware("http")
+async def controlar_admision(request: Request, call_next):
+    """
+    Control de admisión (el middleware más externo después de CORS:
+    rechaza antes de trazar o trabajar)
+    Salud, estado y administración quedan exentos para seguir observables
+    """
+    if admision.exenta(request.url.path):
+        return await call_next(request)
+    
+    control = admision.obtener_control()
+    try:
+        admitido_en = await control.entrar()
+    except admision.Rechazado as e:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": f"Servicio saturado: {e}"},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    try:
+        respuesta = await call_next(request)
+    except BaseException:
+        control.salir(admitido_en)
+        raise
+    
+    # En respuestas por stream el cupo se libera al terminar el cuerpo
+    # (o al descartarlo si el cliente se desconecta antes de empezar)
+    respuesta.body_iterator = _CuerpoConCierre(respuesta.body_iterator, lambda: control.salir(admitido_en))
+    return respuesta
+
+
 # Configurar CORS
+# Se agrega después de los middlewares de arriba para quedar como la capa
+# más externa: también los 503 del control de admisión llevan las
+# cabeceras CORS y el frontend puede leer su Retry-After
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # En producción, especificar dominios
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
+
+@app.on_event("startup")
+async def configurar_logs():
+    """Logs y exportador de trazas del worker (hilo y archivo)"""
+    trazas.configurar()
+
+
+@app.on_event("startup")
+async def reportar_arranque():
+    """Imprime el reporte de arranque"""
+    arranque.marcar_listo()
+    reporte = arranque.reporte()
+    logger.info("Arranque en %s ms: %s", reporte['listo_ms'], reporte['etapas_ms'])
+
+
+@app.on_event("startup")
+async def recalcular_snapshots():
+    """
+    Recalcula snapshots en segundo plano si cambiaron pesos o datos
+    No bloquea el arranque: mientras tanto se calcula en vivo
+    """
+    if SNAPSHOTS_HABILITADOS:
+        loop = asyncio.get_running_loop()
+        loop.run_in_executor(None, SnapshotService().recalcular_si_cambio)
+
+
+@app.on_event("startup")
+async def calentar_sesiones_dian():
+    """Negocia en segundo plano las sesiones del RUT antes de la primera consulta"""
+    if DIAN_HABILITADO:
+        loop = asyncio.get_running_loop()
+        loop.run_in_executor(None, lambda: obtener_pool_sesiones().calentar(loop=loop))
+
+
+@app.on_event("startup")
+async def arrancar_calentador():
+    """Mantiene calientes en cache las empresas más consultadas"""
+    if CALENTADOR_HABILITADO:
+        iniciar_calentador()
+
+
+@app.on_event("shutdown")
+async def cerrar_pools():
+    """Libera los pools de parseo, DIAN e ICA, escribe lo pendiente del cache en disco y los logs"""
+    detener_calentador()
+    cerrar_pool_parseo()
+    cerrar_pool_sesiones()
+    pools_ica.cerrar_pools()
+    cerrar_caches()
+    trazas.detener()
+
+
 # Modelos Pydantic para la API
 class ConsultaNIT(BaseModel):
     """Modelo para consulta de NIT"""
     nit: str
+    plazo_segundos: Optional[float] = None  # por defecto PLAZO_CONSULTA_SEGUNDOS
     
     @validator('nit')
     def validar_nit(cls, v):
-        # Limpiar formato
-        nit_limpio = v.replace('-', '').replace('.', '').replace(' ', '')
-        
-        # Validar que solo contenga dígitos
-        if not nit_limpio.isdigit():
-            raise ValueError('El NIT debe contener solo números')
-        
-        # Validar longitud
-        if len(nit_limpio) != 9:
-            raise ValueError('El NIT debe tener 9 dígitos')
-        
-        return nit_limpio
+        # Limpiar formato, validar longitud y DV (si viene como NIT-DV)
+        # Un DV incorrecto se rechaza aquí, antes de consultar fuentes
+        with span('validacion'):
+            return normalizar_nit(v)
+    
+    @validator('plazo_segundos')
+    def validar_plazo(cls, v):
+        if v is not None and not 0 < v <= 120:
+            raise ValueError('El plazo debe estar entre 0 y 120 segundos')
+        return v
+
+
+class PortafolioNITs(BaseModel):
+    """Lista de NITs de un cliente para filtrar la analítica"""
+    nits: List[str]
+    
+    @validator('nits')
+    def validar_nits(cls, v):
+        if len(v) > 100000:
+            raise ValueError('Máximo 100000 NITs por consulta')
+        return v
+
+
+class ConsultaLote(BaseModel):
+    """Varios NITs verificados con una consulta por lote a cada fuente"""
+    nits: List[str]
+    plazo_segundos: Optional[float] = None  # por defecto PLAZO_LOTE_SEGUNDOS
+    
+    @validator('nits')
+    def validar_nits(cls, v):
+        if not 0 < len(v) <= LOTE_MAX_NITS:
+            raise ValueError(f'Entre 1 y {LOTE_MAX_NITS} NITs por lote')
+        return v
+    
+    @validator('plazo_segundos')
+    def validar_plazo(cls, v):
+        if v is not None and not 0 < v <= 600:
+            raise ValueError('El plazo debe estar entre 0 y 600 segundos')
+        return v
 
 
 class ResultadoConsulta(BaseModel):
@@ -57,6 +276,14 @@ class ResultadoConsulta(BaseModel):
     datos_empresa: dict
     mapa_cumplimiento: dict
     fecha_consulta: str
+    fuentes_omitidas: List[str] = []  # sin respuesta dentro del plazo
+
+
+class ResultadoLote(BaseModel):
+    """Resultados de una consulta por lote"""
+    resultados: List[ResultadoConsulta]
+    no_encontrados: List[str]
+    invalidos: int
 
 
 # Endpoints
@@ -69,10 +296,14 @@ async def root():
         "version": "2.0.0",
         "endpoints": {
             "consultar": "/api/consultar (POST)",
+            "consultar_stream": "/api/consultar/stream/{nit} (GET, SSE)",
             "health": "/health (GET)",
             "docs": "/docs",
             "test": "/api/test/{nit} (GET)",
-            "fuentes": "/api/fuentes (GET)"
+            "fuentes": "/api/fuentes (GET)",
+            "arranque": "/api/estado/arranque (GET)",
+            "cache": "/api/estado/cache (GET)",
+            "admision": "/api/estado/admision (GET)"
         }
     }
 
@@ -98,10 +329,142 @@ async def estado_fuentes():
     
     return {
         "fuentes": fuentes,
+        "presupuesto_reintentos": obtener_presupuesto().estadisticas(),
+        "sesiones_dian": obtener_pool_sesiones().estadisticas() if DIAN_HABILITADO else None,
+        "pools_ica": pools_ica.estadisticas(),
         "timestamp": datetime.now().isoformat()
     }
 
 
+@app.get("/api/estado/arranque")
+async def estado_arranque():
+    """
+    Reporte de arranque del worker
+    Tiempos de importación por etapa y hasta la primera respuesta
+    """
+    return arranque.reporte()
+
+
+@app.get("/api/estado/cache")
+async def estado_cache():
+    """
+    Estadísticas de los backends de cache en este worker
+    """
+    return estadisticas_cache()
+
+
+@app.get("/api/estado/admision")
+async def estado_admision():
+    """
+    Consultas en curso, cola de espera y rechazos en este worker
+    """
+    return admision.obtener_control().estadisticas()
+
+
+def verificar_admin(request: Request):
+    """
+    Exige la cabecera X-Admin-Token
+    Sin ADMIN_TOKEN configurado los endpoints de administración no existen
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    token = request.headers.get('x-admin-token', '')
+    if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Token de administración inválido")
+
+
+@app.get("/api/admin/populares")
+async def nits_populares(request: Request, k: int = 20):
+    """
+    NITs más consultados en este worker (solo administración)
+    Frecuencias estimadas con decaimiento y si están en cache
+    """
+    verificar_admin(request)
+    
+    if not 1 <= k <= 1000:
+        raise HTTPException(status_code=422, detail="k debe estar entre 1 y 1000")
+    
+    top = popularidad.obtener_sketch().top(k)
+    en_cache = await VerificacionService().cache.obtener_varios_async([nit for nit, _ in top])
+    return {
+        "populares": [
+            {"nit": nit, "frecuencia": frecuencia, "en_cache": en_cache[nit] is not None}
+            for nit, frecuencia in top
+        ],
+        "sketch": popularidad.obtener_sketch().estadisticas(),
+        "calentador": obtener_calentador().estadisticas(),
+        "worker_pid": os.getpid()
+    }
+
+
+@app.get("/api/admin/perfil", response_class=PlainTextResponse)
+async def perfil_cpu(
+    request: Request,
+    segundos: float = 10,
+    intervalo_ms: float = 5,
+    fraccion: float = 1.0
+):
+    """
+    Perfil de CPU del event loop de este worker por muestreo (solo administración)
+    
+    Muestrea la pila del event loop durante `segundos` (sin las muestras
+    en que espera eventos) y retorna pilas colapsadas
+    (una línea 'raíz;...;hoja N', para flamegraph.pl o speedscope).
+    Con fraccion < 1 solo se muestrea mientras haya en curso alguno de
+    los requests elegidos con esa probabilidad.
+    """
+    verificar_admin(request)
+    
+    if not 0 < segundos <= 60:
+        raise HTTPException(status_code=422, detail="segundos debe estar entre 0 y 60")
+    if not 1 <= intervalo_ms <= 1000:
+        raise HTTPException(status_code=422, detail="intervalo_ms debe estar entre 1 y 1000")
+    if not 0 < fraccion <= 1:
+        raise HTTPException(status_code=422, detail="fraccion debe estar entre 0 y 1")
+    
+    try:
+        muestreador = await perfilador.perfilar(segundos, intervalo_ms / 1000, fraccion)
+    except perfilador.PerfilEnCurso as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    return PlainTextResponse(
+        muestreador.colapsado(),
+        headers={
+            'X-Worker-Pid': str(os.getpid()),
+            'X-Muestras': str(muestreador.muestras),
+            'X-Muestras-Inactivas': str(muestreador.inactivas)
+        }
+    )
+
+
+def armar_resultado(nit: str, empresa) -> ResultadoConsulta:
+    """
+    Calcula score y mapa de cumplimiento y arma la respuesta
+    (snapshot precalculado si está vigente, cálculo en vivo si no)
+    """
+    snapshot_service = SnapshotService()
+    score, mapa = snapshot_service.obtener_o_calcular(empresa)
+    
+    # Agregar score a empresa
+    empresa.score_compliance = score
+    
+    with span('serializacion'):
+        return ResultadoConsulta(
+            success=True,
+            nit=nit,
+            datos_empresa=empresa.a_dict_simple(),
+            mapa_cumplimiento=mapa,
+            fecha_consulta=datetime.now().isoformat(),
+            fuentes_omitidas=empresa.metadata.fuentes_omitidas
+        )
+
+
+def evento_sse(evento: str, datos: dict) -> str:
+    """Formatea un evento Server-Sent Events"""
+    return f"event: {evento}\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n"
+
+
 @app.post("/api/consultar", response_model=ResultadoConsulta)
 async def consultar_empresa(consulta: ConsultaNIT):
     """
@@ -111,7 +474,9 @@ async def consultar_empresa(consulta: ConsultaNIT):
     try:
         # 1. Verificar empresa (orquesta múltiples fuentes)
         verificacion_service = VerificacionService()
-        empresa = await verificacion_service.verificar_empresa(consulta.nit)
+        empresa = await verificacion_service.verificar_empresa(
+            consulta.nit, consulta.plazo_segundos
+        )
         
         if not empresa:
             raise HTTPException(
@@ -119,26 +484,8 @@ async def consultar_empresa(consulta: ConsultaNIT):
                 detail=f"No se encontró información para el NIT {consulta.nit}"
             )
         
-        # 2. Calcular score de compliance
-        compliance_service = ComplianceService()
-        score = compliance_service.calcular_score(empresa)
-        
-        # Agregar score a empresa
-        empresa.score_compliance = score
-        
-        # 3. Generar mapa de cumplimiento
-        mapa = compliance_service.generar_mapa_cumplimiento(empresa, score)
-        
-        # 4. Convertir a formato compatible con frontend actual
-        datos_empresa = empresa.a_dict_simple()
-        
-        return ResultadoConsulta(
-            success=True,
-            nit=consulta.nit,
-            datos_empresa=datos_empresa,
-            mapa_cumplimiento=mapa,
-            fecha_consulta=datetime.now().isoformat()
-        )
+        # 2. Score, mapa y formato compatible con frontend actual (SQLite: fuera del event loop)
+        return await asyncio.to_thread(armar_resultado, consulta.nit, empresa)
         
     except HTTPException:
         raise
@@ -149,13 +496,147 @@ async def consultar_empresa(consulta: ConsultaNIT):
         )
 
 
+@app.post("/api/consultar/lote", response_model=ResultadoLote)
+async def consultar_lote(consulta: ConsultaLote):
+    """
+    Consulta varias empresas a la vez
+    Cada fuente recibe el lote completo (una consulta por bloque de NITs
+    en las que lo soportan) en lugar de una consulta por NIT
+    """
+    nits, invalidos = [], 0
+    for nit in consulta.nits:
+        try:
+            nits.append(normalizar_nit(nit))
+        except ValueError:
+            invalidos += 1
+    
+    try:
+        empresas = await VerificacionService().verificar_lote(nits, consulta.plazo_segundos)
+        encontradas = {nit: empresa for nit, empresa in empresas.items() if empresa}
+        resultados = await asyncio.to_thread(
+            lambda: [armar_resultado(nit, empresa) for nit, empresa in encontradas.items()]
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+    
+    return ResultadoLote(
+        resultados=resultados,
+        no_encontrados=[nit for nit, empresa in empresas.items() if not empresa],
+        invalidos=invalidos
+    )
+
+
+@app.get("/api/consultar/stream/{nit}")
+async def consultar_empresa_stream(nit: str, plazo: Optional[float] = None):
+    """
+    Consulta progresiva por Server-Sent Events
+    
+    Eventos:
+        empresa: datos principales (apenas están disponibles)
+        fuente: una por fuente complementaria al terminar
+        omitida: una por fuente que no respondió dentro del plazo
+        resultado: respuesta completa con score y mapa de cumplimiento
+        fallo: error con status y detalle (el stream termina)
+    """
+    try:
+        consulta = ConsultaNIT(nit=nit, plazo_segundos=plazo)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors()[0]['msg'])
+    
+    async def eventos():
+        try:
+            verificacion_service = VerificacionService()
+            empresa = None
+            
+            # aclosing: si el cliente se desconecta, cerrar la verificación
+            # cancela las consultas a fuentes complementarias en curso
+            async with aclosing(verificacion_service.verificar_empresa_progresivo(
+                consulta.nit, consulta.plazo_segundos
+            )) as progreso:
+                async for evento, datos in progreso:
+                    if evento == 'empresa':
+                        empresa = datos
+                        yield evento_sse('empresa', empresa.a_dict_simple())
+                    elif evento == 'fuente':
+                        nombre, datos_fuente = datos
+                        yield evento_sse('fuente', {'fuente': nombre, 'datos': datos_fuente})
+                    elif evento == 'omitida':
+                        yield evento_sse('omitida', {'fuente': datos})
+            
+            if not empresa:
+                yield evento_sse('fallo', {
+                    'status': 404,
+                    'detail': f"No se encontró información para el NIT {consulta.nit}"
+                })
+                return
+            
+            resultado = await asyncio.to_thread(armar_resultado, consulta.nit, empresa)
+            yield evento_sse('resultado', resultado.dict())
+        
+        except Exception as e:
+            yield evento_sse('fallo', {
+                'status': 500,
+                'detail': f"Error interno del servidor: {str(e)}"
+            })
+    
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/analitica/{dimension}")
+async def analitica(dimension: str, valor: Optional[str] = None):
+    """
+    Agregados del portafolio completo por departamento, municipio,
+    codigo_ciiu, tamano o nivel: empresas, score promedio, distribución
+    de score, proporción por nivel y prevalencia de señales
+    
+    Se leen de los agregados mantenidos al guardar cada snapshot
+    """
+    try:
+        return await asyncio.to_thread(lambda: AnaliticaService().agrupar(dimension, valor))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@app.post("/api/analitica/{dimension}")
+async def analitica_portafolio(dimension: str, portafolio: PortafolioNITs, valor: Optional[str] = None):
+    """
+    Los mismos agregados restringidos a la lista de NITs de un cliente
+    Los NITs inválidos o sin snapshot se cuentan en no_encontrados
+    """
+    nits, invalidos = set(), 0
+    for nit in portafolio.nits:
+        try:
+            nits.add(normalizar_nit(nit))
+        except ValueError:
+            invalidos += 1
+    
+    try:
+        resultado = await asyncio.to_thread(lambda: AnaliticaService().agrupar(dimension, valor, nits))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    encontrados = resultado['total']['empresas'] if resultado['total'] else 0
+    resultado['no_encontrados'] = invalidos + len(nits) - encontrados
+    return resultado
+
+
 @app.get("/api/test/{nit}")
 async def test_consulta(nit: str):
     """
     Endpoint de prueba rápida
     Permite probar desde el navegador
     """
-    consulta = ConsultaNIT(nit=nit)
+    try:
+        consulta = ConsultaNIT(nit=nit)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors()[0]['msg'])
     return await consultar_empresa(consulta)
 
 
@@ -0,0 +1,63 @@
+"""
+Reporte de arranque
+Mide tiempos de importación por etapa y el tiempo hasta la primera respuesta
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Referencia de inicio: este módulo se importa antes que el resto
+_inicio = time.perf_counter()
+_inicio_iso = datetime.now().isoformat()
+
+_etapas: List[Tuple[str, float]] = []
+_listo_ms: Optional[float] = None
+_primera_respuesta_ms: Optional[float] = None
+
+# Módulos pesados que deberían cargarse solo bajo demanda
+MODULOS_DIFERIDOS = ('bs4', 'requests', 'rues_scraper')
+
+
+def _ms_desde_inicio() -> float:
+    return round((time.perf_counter() - _inicio) * 1000, 1)
+
+
+@contextmanager
+def etapa(nombre: str):
+    """Registra la duración de un bloque de arranque (p. ej. un import)"""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _etapas.append((nombre, round((time.perf_counter() - t0) * 1000, 1)))
+
+
+def marcar_listo():
+    """Marca el fin del arranque de la aplicación"""
+    global _listo_ms
+    if _listo_ms is None:
+        _listo_ms = _ms_desde_inicio()
+
+
+def marcar_respuesta():
+    """Registra la primera respuesta servida (las siguientes se ignoran)"""
+    global _primera_respuesta_ms
+    if _primera_respuesta_ms is None:
+        _primera_respuesta_ms = _ms_desde_inicio()
+
+
+def reporte() -> Dict:
+    """Reporte de arranque del proceso"""
+    return {
+        'inicio': _inicio_iso,
+        'etapas_ms': dict(_etapas),
+        'listo_ms': _listo_ms,
+        'primera_respuesta_ms': _primera_respuesta_ms,
+        'modulos_cargados': len(sys.modules),
+        'modulos_diferidos': {
+            modulo: modulo in sys.modules for modulo in MODULOS_DIFERIDOS
+        }
+    }
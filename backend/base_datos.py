@@ -0,0 +1,42 @@
+"""
+Conexiones SQLite compartidas por los servicios
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+
+from config import DIRECTORIO_ALMACEN
+
+
+def ruta_base(nombre: str) -> str:
+    """Ruta absoluta de una base dentro del almacén local"""
+    os.makedirs(DIRECTORIO_ALMACEN, exist_ok=True)
+    return os.path.join(DIRECTORIO_ALMACEN, nombre)
+
+
+def conectar(nombre: str) -> sqlite3.Connection:
+    """
+    Abre una conexión a una base del almacén local
+
+    Usa WAL para que lectores y escritores (incluidos otros procesos)
+    no se bloqueen entre sí.
+    """
+    conexion = sqlite3.connect(ruta_base(nombre), timeout=30)
+    conexion.execute('PRAGMA journal_mode=WAL')
+    conexion.execute('PRAGMA synchronous=NORMAL')
+    return conexion
+
+
+@contextmanager
+def transaccion(nombre: str):
+    """
+    Conexión de uso corto: confirma al salir (o revierte si hay error)
+    y la cierra
+    """
+    conexion = conectar(nombre)
+    try:
+        with conexion:
+            yield conexion
+    finally:
+        conexion.close()
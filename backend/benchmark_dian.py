@@ -0,0 +1,115 @@
+"""
+Benchmark del pool de sesiones del RUT contra el formulario simulado
+Compara negociar una sesión por consulta con reutilizar sesiones calientes
+
+Uso:
+    python benchmark_dian.py                     # 400 consultas, 4 sesiones
+    python benchmark_dian.py 2000 8 0.05 0.01    # consultas, sesiones, retardos (s)
+"""
+
+import asyncio
+import json
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from integrations import dian_simulador
+from integrations.dian_integration import PoolSesionesMUISCA, SesionMUISCA
+from pool_parseo import cerrar_pool_parseo
+
+
+def _contadores(base_url: str) -> Dict:
+    with urllib.request.urlopen(f'{base_url}/estadisticas') as respuesta:
+        return json.load(respuesta)
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def medir(nombre: str, ejecutar: Callable[[List[str]], List[float]], nits: List[str], base_url: str) -> Dict:
+    """Consultas/seg, latencias y negociaciones que vio el servidor"""
+    antes = _contadores(base_url)
+    inicio = time.perf_counter()
+    latencias = ejecutar(nits)
+    segundos = time.perf_counter() - inicio
+    despues = _contadores(base_url)
+
+    return {
+        'modo': nombre,
+        'consultas_por_segundo': round(len(nits) / segundos, 1),
+        'p50_ms': round(_percentil(latencias, 50) * 1000, 1),
+        'p95_ms': round(_percentil(latencias, 95) * 1000, 1),
+        'negociaciones': despues['negociaciones'] - antes['negociaciones'],
+        'vistas_expiradas': despues['vistas_expiradas'] - antes['vistas_expiradas'],
+    }
+
+
+def sin_reutilizar(url: str, sesiones: int) -> Callable[[List[str]], List[float]]:
+    """Una sesión nueva (GET del formulario + POST) por consulta"""
+    def consultar(nit: str) -> float:
+        inicio = time.perf_counter()
+        sesion = SesionMUISCA(url)
+        sesion.consultar(nit, 10)
+        sesion.http.close()
+        return time.perf_counter() - inicio
+
+    def ejecutar(nits: List[str]) -> List[float]:
+        with ThreadPoolExecutor(max_workers=sesiones) as hilos:
+            return list(hilos.map(consultar, nits))
+    return ejecutar
+
+
+def con_pool(pool: PoolSesionesMUISCA) -> Callable[[List[str]], List[float]]:
+    """
+    Sesiones calientes del pool (las mismas que usa DIANIntegration)
+    Tantas consultas en curso como sesiones: la latencia no incluye cola
+    """
+    async def todas(nits: List[str]) -> List[float]:
+        limite = asyncio.Semaphore(pool.tamano)
+
+        async def consultar(nit: str) -> float:
+            async with limite:
+                inicio = time.perf_counter()
+                await pool.consultar(nit, 10)
+                return time.perf_counter() - inicio
+
+        return await asyncio.gather(*(consultar(nit) for nit in nits))
+
+    return lambda nits: asyncio.run(todas(nits))
+
+
+if __name__ == "__main__":
+    consultas = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    sesiones = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    negociacion = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+    consulta = float(sys.argv[4]) if len(sys.argv) > 4 else 0.01
+
+    servidor = dian_simulador.iniciar(retardo_negociacion=negociacion, retardo_consulta=consulta)
+    base_url = f'http://127.0.0.1:{servidor.server_address[1]}'
+    url = f'{base_url}/rut'
+    nits = [str(900000000 + i) for i in range(consultas)]
+
+    print("="*60)
+    print(f"🧾 BENCHMARK RUT: {consultas} consultas, {sesiones} sesiones")
+    print(f"   Negociación {negociacion}s | consulta {consulta}s (servidor simulado)")
+    print("="*60)
+
+    pool = PoolSesionesMUISCA(url, sesiones)
+    resultados = [medir('sin reutilizar', sin_reutilizar(url, sesiones), nits, base_url)]
+    pool.calentar()
+    resultados.append(medir('pool caliente', con_pool(pool), nits, base_url))
+    pool.cerrar()
+    cerrar_pool_parseo()
+    servidor.shutdown()
+
+    for r in resultados:
+        print(f"\n🔧 {r['modo']}")
+        print(f"   Consultas/seg:    {r['consultas_por_segundo']}")
+        print(f"   Latencia p50/p95: {r['p50_ms']} / {r['p95_ms']} ms")
+        print(f"   Negociaciones:    {r['negociaciones']}")
+        print(f"   Vistas expiradas: {r['vistas_expiradas']}")
+    print("="*60)
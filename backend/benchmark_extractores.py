@@ -0,0 +1,180 @@
+"""
+Benchmark de extractores de fuentes sobre un corpus versionado
+Mide precisión por campo, páginas por segundo y memoria pico
+
+Uso:
+    python benchmark_extractores.py                      # reporte
+    python benchmark_extractores.py --verificar          # falla si alguno baja de la línea base
+    python benchmark_extractores.py --guardar-linea-base bs4_html_parser
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from config import DIRECTORIO_BACKEND
+
+
+# Corpus de páginas grabadas con los valores esperados
+DIRECTORIO_CORPUS = os.path.join(os.path.dirname(DIRECTORIO_BACKEND), 'tests', 'corpus')
+VERSION_CORPUS = 'v3'
+
+# Repeticiones del corpus al medir velocidad (el corpus es pequeño)
+RONDAS = 20
+
+
+def _extractores_rues() -> Dict[str, Callable]:
+    """Implementaciones del extractor del RUES disponibles en este entorno"""
+    from rues_scraper import extraer_campos
+
+    extractores = {
+        'bs4_html_parser': lambda html, nit: extraer_campos(html, nit, 'html.parser'),
+    }
+
+    # lxml es opcional: más rápido, mismo código de extracción
+    try:
+        import lxml  # noqa: F401
+        extractores['bs4_lxml'] = lambda html, nit: extraer_campos(html, nit, 'lxml')
+    except ImportError:
+        pass
+
+    return extractores
+
+
+EXTRACTORES_POR_FUENTE = {
+    'rues': _extractores_rues,
+}
+
+
+def cargar_corpus(fuente: str, version: str = VERSION_CORPUS) -> Tuple[List[Tuple[str, bytes, Dict]], List[str]]:
+    """
+    Páginas del corpus con sus valores esperados
+
+    Returns:
+        ([(nombre, html, esperado)], campos evaluados)
+    """
+    directorio = os.path.join(DIRECTORIO_CORPUS, fuente, version)
+    with open(os.path.join(directorio, 'esperado.json'), encoding='utf-8') as f:
+        manifiesto = json.load(f)
+
+    paginas = []
+    for nombre, esperado in manifiesto['paginas'].items():
+        with open(os.path.join(directorio, nombre), 'rb') as f:
+            paginas.append((nombre, f.read(), esperado))
+    return paginas, manifiesto['campos']
+
+
+def medir(extraer: Callable, paginas: List[Tuple[str, bytes, Dict]], campos: List[str], rondas: int = RONDAS) -> Dict:
+    """
+    Precisión por campo (coincidencia exacta), páginas/seg y memoria pico
+    """
+    aciertos = dict.fromkeys(campos, 0)
+    errores = []
+
+    for nombre, html, esperado in paginas:
+        obtenido = extraer(html, esperado['nit'])
+        for campo in campos:
+            if obtenido.get(campo) == esperado[campo]:
+                aciertos[campo] += 1
+            else:
+                errores.append((nombre, campo, esperado[campo], obtenido.get(campo)))
+
+    inicio = time.perf_counter()
+    for _ in range(rondas):
+        for _, html, esperado in paginas:
+            extraer(html, esperado['nit'])
+    segundos = time.perf_counter() - inicio
+
+    # Memoria en una pasada aparte (tracemalloc distorsiona los tiempos)
+    tracemalloc.start()
+    for _, html, esperado in paginas:
+        extraer(html, esperado['nit'])
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = len(paginas)
+    return {
+        'precision_por_campo': {campo: round(n / total, 4) for campo, n in aciertos.items()},
+        'precision_global': round(sum(aciertos.values()) / (total * len(campos)), 4),
+        'paginas_por_segundo': round(rondas * total / segundos, 1),
+        'memoria_pico_kb': round(pico / 1024, 1),
+        'errores': errores
+    }
+
+
+def _ruta_linea_base(fuente: str, version: str) -> str:
+    return os.path.join(DIRECTORIO_CORPUS, fuente, version, 'linea_base.json')
+
+
+def cargar_linea_base(fuente: str, version: str = VERSION_CORPUS) -> Dict:
+    ruta = _ruta_linea_base(fuente, version)
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_linea_base(fuente: str, extractor: str, resultado: Dict, version: str = VERSION_CORPUS):
+    linea_base = {
+        'extractor': extractor,
+        'precision_por_campo': resultado['precision_por_campo'],
+        'precision_global': resultado['precision_global'],
+        'paginas_por_segundo': resultado['paginas_por_segundo']
+    }
+    with open(_ruta_linea_base(fuente, version), 'w', encoding='utf-8') as f:
+        json.dump(linea_base, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def regresiones(resultado: Dict, linea_base: Dict) -> List[str]:
+    """Campos en los que el extractor queda por debajo de la línea base"""
+    return [
+        campo for campo, precision in linea_base.get('precision_por_campo', {}).items()
+        if resultado['precision_por_campo'].get(campo, 0) < precision
+    ]
+
+
+if __name__ == "__main__":
+    fuente = 'rues'
+    paginas, campos = cargar_corpus(fuente)
+    linea_base = cargar_linea_base(fuente)
+
+    print("="*60)
+    print(f"📏 BENCHMARK DE EXTRACTORES: {fuente.upper()} ({VERSION_CORPUS}, {len(paginas)} páginas)")
+    print("="*60)
+
+    resultados = {}
+    for nombre, extraer in EXTRACTORES_POR_FUENTE[fuente]().items():
+        resultado = resultados[nombre] = medir(extraer, paginas, campos)
+
+        print(f"\n🔧 {nombre}")
+        print(f"   Precisión global: {resultado['precision_global']:.1%}")
+        print(f"   Páginas/seg:      {resultado['paginas_por_segundo']}")
+        print(f"   Memoria pico:     {resultado['memoria_pico_kb']} KB")
+        for campo, precision in resultado['precision_por_campo'].items():
+            base = linea_base.get('precision_por_campo', {}).get(campo)
+            marca = '' if base is None else ('  ⚠️ bajo línea base' if precision < base else '')
+            print(f"   {campo:22s} {precision:7.1%}{marca}")
+        if '-v' in sys.argv:
+            for pagina, campo, esperado, obtenido in resultado['errores']:
+                print(f"   ✗ {pagina}: {campo} esperado {esperado!r}, obtenido {obtenido!r}")
+
+    if '--guardar-linea-base' in sys.argv:
+        extractor = sys.argv[sys.argv.index('--guardar-linea-base') + 1]
+        guardar_linea_base(fuente, extractor, resultados[extractor])
+        print(f"\n✅ Línea base actualizada con {extractor}")
+
+    if '--verificar' in sys.argv:
+        fallidos = {nombre: regresiones(r, linea_base) for nombre, r in resultados.items()}
+        fallidos = {nombre: campos for nombre, campos in fallidos.items() if campos}
+        print("="*60)
+        if fallidos:
+            for nombre, campos_bajos in fallidos.items():
+                print(f"❌ {nombre} bajo la línea base en: {', '.join(campos_bajos)}")
+            sys.exit(1)
+        print("✅ Ningún extractor bajo la línea base")
+
+    print("="*60)
@@ -0,0 +1,110 @@
+"""
+Clase base para los backends de cache
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Optional
+
+
+class BaseCache(ABC):
+    """
+    Interfaz común para todos los backends de cache
+
+    Los valores deben ser serializables a JSON (dicts, listas, textos, números)
+    """
+
+    def __init__(self):
+        self.aciertos = 0
+        self.fallos = 0
+
+    @property
+    @abstractmethod
+    def nombre(self) -> str:
+        """Nombre del backend"""
+        pass
+
+    @abstractmethod
+    def obtener(self, clave: str) -> Optional[Any]:
+        """
+        Lee un valor
+
+        Returns:
+            El valor o None si no existe o expiró
+        """
+        pass
+
+    async def obtener_async(self, clave: str) -> Optional[Any]:
+        """
+        obtener() desde el event loop
+        Los backends con E/S (disco) hacen la lectura en un hilo
+        """
+        return self.obtener(clave)
+
+    async def obtener_varios_async(self, claves: Iterable[str]) -> Dict[str, Optional[Any]]:
+        """Varias lecturas desde el event loop (clave -> valor o None)"""
+        return {clave: self.obtener(clave) for clave in claves}
+
+    @abstractmethod
+    def guardar(self, clave: str, valor: Any, ttl: float) -> bool:
+        """
+        Guarda un valor por ttl segundos
+
+        Returns:
+            True si se guardó
+        """
+        pass
+
+    @abstractmethod
+    def eliminar(self, clave: str):
+        """Elimina un valor si existe"""
+        pass
+
+    def _registrar(self, valor: Optional[Any]) -> Optional[Any]:
+        """Cuenta aciertos y fallos de lectura"""
+        if valor is None:
+            self.fallos += 1
+        else:
+            self.aciertos += 1
+        return valor
+
+    def estadisticas(self) -> Dict:
+        """Contadores de uso del proceso"""
+        total = self.aciertos + self.fallos
+        return {
+            'backend': self.nombre,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / total, 3) if total else None
+        }
+
+
+class EspacioCache:
+    """
+    Vista de un backend con prefijo de claves y TTL por defecto
+    Permite que empresas, scores, etc. compartan backend sin colisiones
+    """
+
+    def __init__(self, backend: BaseCache, espacio: str, ttl: float):
+        self.backend = backend
+        self.espacio = espacio
+        self.ttl = ttl
+
+    def _clave(self, clave: str) -> str:
+        return f'{self.espacio}:{clave}'
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        return self.backend.obtener(self._clave(clave))
+
+    async def obtener_async(self, clave: str) -> Optional[Any]:
+        return await self.backend.obtener_async(self._clave(clave))
+
+    async def obtener_varios_async(self, claves: Iterable[str]) -> Dict[str, Optional[Any]]:
+        claves = list(claves)
+        valores = await self.backend.obtener_varios_async([self._clave(clave) for clave in claves])
+        return {clave: valores[self._clave(clave)] for clave in claves}
+
+    def guardar(self, clave: str, valor: Any, ttl: Optional[float] = None) -> bool:
+        return self.backend.guardar(self._clave(clave), valor, ttl if ttl is not None else self.ttl)
+
+    def eliminar(self, clave: str):
+        self.backend.eliminar(self._clave(clave))
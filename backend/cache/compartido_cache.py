@@ -0,0 +1,222 @@
+"""
+Cache compartido entre procesos del mismo host
+Tabla hash sobre un archivo mapeado en memoria (mmap)
+"""
+
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Optional
+
+from cache.base_cache import BaseCache
+
+
+# Cabecera del archivo: firma, versión, número de buckets, tamaño de slot
+_CABECERA = struct.Struct('<8sIII')
+_FIRMA = b'CORENTA1'
+_VERSION = 1
+_TAM_CABECERA = 64
+
+# Cabecera de slot: secuencia, expiración, huella de clave, escritura, largo clave, largo valor
+_SLOT = struct.Struct('<QdQdHI')
+_SECUENCIA = struct.Struct('<Q')
+
+# Slots por bucket (asociatividad)
+ASOCIATIVIDAD = 8
+
+# Reintentos de lectura si un escritor está modificando el slot
+_REINTENTOS_LECTURA = 4
+
+
+def ruta_con_geometria(ruta: str, num_buckets: int, tam_slot: int) -> str:
+    """
+    Archivo propio de cada formato y geometría
+    'cache_compartido.mmap' -> 'cache_compartido.v1.1250x8x4096.mmap'
+
+    Workers con otra configuración (un despliegue gradual, un cambio de
+    CACHE_COMPARTIDO_*) usan otro archivo en lugar de reinicializar el
+    suyo. Los archivos de geometrías que ya nadie usa se pueden borrar.
+    """
+    raiz, extension = os.path.splitext(ruta)
+    return f'{raiz}.v{_VERSION}.{num_buckets}x{ASOCIATIVIDAD}x{tam_slot}{extension}'
+
+
+def _huella(clave: bytes) -> int:
+    """Hash de 64 bits de la clave (0 se reserva para slot vacío)"""
+    valor = int.from_bytes(hashlib.blake2b(clave, digest_size=8).digest(), 'little')
+    return valor or 1
+
+
+class CompartidoCache(BaseCache):
+    """
+    Cache en un archivo mmap compartido por todos los workers del host
+
+    - Lecturas sin lock: cada slot lleva un contador de secuencia (seqlock).
+      El escritor lo deja impar mientras escribe y par al terminar; el lector
+      descarta la lectura si el contador cambió o era impar.
+    - Escrituras serializadas con flock sobre el archivo (entre procesos)
+      y un lock local (entre hilos del mismo proceso).
+    - Tabla asociativa por conjuntos: cada clave cae en un bucket de
+      ASOCIATIVIDAD slots. Si el bucket está lleno se desaloja la entrada
+      expirada o, si no hay, la escrita hace más tiempo. Como el desalojo
+      ocurre sobre el archivo compartido, todos los workers ven el mismo
+      contenido y la misma política.
+    - Valores en JSON; los que no caben en un slot no se guardan.
+    """
+
+    def __init__(self, ruta: str, max_entradas: int, tam_slot: int):
+        super().__init__()
+        self.tam_slot = tam_slot
+        self.num_buckets = max(1, max_entradas // ASOCIATIVIDAD)
+        self.ruta = ruta_con_geometria(ruta, self.num_buckets, tam_slot)
+        self._lock_local = threading.Lock()
+
+        tamano = _TAM_CABECERA + self.num_buckets * ASOCIATIVIDAD * tam_slot
+        os.makedirs(os.path.dirname(self.ruta) or '.', exist_ok=True)
+        self._fd = self._abrir(tamano, _CABECERA.pack(_FIRMA, _VERSION, self.num_buckets, tam_slot))
+        self._mm = mmap.mmap(self._fd, tamano)
+
+    def _abrir(self, tamano: int, cabecera: bytes) -> int:
+        """
+        Abre el archivo de la geometría, inicializándolo si es nuevo
+
+        Si está dañado se reconstruye en el mismo archivo, bajo el flock de
+        los escritores: todos los workers siguen mapeando el mismo archivo
+        (uno nuevo puesto en su lugar dejaría a los que ya lo tenían
+        mapeado escribiendo en uno que los demás no ven). Nunca se achica
+        por debajo de `tamano` (los mapeos existentes recibirían SIGBUS)
+        """
+        fd = os.open(self.ruta, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                tamano_actual = os.fstat(fd).st_size
+                if tamano_actual != tamano or os.pread(fd, _CABECERA.size, 0) != cabecera:
+                    if tamano_actual:
+                        self._vaciar(fd, tamano)
+                    os.ftruncate(fd, tamano)
+                    os.pwrite(fd, cabecera, 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    @staticmethod
+    def _vaciar(fd: int, tamano: int):
+        """
+        Pone en cero los slots de un archivo dañado, en su lugar
+        Un lector concurrente ve cambiar la secuencia y descarta la lectura
+        """
+        ceros = bytes(1024 * 1024)
+        tamano = min(tamano, os.fstat(fd).st_size)
+        for offset in range(_TAM_CABECERA, tamano, len(ceros)):
+            os.pwrite(fd, ceros[:tamano - offset], offset)
+
+    @property
+    def nombre(self) -> str:
+        return "compartido"
+
+    def _offsets_bucket(self, huella: int):
+        bucket = huella % self.num_buckets
+        inicio = _TAM_CABECERA + bucket * ASOCIATIVIDAD * self.tam_slot
+        return [inicio + i * self.tam_slot for i in range(ASOCIATIVIDAD)]
+
+    def _leer_slot(self, offset: int, huella: int, clave: bytes) -> Optional[Any]:
+        """Lectura optimista de un slot (seqlock)"""
+        mm = self._mm
+        for _ in range(_REINTENTOS_LECTURA):
+            secuencia, expira, huella_slot, _, largo_clave, largo_valor = _SLOT.unpack_from(mm, offset)
+            if secuencia & 1:
+                continue  # escritura en curso
+            if huella_slot != huella:
+                return None
+
+            inicio = offset + _SLOT.size
+            datos = mm[inicio:inicio + largo_clave + largo_valor]
+
+            if _SECUENCIA.unpack_from(mm, offset)[0] != secuencia:
+                continue  # cambió mientras leíamos
+            if datos[:largo_clave] != clave or expira <= time.time():
+                return None
+            return json.loads(datos[largo_clave:])
+        return None
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        clave_bytes = clave.encode('utf-8')
+        huella = _huella(clave_bytes)
+
+        for offset in self._offsets_bucket(huella):
+            valor = self._leer_slot(offset, huella, clave_bytes)
+            if valor is not None:
+                return self._registrar(valor)
+
+        return self._registrar(None)
+
+    def _escribir_slot(self, offset: int, huella: int, expira: float, clave: bytes, valor: bytes):
+        """Escribe un slot dejando la secuencia impar mientras dura"""
+        mm = self._mm
+        secuencia = _SECUENCIA.unpack_from(mm, offset)[0]
+        _SECUENCIA.pack_into(mm, offset, secuencia + 1)
+
+        inicio = offset + _SLOT.size
+        mm[inicio:inicio + len(clave) + len(valor)] = clave + valor
+        _SLOT.pack_into(mm, offset, secuencia + 1, expira, huella, time.time(), len(clave), len(valor))
+
+        _SECUENCIA.pack_into(mm, offset, secuencia + 2)
+
+    def _elegir_slot(self, huella: int, clave: bytes) -> int:
+        """
+        Slot destino: el de la misma clave, uno vacío o expirado,
+        o el escrito hace más tiempo (desalojo)
+        """
+        ahora = time.time()
+        candidato, escrito_candidato = None, None
+
+        for offset in self._offsets_bucket(huella):
+            _, expira, huella_slot, escrito, largo_clave, _ = _SLOT.unpack_from(self._mm, offset)
+            inicio = offset + _SLOT.size
+            if huella_slot == huella and self._mm[inicio:inicio + largo_clave] == clave:
+                return offset
+            if huella_slot == 0 or expira <= ahora:
+                escrito = -1.0
+            if candidato is None or escrito < escrito_candidato:
+                candidato, escrito_candidato = offset, escrito
+
+        return candidato
+
+    def guardar(self, clave: str, valor: Any, ttl: float) -> bool:
+        clave_bytes = clave.encode('utf-8')
+        valor_bytes = json.dumps(valor, ensure_ascii=False).encode('utf-8')
+        if _SLOT.size + len(clave_bytes) + len(valor_bytes) > self.tam_slot:
+            return False
+
+        huella = _huella(clave_bytes)
+        with self._lock_local:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                offset = self._elegir_slot(huella, clave_bytes)
+                self._escribir_slot(offset, huella, time.time() + ttl, clave_bytes, valor_bytes)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return True
+
+    def eliminar(self, clave: str):
+        clave_bytes = clave.encode('utf-8')
+        huella = _huella(clave_bytes)
+        with self._lock_local:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                for offset in self._offsets_bucket(huella):
+                    _, _, huella_slot, _, largo_clave, _ = _SLOT.unpack_from(self._mm, offset)
+                    inicio = offset + _SLOT.size
+                    if huella_slot == huella and self._mm[inicio:inicio + largo_clave] == clave_bytes:
+                        self._escribir_slot(offset, 0, 0.0, b'', b'')
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
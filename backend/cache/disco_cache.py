@@ -0,0 +1,180 @@
+"""
+Cache en disco comprimido (SQLite + zlib)
+Sobrevive a reinicios del proceso
+"""
+
+import asyncio
+import json
+import queue
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from base_datos import conectar, transaccion
+from cache.base_cache import BaseCache
+from trazas import obtener_logger
+
+logger = obtener_logger('cache')
+
+
+# Operaciones encoladas para el hilo escritor
+_GUARDAR, _ELIMINAR, _TOCAR, _DETENER = range(4)
+
+
+class DiscoCache(BaseCache):
+    """
+    Cache persistente acotado por tamaño
+
+    - Valores JSON comprimidos con zlib
+    - TTL por entrada; las expiradas se ignoran al leer y se purgan al desalojar
+    - Escritura diferida (write-behind): guardar() encola y un hilo escribe
+      en lotes, así quien llama no espera al disco
+    - Lecturas con una conexión persistente por hilo; desde el event loop
+      (obtener_async) se hacen en un hilo del executor
+    - Si el total comprimido supera max_bytes se desalojan las entradas
+      accedidas hace más tiempo
+    """
+
+    def __init__(self, nombre_base: str, max_bytes: int):
+        super().__init__()
+        self.nombre_base = nombre_base
+        self.max_bytes = max_bytes
+        self._cola: 'queue.Queue' = queue.Queue()
+        self._lectores = threading.local()
+
+        with transaccion(nombre_base) as con:
+            con.execute('''
+                CREATE TABLE IF NOT EXISTS cache (
+                    clave TEXT PRIMARY KEY,
+                    valor BLOB NOT NULL,
+                    expira REAL NOT NULL,
+                    acceso REAL NOT NULL,
+                    tamano INTEGER NOT NULL
+                )
+            ''')
+            con.execute('CREATE INDEX IF NOT EXISTS idx_cache_acceso ON cache (acceso)')
+            self._total_bytes = con.execute('SELECT COALESCE(SUM(tamano), 0) FROM cache').fetchone()[0]
+
+        self._escritor = threading.Thread(target=self._escribir_en_lotes, daemon=True)
+        self._escritor.start()
+
+    @property
+    def nombre(self) -> str:
+        return "disco"
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        encontrado = self.obtener_con_expiracion(clave)
+        return self._registrar(encontrado[0] if encontrado else None)
+
+    async def obtener_async(self, clave: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.obtener, clave)
+
+    async def obtener_varios_async(self, claves: Iterable[str]) -> Dict[str, Optional[Any]]:
+        claves = list(claves)
+        return await asyncio.to_thread(lambda: {clave: self.obtener(clave) for clave in claves})
+
+    def _lector(self):
+        """Conexión de lectura del hilo actual (se abre en su primer uso)"""
+        conexion = getattr(self._lectores, 'conexion', None)
+        if conexion is None:
+            conexion = self._lectores.conexion = conectar(self.nombre_base)
+        return conexion
+
+    def obtener_con_expiracion(self, clave: str) -> Optional[Tuple[Any, float]]:
+        """
+        Valor vigente y el instante (time.time()) en que expira
+        None si no existe o expiró (no cuenta en aciertos/fallos)
+        """
+        # Sin transacción abierta: cada SELECT ve lo último confirmado
+        fila = self._lector().execute(
+            'SELECT valor, expira FROM cache WHERE clave = ?', (clave,)
+        ).fetchone()
+
+        if fila is None or fila[1] <= time.time():
+            return None
+
+        self._cola.put((_TOCAR, clave, None))
+        return json.loads(zlib.decompress(fila[0])), fila[1]
+
+    def guardar(self, clave: str, valor: Any, ttl: float) -> bool:
+        comprimido = zlib.compress(json.dumps(valor, ensure_ascii=False).encode('utf-8'))
+        self._cola.put((_GUARDAR, clave, (comprimido, time.time() + ttl)))
+        return True
+
+    def eliminar(self, clave: str):
+        self._cola.put((_ELIMINAR, clave, None))
+
+    def _escribir_en_lotes(self):
+        """Hilo escritor: aplica las operaciones encoladas en transacciones"""
+        conexion = conectar(self.nombre_base)
+
+        while True:
+            operaciones = [self._cola.get()]
+            # Agrupar lo que ya esté en cola
+            while len(operaciones) < 500:
+                try:
+                    operaciones.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+
+            detener = any(op[0] == _DETENER for op in operaciones)
+            try:
+                with conexion:
+                    self._aplicar(conexion, operaciones)
+                    if self._total_bytes > self.max_bytes:
+                        self._desalojar(conexion)
+            except Exception as e:
+                logger.error("Error escribiendo cache en disco: %s", e)
+            finally:
+                for _ in operaciones:
+                    self._cola.task_done()
+
+            if detener:
+                conexion.close()
+                return
+
+    def _aplicar(self, conexion, operaciones):
+        ahora = time.time()
+        for tipo, clave, datos in operaciones:
+            if tipo == _GUARDAR:
+                comprimido, expira = datos
+                anterior = conexion.execute(
+                    'SELECT tamano FROM cache WHERE clave = ?', (clave,)
+                ).fetchone()
+                conexion.execute(
+                    'INSERT OR REPLACE INTO cache (clave, valor, expira, acceso, tamano) VALUES (?, ?, ?, ?, ?)',
+                    (clave, comprimido, expira, ahora, len(comprimido))
+                )
+                self._total_bytes += len(comprimido) - (anterior[0] if anterior else 0)
+            elif tipo == _ELIMINAR:
+                anterior = conexion.execute(
+                    'SELECT tamano FROM cache WHERE clave = ?', (clave,)
+                ).fetchone()
+                if anterior:
+                    conexion.execute('DELETE FROM cache WHERE clave = ?', (clave,))
+                    self._total_bytes -= anterior[0]
+            elif tipo == _TOCAR:
+                conexion.execute('UPDATE cache SET acceso = ? WHERE clave = ?', (ahora, clave))
+
+    def _desalojar(self, conexion):
+        """Purga expiradas y luego las menos accedidas hasta caber en max_bytes"""
+        conexion.execute('DELETE FROM cache WHERE expira <= ?', (time.time(),))
+        self._total_bytes = conexion.execute('SELECT COALESCE(SUM(tamano), 0) FROM cache').fetchone()[0]
+
+        # Dejar margen del 10% para no desalojar en cada lote
+        objetivo = int(self.max_bytes * 0.9)
+        for clave, tamano in conexion.execute('SELECT clave, tamano FROM cache ORDER BY acceso').fetchall():
+            if self._total_bytes <= objetivo:
+                break
+            conexion.execute('DELETE FROM cache WHERE clave = ?', (clave,))
+            self._total_bytes -= tamano
+
+    def vaciar_cola(self):
+        """Espera a que se escriban las operaciones pendientes"""
+        self._cola.join()
+
+    def cerrar(self):
+        """Escribe lo pendiente y detiene el hilo escritor"""
+        self._cola.put((_DETENER, None, None))
+        self._escritor.join(timeout=10)
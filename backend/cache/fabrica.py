@@ -0,0 +1,93 @@
+"""
+Selección del backend de cache por configuración
+El código que usa el cache no cambia al cambiar de backend
+"""
+
+from typing import Dict, Optional
+
+from cache.base_cache import BaseCache, EspacioCache
+from config import (
+    CACHE_BACKEND,
+    CACHE_MAX_ENTRADAS,
+    CACHE_COMPARTIDO_RUTA,
+    CACHE_COMPARTIDO_TAM_SLOT,
+    CACHE_L1_MAX_ENTRADAS,
+    CACHE_L1_TTL,
+    CACHE_DISCO_MAX_BYTES,
+    CACHE_ADMISION_POR_FRECUENCIA
+)
+
+
+# Un backend por nombre y proceso (se crean en el primer uso)
+_backends: Dict[str, BaseCache] = {}
+_espacios: Dict[str, EspacioCache] = {}
+
+# Base SQLite del nivel en disco
+BASE_CACHE_DISCO = 'cache_disco.db'
+
+
+def crear_backend(nombre: str) -> BaseCache:
+    """
+    Crea un backend de cache por nombre
+
+    Args:
+        nombre: 'memoria', 'compartido', 'disco' o 'niveles'
+    """
+    # Admisión por frecuencia de consulta en los caches en memoria
+    admitir = None
+    if CACHE_ADMISION_POR_FRECUENCIA:
+        from popularidad import admitir
+
+    if nombre == 'memoria':
+        from cache.memoria_cache import MemoriaCache
+        return MemoriaCache(CACHE_MAX_ENTRADAS, admitir)
+
+    if nombre == 'compartido':
+        from cache.compartido_cache import CompartidoCache
+        return CompartidoCache(CACHE_COMPARTIDO_RUTA, CACHE_MAX_ENTRADAS, CACHE_COMPARTIDO_TAM_SLOT)
+
+    if nombre == 'disco':
+        from cache.disco_cache import DiscoCache
+        return DiscoCache(BASE_CACHE_DISCO, CACHE_DISCO_MAX_BYTES)
+
+    if nombre == 'niveles':
+        from cache.niveles_cache import NivelesCache
+        return NivelesCache(CACHE_L1_MAX_ENTRADAS, BASE_CACHE_DISCO, CACHE_DISCO_MAX_BYTES, CACHE_L1_TTL, admitir)
+
+    raise ValueError(f"Backend de cache desconocido: {nombre}")
+
+
+def obtener_backend(nombre: Optional[str] = None) -> BaseCache:
+    """Backend por nombre (por defecto el configurado en CACHE_BACKEND)"""
+    nombre = nombre or CACHE_BACKEND
+    if nombre not in _backends:
+        _backends[nombre] = crear_backend(nombre)
+    return _backends[nombre]
+
+
+def obtener_cache(espacio: str, ttl: float, backend: Optional[str] = None) -> EspacioCache:
+    """
+    Cache de un espacio de claves (p. ej. 'empresas', 'scores')
+
+    Args:
+        espacio: Prefijo de las claves
+        ttl: Segundos de vida por defecto de las entradas
+        backend: Nombre del backend (por defecto CACHE_BACKEND)
+    """
+    if espacio not in _espacios:
+        _espacios[espacio] = EspacioCache(obtener_backend(backend), espacio, ttl)
+    return _espacios[espacio]
+
+
+def estadisticas() -> Dict:
+    """Estadísticas de todos los backends creados en este proceso"""
+    return {nombre: backend.estadisticas() for nombre, backend in _backends.items()}
+
+
+def cerrar_caches():
+    """Escribe lo pendiente de los backends con escritura diferida"""
+    for backend in _backends.values():
+        if hasattr(backend, 'cerrar'):
+            backend.cerrar()
+    _backends.clear()
+    _espacios.clear()
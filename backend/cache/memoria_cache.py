@@ -0,0 +1,83 @@
+"""
+Cache en memoria del proceso (LRU con TTL)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from cache.base_cache import BaseCache
+
+
+class MemoriaCache(BaseCache):
+    """
+    LRU acotado por número de entradas, con expiración por entrada
+
+    Cada worker de uvicorn tiene su propia copia
+
+    Con admitir (clave nueva, clave a desalojar) -> bool, una clave nueva
+    con el cache lleno solo entra si la política la prefiere sobre la
+    menos reciente; si no, no se guarda y la menos reciente pasa a ser
+    la más reciente (así las entradas frías terminan cediendo su lugar)
+    """
+
+    def __init__(self, max_entradas: int, admitir: Optional[Callable[[str, str], bool]] = None):
+        super().__init__()
+        self.max_entradas = max_entradas
+        self.admitir = admitir
+        self.no_admitidas = 0
+        self._datos: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def nombre(self) -> str:
+        return "memoria"
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return self._registrar(None)
+
+            expira, valor = entrada
+            if expira <= time.time():
+                del self._datos[clave]
+                return self._registrar(None)
+
+            self._datos.move_to_end(clave)
+            return self._registrar(valor)
+
+    def guardar(self, clave: str, valor: Any, ttl: float) -> bool:
+        with self._lock:
+            if not self._admitida(clave):
+                self.no_admitidas += 1
+                return False
+            self._datos[clave] = (time.time() + ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+        return True
+
+    def _admitida(self, clave: str) -> bool:
+        if self.admitir is None or clave in self._datos or len(self._datos) < self.max_entradas:
+            return True
+        victima, (expira, _) = next(iter(self._datos.items()))
+        if expira <= time.time() or self.admitir(clave, victima):
+            return True
+        # La víctima ganó: pasa al final y la próxima compite otra entrada
+        self._datos.move_to_end(victima)
+        return False
+
+    def eliminar(self, clave: str):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def estadisticas(self) -> Dict:
+        estadisticas = super().estadisticas()
+        if self.admitir is not None:
+            estadisticas['no_admitidas'] = self.no_admitidas
+        return estadisticas
+
+    def __len__(self) -> int:
+        return len(self._datos)
@@ -0,0 +1,94 @@
+"""
+Cache de dos niveles
+L1 en memoria (pequeño y rápido) sobre L2 en disco (grande y persistente)
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from cache.base_cache import BaseCache
+from cache.disco_cache import DiscoCache
+from cache.memoria_cache import MemoriaCache
+
+
+class NivelesCache(BaseCache):
+    """
+    Cache L1 memoria / L2 disco
+
+    - Lectura: L1; si falla, L2 y se promueve a L1 por lo que le queda de
+      vida en L2 (a lo sumo el TTL de L1): L1 nunca la sirve ya vencida
+    - Escritura: L1 de inmediato y L2 en diferido (write-behind)
+    Tras un reinicio L1 está vacío pero L2 conserva las entradas vigentes
+    Desde el event loop (obtener_async) solo la lectura de L2 va a un hilo
+    La política admitir (si la hay) decide solo la entrada a L1
+    """
+
+    def __init__(
+        self,
+        max_entradas_l1: int,
+        nombre_base_l2: str,
+        max_bytes_l2: int,
+        ttl_l1: float,
+        admitir: Optional[Callable[[str, str], bool]] = None
+    ):
+        super().__init__()
+        self.l1 = MemoriaCache(max_entradas_l1, admitir)
+        self.l2 = DiscoCache(nombre_base_l2, max_bytes_l2)
+        self.ttl_l1 = ttl_l1
+
+    @property
+    def nombre(self) -> str:
+        return "niveles"
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        valor = self.l1.obtener(clave)
+        if valor is not None:
+            return self._registrar(valor)
+
+        return self._registrar(self._promover(clave))
+
+    async def obtener_async(self, clave: str) -> Optional[Any]:
+        valor = self.l1.obtener(clave)
+        if valor is None:
+            valor = await asyncio.to_thread(self._promover, clave)
+        return self._registrar(valor)
+
+    async def obtener_varios_async(self, claves: Iterable[str]) -> Dict[str, Optional[Any]]:
+        valores = {clave: self.l1.obtener(clave) for clave in claves}
+        faltantes = [clave for clave, valor in valores.items() if valor is None]
+        if faltantes:
+            # Una sola ida al hilo para todas las que faltan en L1
+            valores.update(await asyncio.to_thread(lambda: {clave: self._promover(clave) for clave in faltantes}))
+        for valor in valores.values():
+            self._registrar(valor)
+        return valores
+
+    def _promover(self, clave: str) -> Optional[Any]:
+        """Lee de L2 y copia a L1 con la vida que le queda (a lo sumo ttl_l1)"""
+        encontrado = self.l2.obtener_con_expiracion(clave)
+        if encontrado is None:
+            return None
+
+        valor, expira = encontrado
+        restante = min(expira - time.time(), self.ttl_l1)
+        if restante > 0:
+            self.l1.guardar(clave, valor, restante)
+        return valor
+
+    def guardar(self, clave: str, valor: Any, ttl: float) -> bool:
+        self.l1.guardar(clave, valor, min(ttl, self.ttl_l1))
+        return self.l2.guardar(clave, valor, ttl)
+
+    def eliminar(self, clave: str):
+        self.l1.eliminar(clave)
+        self.l2.eliminar(clave)
+
+    def estadisticas(self):
+        estadisticas = super().estadisticas()
+        estadisticas['l1'] = self.l1.estadisticas()
+        estadisticas['l2'] = self.l2.estadisticas()
+        return estadisticas
+
+    def cerrar(self):
+        self.l2.cerrar()
@@ -0,0 +1,98 @@
+"""
+Catálogos de datos de referencia precompilados
+Se cargan desde un snapshot binario (marshal) en lugar de ejecutar literales Python
+"""
+
+import marshal
+import os
+import sys
+from importlib import import_module
+from typing import Any, Dict, Tuple
+
+from config import DIRECTORIO_CATALOGOS
+
+
+# Catálogos registrados: nombre -> (módulo fuente, atributo)
+CATALOGOS: Dict[str, Tuple[str, str]] = {
+    'empresas_ejemplo': ('datos_empresas_ejemplo', 'EMPRESAS_EJEMPLO'),
+    'divipola': ('datos_divipola', 'INDICE_DIVIPOLA'),
+}
+
+# Versión del formato del snapshot
+FORMATO = 1
+
+_cargados: Dict[str, Any] = {}
+
+
+def _ruta_snapshot(nombre: str) -> str:
+    return os.path.join(DIRECTORIO_CATALOGOS, f'{nombre}.marshal')
+
+
+def _firma_fuente(modulo: str) -> Tuple:
+    """
+    Firma del archivo fuente del catálogo y del intérprete
+    marshal no es portable entre versiones de Python
+    """
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), *modulo.split('.')) + '.py'
+    estado = os.stat(ruta)
+    return (FORMATO, sys.version_info[:2], marshal.version, estado.st_mtime_ns, estado.st_size)
+
+
+def compilar(nombre: str) -> Any:
+    """
+    Ejecuta el módulo fuente del catálogo y escribe su snapshot binario
+
+    Returns:
+        Los datos del catálogo
+    """
+    modulo, atributo = CATALOGOS[nombre]
+    datos = getattr(import_module(modulo), atributo)
+
+    os.makedirs(DIRECTORIO_CATALOGOS, exist_ok=True)
+    ruta = _ruta_snapshot(nombre)
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    with open(temporal, 'wb') as archivo:
+        marshal.dump((_firma_fuente(modulo), datos), archivo)
+    os.replace(temporal, ruta)
+
+    return datos
+
+
+def cargar(nombre: str) -> Any:
+    """
+    Devuelve un catálogo, leyendo su snapshot binario si está al día
+
+    Si el snapshot no existe o la fuente cambió, se recompila
+    """
+    if nombre in _cargados:
+        return _cargados[nombre]
+
+    modulo, _ = CATALOGOS[nombre]
+    datos = None
+
+    try:
+        with open(_ruta_snapshot(nombre), 'rb') as archivo:
+            firma, contenido = marshal.load(archivo)
+        if firma == _firma_fuente(modulo):
+            datos = contenido
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    if datos is None:
+        datos = compilar(nombre)
+
+    _cargados[nombre] = datos
+    return datos
+
+
+# Precompilar todos los catálogos (paso de build)
+if __name__ == "__main__":
+    print("="*60)
+    print("📦 COMPILACIÓN DE CATÁLOGOS")
+    print("="*60)
+
+    for nombre in CATALOGOS:
+        datos = compilar(nombre)
+        print(f"   ✅ {nombre}: {len(datos)} registros -> {_ruta_snapshot(nombre)}")
+
+    print("="*60)
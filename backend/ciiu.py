@@ -0,0 +1,353 @@
+"""
+Catálogo CIIU Rev. 4 A.C. (DANE) y clasificación de textos de actividad
+Código -> descripción y asignación de código a textos libres con un
+autómata Aho-Corasick por palabras
+"""
+
+import csv
+import math
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import RUTA_CATALOGO_CIIU
+
+
+# Palabras sin contenido para clasificar
+PALABRAS_VACIAS = frozenset(
+    'a al con de del e el en la las los o para por sus su u y otro otra otros otras '
+    'n c p ncp tipo tipos incluye similares conexas conexos diferentes general'.split()
+)
+
+# Lo que sigue a estas palabras describe exclusiones, no la actividad
+CORTES = ('excepto',)
+
+# Palabras que indican que el texto no describe una actividad
+MARCADORES_SIN_DATO = frozenset({'determinar', 'definir', 'disponible'})
+
+# Palabras de uso común -> palabra equivalente de las descripciones oficiales
+SINONIMOS = {
+    'venta': 'comercio',
+    'ropa': 'prenda',
+    'repuesto': 'autoparte',
+    'vivienda': 'residencial',
+}
+
+# Letras iniciales que se conservan de cada palabra: une variantes como
+# alimentos/alimenticios o informática/informáticos sin un lematizador
+LONGITUD_RAIZ = 7
+
+# Términos de uso común que no aparecen en las descripciones oficiales
+ALIAS = {
+    'software': '6201',
+    'desarrollo software': '6201',
+    'restaurante': '5611',
+    'supermercado': '4711',
+    'tienda': '4711',
+    'drogueria': '4773',
+    'farmacia': '4773',
+    'ferreteria': '4752',
+    'hotel': '5511',
+    'banco': '6412',
+    'abogado': '6910',
+    'contable': '6920',
+    'contador': '6920',
+    'constructora': '4111',
+    'panaderia': '1081',
+    'transportadora': '4923',
+    'aerolinea': '5111',
+    'petrolera': '0610',
+    'hospital': '8610',
+    'colegio': '8521',
+    'universidad': '8544',
+    'vigilancia': '8010',
+    'inmobiliaria': '6810',
+}
+
+# Peso de una frase (2 o 3 palabras seguidas) frente a una palabra suelta
+PESO_FRASE = 0.5
+
+# Peso extra de un alias frente a las palabras de las descripciones
+PESO_ALIAS = 3.0
+
+# Puntaje mínimo para asignar un código
+PUNTAJE_MINIMO = 1.0
+
+# Textos ya clasificados (los textos de actividad se repiten mucho)
+MAX_MEMORIA = 200000
+
+_CODIGO_INICIAL = re.compile(r'^\s*(\d{4})\b')
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+_MARCADORES = frozenset(marcador[:LONGITUD_RAIZ] for marcador in MARCADORES_SIN_DATO)
+
+
+def _singular(palabra: str) -> str:
+    """Singular aproximado (productos -> producto, actividades -> actividad)"""
+    if len(palabra) > 5 and palabra.endswith('es') and palabra[-3] in 'dlnrz':
+        return palabra[:-2]
+    if len(palabra) > 3 and palabra.endswith('s'):
+        return palabra[:-1]
+    return palabra
+
+
+def normalizar(texto: str) -> Tuple[str, ...]:
+    """
+    Raíces de las palabras con contenido: sin tildes, en minúsculas y sin
+    lo que sigue a 'excepto'
+    """
+    plano = unicodedata.normalize('NFKD', texto.lower()).encode('ascii', 'ignore').decode('ascii')
+    palabras = []
+    for palabra in _NO_ALFANUMERICO.split(plano):
+        if palabra in CORTES:
+            break
+        if palabra and palabra not in PALABRAS_VACIAS and not palabra.isdigit():
+            palabra = _singular(palabra)
+            palabras.append(SINONIMOS.get(palabra, palabra)[:LONGITUD_RAIZ])
+    return tuple(palabras)
+
+
+class Automata:
+    """
+    Aho-Corasick sobre secuencias de palabras
+
+    Cada nodo es un dict palabra -> nodo; los enlaces de falla permiten
+    encontrar todos los patrones en una sola pasada por el texto.
+    """
+
+    def __init__(self):
+        self._hijos: List[Dict[str, int]] = [{}]
+        self._falla: List[int] = [0]
+        self._salidas: List[List[int]] = [[]]
+
+    def agregar(self, patron: Tuple[str, ...], identificador: int):
+        nodo = 0
+        for palabra in patron:
+            siguiente = self._hijos[nodo].get(palabra)
+            if siguiente is None:
+                siguiente = len(self._hijos)
+                self._hijos[nodo][palabra] = siguiente
+                self._hijos.append({})
+                self._falla.append(0)
+                self._salidas.append([])
+            nodo = siguiente
+        self._salidas[nodo].append(identificador)
+
+    def construir(self):
+        """Calcula los enlaces de falla (recorrido por niveles)"""
+        cola = list(self._hijos[0].values())
+        for nodo in cola:
+            for palabra, hijo in self._hijos[nodo].items():
+                falla = self._falla[nodo]
+                while falla and palabra not in self._hijos[falla]:
+                    falla = self._falla[falla]
+                destino = self._hijos[falla].get(palabra, 0)
+                self._falla[hijo] = destino if destino != hijo else 0
+                self._salidas[hijo].extend(self._salidas[self._falla[hijo]])
+                cola.append(hijo)
+
+    def buscar(self, palabras: Iterable[str]) -> List[int]:
+        """Identificadores de todos los patrones presentes en el texto"""
+        hijos, falla, salidas = self._hijos, self._falla, self._salidas
+        nodo = 0
+        encontrados = []
+        for palabra in palabras:
+            while nodo and palabra not in hijos[nodo]:
+                nodo = falla[nodo]
+            nodo = hijos[nodo].get(palabra, 0)
+            if salidas[nodo]:
+                encontrados.extend(salidas[nodo])
+        return encontrados
+
+
+class CatalogoCIIU:
+    """
+    Índice en memoria del catálogo CIIU
+
+    - descripcion(): búsqueda directa por código
+    - clasificar(): código más probable para un texto libre. Los patrones
+      son los n-gramas (1 a 3 palabras) de cada descripción, pesados por
+      longitud y por lo poco comunes que son en el catálogo, más ALIAS.
+      Un texto que empieza por un código del catálogo o es igual a una
+      descripción se resuelve sin puntuar.
+    """
+
+    def __init__(self, descripciones: Dict[str, str]):
+        self.descripciones = descripciones
+        self._exactos: Dict[Tuple[str, ...], str] = {}
+        # Por patrón: código -> peso ya dividido por la norma del código
+        self._patrones: List[Dict[str, float]] = []
+        self._memoria: Dict[str, Optional[str]] = {}
+        self._construir()
+
+    def __len__(self) -> int:
+        return len(self.descripciones)
+
+    def _construir(self):
+        # Patrón -> códigos cuya descripción lo contiene
+        codigos_por_patron: Dict[Tuple[str, ...], set] = defaultdict(set)
+        for codigo, descripcion in self.descripciones.items():
+            palabras = normalizar(descripcion)
+            self._exactos.setdefault(palabras, codigo)
+            for n in (1, 2, 3):
+                for i in range(len(palabras) - n + 1):
+                    codigos_por_patron[palabras[i:i + n]].add(codigo)
+
+        # El puntaje se divide por el tamaño de la descripción del código
+        self._norma = {
+            codigo: math.sqrt(len(normalizar(descripcion)) or 1)
+            for codigo, descripcion in self.descripciones.items()
+        }
+
+        total = len(self.descripciones)
+        self._automata = Automata()
+        for patron, codigos in codigos_por_patron.items():
+            # Las frases solo desempatan: el peso lo llevan las palabras raras
+            peso = math.log(1 + total / len(codigos)) * (1 if len(patron) == 1 else PESO_FRASE)
+            self._agregar_patron(patron, {codigo: peso for codigo in sorted(codigos)})
+
+        for texto, codigo in ALIAS.items():
+            if codigo in self.descripciones:
+                peso = PESO_ALIAS * math.log(1 + total)
+                self._agregar_patron(normalizar(texto), {codigo: peso})
+
+        self._automata.construir()
+
+    def _agregar_patron(self, patron: Tuple[str, ...], pesos: Dict[str, float]):
+        self._automata.agregar(patron, len(self._patrones))
+        self._patrones.append({codigo: peso / self._norma[codigo] for codigo, peso in pesos.items()})
+
+    def descripcion(self, codigo: str) -> Optional[str]:
+        return self.descripciones.get(codigo)
+
+    def clasificar(self, texto: Optional[str]) -> Optional[str]:
+        """
+        Código CIIU para un texto de actividad, o None si no hay
+        coincidencia suficiente
+        """
+        if not texto:
+            return None
+
+        codigo = self._memoria.get(texto)
+        if codigo is not None or texto in self._memoria:
+            return codigo
+
+        codigo = self._clasificar(texto)
+        if len(self._memoria) >= MAX_MEMORIA:
+            self._memoria.clear()
+        self._memoria[texto] = codigo
+        return codigo
+
+    def _clasificar(self, texto: str) -> Optional[str]:
+        # Texto con el código adelante ('4711 - Comercio...'): manda el código
+        # si existe en el catálogo; si no (un año, un número de local) se
+        # clasifica por la descripción
+        inicial = _CODIGO_INICIAL.match(texto)
+        if inicial and inicial.group(1) in self.descripciones:
+            return inicial.group(1)
+
+        palabras = normalizar(texto)
+        if _MARCADORES.intersection(palabras):
+            return None
+        if palabras in self._exactos:
+            return self._exactos[palabras]
+
+        puntajes: Dict[str, float] = {}
+        obtener = puntajes.get
+        for identificador in set(self._automata.buscar(palabras)):
+            for codigo, peso in self._patrones[identificador].items():
+                puntajes[codigo] = obtener(codigo, 0.0) + peso
+        if not puntajes:
+            return None
+
+        codigo = max(puntajes, key=obtener)
+        return codigo if puntajes[codigo] >= PUNTAJE_MINIMO else None
+
+    def clasificar_lote(self, textos: Iterable[Optional[str]]) -> List[Optional[str]]:
+        """Clasifica muchos textos (ingesta y reparseo masivo)"""
+        clasificar = self.clasificar
+        return [clasificar(texto) for texto in textos]
+
+    @classmethod
+    def desde_csv(cls, ruta: str) -> 'CatalogoCIIU':
+        """
+        Carga el catálogo (separado por ; o ,)
+
+        Columnas: codigo, descripcion. Solo se toman las clases (4 dígitos);
+        secciones, divisiones y grupos del archivo del DANE se omiten
+        """
+        descripciones = {}
+
+        with open(ruta, encoding='utf-8', newline='') as archivo:
+            muestra = archivo.read(2048)
+            archivo.seek(0)
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=';,')
+
+            for fila in csv.DictReader(archivo, dialect=dialecto):
+                codigo = (fila.get('codigo') or '').strip()
+                descripcion = (fila.get('descripcion') or '').strip()
+                if len(codigo) == 4 and codigo.isdigit() and descripcion:
+                    descripciones[codigo] = descripcion
+
+        return cls(descripciones)
+
+
+# Catálogo del proceso (se carga en el primer uso)
+_catalogo: Optional[CatalogoCIIU] = None
+_catalogo_cargado = False
+
+
+def obtener_catalogo() -> Optional[CatalogoCIIU]:
+    """Devuelve el catálogo o None si no hay archivo disponible"""
+    global _catalogo, _catalogo_cargado
+    if not _catalogo_cargado:
+        if os.path.exists(RUTA_CATALOGO_CIIU):
+            _catalogo = CatalogoCIIU.desde_csv(RUTA_CATALOGO_CIIU)
+        _catalogo_cargado = True
+    return _catalogo
+
+
+def codigo_para(actividad: Optional[str]) -> Optional[str]:
+    """Código CIIU de un texto de actividad (None sin catálogo o sin coincidencia)"""
+    catalogo = obtener_catalogo()
+    return catalogo.clasificar(actividad) if catalogo else None
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    catalogo = obtener_catalogo()
+
+    print("="*60)
+    print(f"🏷️  CATÁLOGO CIIU: {len(catalogo) if catalogo else 0} clases")
+    print("="*60)
+
+    textos = sys.argv[1:] or [
+        'Comercio al por mayor de alimentos',
+        'Desarrollo de software a la medida',
+        'Transporte de carga por carretera',
+        'Restaurante y cafetería',
+        'Actividad económica por determinar',
+    ]
+    for texto in textos:
+        codigo = catalogo.clasificar(texto)
+        print(f"   {texto[:40]:40s} -> {codigo} {catalogo.descripcion(codigo) or ''}")
+
+    # Textos distintos: mide la clasificación sin memoria
+    lote = [
+        f"{' '.join(descripcion.split()[1:])} {i}"
+        for i in range(20) for descripcion in catalogo.descripciones.values()
+    ]
+    inicio = time.perf_counter()
+    catalogo.clasificar_lote(lote)
+    distintos = len(lote) / (time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    catalogo.clasificar_lote(lote)
+    repetidos = len(lote) / (time.perf_counter() - inicio)
+
+    print(f"\n   Textos distintos:  {distintos:,.0f}/seg")
+    print(f"   Textos repetidos:  {repetidos:,.0f}/seg")
+    print("="*60)
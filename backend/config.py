@@ -0,0 +1,164 @@
+"""
+Configuración del backend
+Valores por defecto sobreescribibles con variables de entorno
+"""
+
+import os
+
+# Directorio base del backend
+DIRECTORIO_BACKEND = os.path.dirname(os.path.abspath(__file__))
+
+# Estado local generado en ejecución (bases SQLite, snapshots)
+DIRECTORIO_ALMACEN = os.getenv(
+    'DIRECTORIO_ALMACEN',
+    os.path.join(DIRECTORIO_BACKEND, 'almacen')
+)
+
+# Snapshots de score
+SNAPSHOTS_HABILITADOS = os.getenv('SNAPSHOTS_HABILITADOS', '1') == '1'
+SNAPSHOTS_WORKERS = int(os.getenv('SNAPSHOTS_WORKERS', '0')) or None  # None = núcleos disponibles
+
+# Integración RUES (scraping en vivo, desactivada por defecto)
+RUES_HABILITADO = os.getenv('RUES_HABILITADO', '0') == '1'
+RUES_TIMEOUT = float(os.getenv('RUES_TIMEOUT', '15'))
+
+# Pool de procesos para parseo de HTML
+PARSEO_WORKERS = int(os.getenv('PARSEO_WORKERS', '2'))
+PARSEO_MAX_PENDIENTES = int(os.getenv('PARSEO_MAX_PENDIENTES', '32'))
+PARSEO_TIMEOUT = float(os.getenv('PARSEO_TIMEOUT', '5'))
+PARSEO_TAREAS_POR_WORKER = int(os.getenv('PARSEO_TAREAS_POR_WORKER', '500'))
+
+# Registro local de operadores de comercio exterior (extracto de datos abiertos DIAN)
+RUTA_REGISTRO_ADUANA = os.getenv(
+    'RUTA_REGISTRO_ADUANA',
+    os.path.join(DIRECTORIO_BACKEND, 'datos', 'registro_aduana.csv')
+)
+ADUANA_DIAS_ACTIVO = int(os.getenv('ADUANA_DIAS_ACTIVO', '365'))
+
+# DIAN: estado del RUT en MUISCA (formulario JSF, desactivada por defecto)
+DIAN_HABILITADO = os.getenv('DIAN_HABILITADO', '0') == '1'
+DIAN_URL_RUT = os.getenv(
+    'DIAN_URL_RUT',
+    'https://muisca.dian.gov.co/WebRutMuisca/DefConsultaEstadoRUT.faces'
+)
+DIAN_TIMEOUT = float(os.getenv('DIAN_TIMEOUT', '15'))
+# Sesiones JSF calientes (cookies + ViewState) que se reutilizan entre consultas
+DIAN_SESIONES = int(os.getenv('DIAN_SESIONES', '4'))
+DIAN_SESION_MAX_USOS = int(os.getenv('DIAN_SESION_MAX_USOS', '500'))
+# Menor que el timeout de sesión del servidor: se renegocia antes de que expire
+DIAN_SESION_INACTIVA_SEGUNDOS = float(os.getenv('DIAN_SESION_INACTIVA_SEGUNDOS', '600'))
+DIAN_TTL_CACHE = float(os.getenv('DIAN_TTL_CACHE', str(7 * 86400)))
+
+# ICA municipal: portales de las alcaldías (ver integrations/ica)
+# URL de cada portal en ICA_URL_<CLAVE> (p. ej. ICA_URL_BOGOTA); sin URL
+# el municipio no se consulta y la obligación queda 'Por verificar'
+ICA_URLS = {
+    clave[len('ICA_URL_'):].lower(): url
+    for clave, url in os.environ.items()
+    if clave.startswith('ICA_URL_') and url
+}
+ICA_TIMEOUT = float(os.getenv('ICA_TIMEOUT', '10'))
+# Conexiones (y consultas simultáneas) por host municipal
+ICA_MAX_CONEXIONES_HOST = int(os.getenv('ICA_MAX_CONEXIONES_HOST', '4'))
+# Un resultado al día vale hasta el siguiente vencimiento del calendario;
+# uno pendiente se vuelve a consultar tras ICA_TTL_PENDIENTE
+ICA_TTL_MAXIMO = float(os.getenv('ICA_TTL_MAXIMO', str(400 * 86400)))
+ICA_TTL_PENDIENTE = float(os.getenv('ICA_TTL_PENDIENTE', '86400'))
+
+# Catálogo CIIU Rev. 4 A.C. del DANE (codigo;descripcion)
+RUTA_CATALOGO_CIIU = os.getenv(
+    'RUTA_CATALOGO_CIIU',
+    os.path.join(DIRECTORIO_BACKEND, 'datos', 'ciiu_rev4.csv')
+)
+
+# Snapshots binarios de catálogos de referencia (ver catalogos.py)
+DIRECTORIO_CATALOGOS = os.getenv(
+    'DIRECTORIO_CATALOGOS',
+    os.path.join(DIRECTORIO_BACKEND, 'datos', 'compilados')
+)
+
+# Cache de empresas y scores
+# 'memoria': por proceso | 'compartido': mmap compartido entre workers del host
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memoria')
+CACHE_MAX_ENTRADAS = int(os.getenv('CACHE_MAX_ENTRADAS', '10000'))
+CACHE_TTL_EMPRESAS = float(os.getenv('CACHE_TTL_EMPRESAS', '3600'))
+CACHE_TTL_SCORES = float(os.getenv('CACHE_TTL_SCORES', '3600'))
+CACHE_COMPARTIDO_RUTA = os.getenv(
+    'CACHE_COMPARTIDO_RUTA',
+    os.path.join(DIRECTORIO_ALMACEN, 'cache_compartido.mmap')
+)
+CACHE_COMPARTIDO_TAM_SLOT = int(os.getenv('CACHE_COMPARTIDO_TAM_SLOT', '4096'))
+
+# Cache de resultados de integraciones: L1 en memoria sobre L2 en disco
+CACHE_INTEGRACIONES_BACKEND = os.getenv('CACHE_INTEGRACIONES_BACKEND', 'niveles')
+CACHE_L1_MAX_ENTRADAS = int(os.getenv('CACHE_L1_MAX_ENTRADAS', '1000'))
+CACHE_L1_TTL = float(os.getenv('CACHE_L1_TTL', '300'))
+CACHE_DISCO_MAX_BYTES = int(os.getenv('CACHE_DISCO_MAX_BYTES', str(256 * 1024 * 1024)))
+RUES_TTL_CACHE = float(os.getenv('RUES_TTL_CACHE', '86400'))
+
+# Popularidad de NITs consultados: sketch count-min con decaimiento
+# (memoria: ancho x profundidad contadores de 4 bytes por worker)
+POPULARIDAD_ANCHO = int(os.getenv('POPULARIDAD_ANCHO', '4096'))
+POPULARIDAD_PROFUNDIDAD = int(os.getenv('POPULARIDAD_PROFUNDIDAD', '4'))
+# Los contadores se reducen a la mitad cada vida media
+POPULARIDAD_VIDA_MEDIA_SEGUNDOS = float(os.getenv('POPULARIDAD_VIDA_MEDIA_SEGUNDOS', '3600'))
+# NITs más consultados que se siguen por nombre (top-K)
+POPULARIDAD_CANDIDATOS = int(os.getenv('POPULARIDAD_CANDIDATOS', '256'))
+# Con el cache en memoria lleno, una entrada nueva solo desaloja a una
+# consultada con la misma o menor frecuencia
+CACHE_ADMISION_POR_FRECUENCIA = os.getenv('CACHE_ADMISION_POR_FRECUENCIA', '1') == '1'
+
+# Calentador: refresca en segundo plano las empresas más consultadas
+# antes de que venza su entrada en cache
+CALENTADOR_HABILITADO = os.getenv('CALENTADOR_HABILITADO', '1') == '1'
+CALENTADOR_INTERVALO_SEGUNDOS = float(os.getenv('CALENTADOR_INTERVALO_SEGUNDOS', '60'))
+CALENTADOR_TOP = int(os.getenv('CALENTADOR_TOP', '50'))
+CALENTADOR_MIN_FRECUENCIA = int(os.getenv('CALENTADOR_MIN_FRECUENCIA', '3'))
+# Se refresca lo que vence dentro de este margen
+CALENTADOR_ANTICIPACION_SEGUNDOS = float(os.getenv('CALENTADOR_ANTICIPACION_SEGUNDOS', '300'))
+
+# Cache negativo: NITs confirmados como inexistentes en las fuentes reales
+CACHE_TTL_NEGATIVO = float(os.getenv('CACHE_TTL_NEGATIVO', '21600'))
+
+# Reintentos y consultas de cobertura (hedging) a fuentes externas
+# Los intentos extra no superan esta fracción de las consultas originales
+PRESUPUESTO_REINTENTOS_PROPORCION = float(os.getenv('PRESUPUESTO_REINTENTOS_PROPORCION', '0.1'))
+PRESUPUESTO_REINTENTOS_MAXIMO = float(os.getenv('PRESUPUESTO_REINTENTOS_MAXIMO', '10'))
+# Muestras de latencia necesarias antes de usar el p95 de una fuente
+COBERTURA_MIN_MUESTRAS = int(os.getenv('COBERTURA_MIN_MUESTRAS', '20'))
+
+# Plazo total por consulta (segundos); sobreescribible por llamada
+PLAZO_CONSULTA_SEGUNDOS = float(os.getenv('PLAZO_CONSULTA_SEGUNDOS', '20'))
+
+# Consultas por lote: NITs por solicitud y plazo total del lote
+LOTE_MAX_NITS = int(os.getenv('LOTE_MAX_NITS', '500'))
+PLAZO_LOTE_SEGUNDOS = float(os.getenv('PLAZO_LOTE_SEGUNDOS', '120'))
+
+# Fuentes principales de mayor a menor precedencia al fusionar campos
+PRECEDENCIA_FUENTES = os.getenv('PRECEDENCIA_FUENTES', 'RUES,ALMACEN_RUES,DATOS_EJEMPLO').split(',')
+
+# Trazas y logs estructurados (JSON por línea); vacío = solo consola
+TRAZAS_ARCHIVO = os.getenv('TRAZAS_ARCHIVO', os.path.join(DIRECTORIO_ALMACEN, 'trazas.jsonl'))
+# Solo se exportan las trazas de requests que tarden al menos esto (ms);
+# las de salud, estado y administración nunca (0 = todas las demás)
+TRAZAS_UMBRAL_MS = float(os.getenv('TRAZAS_UMBRAL_MS', '250'))
+LOG_NIVEL = os.getenv('LOG_NIVEL', 'INFO')
+
+# Token de los endpoints de administración (cabecera X-Admin-Token)
+# Vacío = endpoints de administración deshabilitados
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+# Control de admisión por worker: consultas en curso y cola de espera
+ADMISION_MAX_EN_CURSO = int(os.getenv('ADMISION_MAX_EN_CURSO', '32'))
+ADMISION_MAX_ESPERA = int(os.getenv('ADMISION_MAX_ESPERA', '64'))
+ADMISION_ESPERA_SEGUNDOS = float(os.getenv('ADMISION_ESPERA_SEGUNDOS', '2'))
+
+# Archivo de respuestas crudas de las fuentes (direccionado por contenido)
+ARCHIVO_HABILITADO = os.getenv('ARCHIVO_HABILITADO', '1') == '1'
+DIRECTORIO_ARCHIVO = os.getenv('DIRECTORIO_ARCHIVO', os.path.join(DIRECTORIO_ALMACEN, 'archivo'))
+ARCHIVO_RETENCION_DIAS = float(os.getenv('ARCHIVO_RETENCION_DIAS', '365'))
+ARCHIVO_MAX_CAPTURAS_POR_NIT = int(os.getenv('ARCHIVO_MAX_CAPTURAS_POR_NIT', '10'))
+
+# Reparseo masivo de páginas archivadas hacia el almacén de empresas
+REPARSEO_WORKERS = int(os.getenv('REPARSEO_WORKERS', str(os.cpu_count() or 2)))
+REPARSEO_LOTE = int(os.getenv('REPARSEO_LOTE', '2000'))
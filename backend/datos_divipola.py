@@ -0,0 +1,139 @@
+"""
+Codificación DIVIPOLA del DANE: departamentos y municipios
+Se compila a un índice de variantes de nombre (ver divipola.py y catalogos.py)
+"""
+
+from divipola import construir_indice
+
+
+# Código de departamento -> nombre canónico
+DEPARTAMENTOS = {
+    '05': 'ANTIOQUIA',
+    '08': 'ATLÁNTICO',
+    '11': 'BOGOTÁ D.C.',
+    '13': 'BOLÍVAR',
+    '15': 'BOYACÁ',
+    '17': 'CALDAS',
+    '18': 'CAQUETÁ',
+    '19': 'CAUCA',
+    '20': 'CESAR',
+    '23': 'CÓRDOBA',
+    '25': 'CUNDINAMARCA',
+    '27': 'CHOCÓ',
+    '41': 'HUILA',
+    '44': 'LA GUAJIRA',
+    '47': 'MAGDALENA',
+    '50': 'META',
+    '52': 'NARIÑO',
+    '54': 'NORTE DE SANTANDER',
+    '63': 'QUINDÍO',
+    '66': 'RISARALDA',
+    '68': 'SANTANDER',
+    '70': 'SUCRE',
+    '73': 'TOLIMA',
+    '76': 'VALLE DEL CAUCA',
+    '81': 'ARAUCA',
+    '85': 'CASANARE',
+    '86': 'PUTUMAYO',
+    '88': 'SAN ANDRÉS Y PROVIDENCIA',
+    '91': 'AMAZONAS',
+    '94': 'GUAINÍA',
+    '95': 'GUAVIARE',
+    '97': 'VAUPÉS',
+    '99': 'VICHADA',
+}
+
+# Otras formas en que llegan los departamentos
+ALIAS_DEPARTAMENTOS = {
+    '08': ('ATLANTICO',),
+    '11': ('BOGOTA', 'BOGOTA DISTRITO CAPITAL', 'DISTRITO CAPITAL', 'SANTAFE DE BOGOTA'),
+    '44': ('GUAJIRA',),
+    '54': ('NORTE SANTANDER', 'N DE SANTANDER', 'N SANTANDER'),
+    '76': ('VALLE',),
+    '88': (
+        'SAN ANDRES',
+        'ARCHIPIELAGO DE SAN ANDRES',
+        'ARCHIPIELAGO DE SAN ANDRES PROVIDENCIA Y SANTA CATALINA',
+        'SAN ANDRES PROVIDENCIA Y SANTA CATALINA',
+    ),
+}
+
+# (código DIVIPOLA, nombre canónico, otras formas del nombre)
+# Capitales de departamento y municipios con más empresas matriculadas
+MUNICIPIOS = (
+    ('05001', 'MEDELLÍN', ()),
+    ('05045', 'APARTADÓ', ()),
+    ('05088', 'BELLO', ()),
+    ('05154', 'CAUCASIA', ()),
+    ('05266', 'ENVIGADO', ()),
+    ('05360', 'ITAGÜÍ', ()),
+    ('05615', 'RIONEGRO', ()),
+    ('05631', 'SABANETA', ()),
+    ('05837', 'TURBO', ()),
+    ('08001', 'BARRANQUILLA', ('DISTRITO DE BARRANQUILLA',)),
+    ('08433', 'MALAMBO', ()),
+    ('08758', 'SOLEDAD', ()),
+    ('11001', 'BOGOTÁ D.C.', ('BOGOTA', 'BOGOTA DISTRITO CAPITAL', 'SANTAFE DE BOGOTA', 'SANTA FE DE BOGOTA')),
+    ('13001', 'CARTAGENA DE INDIAS', ('CARTAGENA',)),
+    ('13430', 'MAGANGUÉ', ()),
+    ('15001', 'TUNJA', ()),
+    ('15238', 'DUITAMA', ()),
+    ('15759', 'SOGAMOSO', ()),
+    ('17001', 'MANIZALES', ()),
+    ('17380', 'LA DORADA', ()),
+    ('18001', 'FLORENCIA', ()),
+    ('19001', 'POPAYÁN', ()),
+    ('20001', 'VALLEDUPAR', ()),
+    ('20011', 'AGUACHICA', ()),
+    ('23001', 'MONTERÍA', ()),
+    ('25126', 'CAJICÁ', ()),
+    ('25175', 'CHÍA', ()),
+    ('25269', 'FACATATIVÁ', ()),
+    ('25286', 'FUNZA', ()),
+    ('25473', 'MOSQUERA', ()),
+    ('25754', 'SOACHA', ()),
+    ('25899', 'ZIPAQUIRÁ', ()),
+    ('27001', 'QUIBDÓ', ()),
+    ('41001', 'NEIVA', ()),
+    ('41551', 'PITALITO', ()),
+    ('44001', 'RIOHACHA', ()),
+    ('44430', 'MAICAO', ()),
+    ('47001', 'SANTA MARTA', ('SANTA MARTA DTCH',)),
+    ('47189', 'CIÉNAGA', ()),
+    ('50001', 'VILLAVICENCIO', ()),
+    ('52001', 'PASTO', ('SAN JUAN DE PASTO',)),
+    ('52356', 'IPIALES', ()),
+    ('52835', 'TUMACO', ('SAN ANDRES DE TUMACO',)),
+    ('54001', 'CÚCUTA', ('SAN JOSE DE CUCUTA',)),
+    ('54874', 'VILLA DEL ROSARIO', ()),
+    ('63001', 'ARMENIA', ()),
+    ('66001', 'PEREIRA', ()),
+    ('66170', 'DOSQUEBRADAS', ()),
+    ('68001', 'BUCARAMANGA', ()),
+    ('68081', 'BARRANCABERMEJA', ()),
+    ('68276', 'FLORIDABLANCA', ()),
+    ('68307', 'GIRÓN', ('SAN JUAN DE GIRON',)),
+    ('68547', 'PIEDECUESTA', ()),
+    ('70001', 'SINCELEJO', ()),
+    ('73001', 'IBAGUÉ', ()),
+    ('73268', 'ESPINAL', ('EL ESPINAL',)),
+    ('76001', 'CALI', ('SANTIAGO DE CALI',)),
+    ('76109', 'BUENAVENTURA', ()),
+    ('76111', 'GUADALAJARA DE BUGA', ('BUGA',)),
+    ('76147', 'CARTAGO', ()),
+    ('76364', 'JAMUNDÍ', ()),
+    ('76520', 'PALMIRA', ()),
+    ('76834', 'TULUÁ', ()),
+    ('76892', 'YUMBO', ()),
+    ('81001', 'ARAUCA', ()),
+    ('85001', 'YOPAL', ()),
+    ('86001', 'MOCOA', ()),
+    ('88001', 'SAN ANDRÉS', ()),
+    ('91001', 'LETICIA', ()),
+    ('94001', 'INÍRIDA', ('PUERTO INIRIDA',)),
+    ('95001', 'SAN JOSÉ DEL GUAVIARE', ()),
+    ('97001', 'MITÚ', ()),
+    ('99001', 'PUERTO CARREÑO', ()),
+)
+
+INDICE_DIVIPOLA = construir_indice(DEPARTAMENTOS, ALIAS_DEPARTAMENTOS, MUNICIPIOS)
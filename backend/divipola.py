@@ -0,0 +1,193 @@
+"""
+Nomenclátor DIVIPOLA: cualquier escritura de un municipio o departamento
+-> código DANE y nombre canónico
+
+Las variantes (tildes, puntuación, abreviaturas, alias) se precalculan en
+el índice compilado (catalogos.py), así cada búsqueda es una normalización
+y una consulta a un diccionario
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+import catalogos
+
+
+# Sufijos que no distinguen el lugar ('BOGOTÁ D.C.', 'SANTA MARTA D.T.C.H.')
+SUFIJOS = ('D C', 'DC', 'D T C H', 'DTCH', 'D T')
+
+# Búsquedas ya resueltas (los mismos nombres se repiten en cada lote)
+MAX_MEMORIA = 50000
+
+_NO_ALFANUMERICO = re.compile(r'[^A-Z0-9]+')
+
+
+class Departamento(NamedTuple):
+    codigo: str
+    nombre: str
+
+
+class Municipio(NamedTuple):
+    codigo: str
+    nombre: str
+    codigo_departamento: str
+    departamento: str
+
+
+def clave(texto: str) -> str:
+    """Forma de comparación: mayúsculas sin tildes ni puntuación"""
+    plano = unicodedata.normalize('NFKD', texto.upper()).encode('ascii', 'ignore').decode('ascii')
+    return _NO_ALFANUMERICO.sub(' ', plano).strip()
+
+
+def _sin_sufijo(texto_clave: str) -> str:
+    for sufijo in SUFIJOS:
+        if texto_clave.endswith(' ' + sufijo):
+            return texto_clave[:-len(sufijo) - 1]
+    return texto_clave
+
+
+def _variantes(nombres: Iterable[str]) -> set:
+    """Claves de un nombre y sus alias, con y sin sufijo de distrito"""
+    claves = set()
+    for nombre in nombres:
+        base = clave(nombre)
+        claves.update((base, _sin_sufijo(base)))
+    return claves
+
+
+def construir_indice(
+    departamentos: Dict[str, str],
+    alias_departamentos: Dict[str, Tuple[str, ...]],
+    municipios: Iterable[Tuple[str, str, Tuple[str, ...]]]
+) -> Dict:
+    """
+    Índice de variantes (se ejecuta al compilar el catálogo)
+
+    Un nombre de municipio repetido en varios departamentos solo se
+    resuelve junto con el departamento ('clave|código de departamento')
+
+    El snapshot se invalida cuando cambia datos_divipola.py; si cambia
+    esta función hay que recompilar (python catalogos.py)
+    """
+    indice = {
+        'departamentos': {},
+        'municipios': {},
+        'municipios_departamento': {},
+        'nombres_departamento': dict(departamentos),
+        'nombres_municipio': {},
+    }
+
+    for codigo, nombre in departamentos.items():
+        for variante in _variantes((nombre,) + alias_departamentos.get(codigo, ())):
+            indice['departamentos'][variante] = codigo
+
+    for codigo, nombre, alias in municipios:
+        indice['nombres_municipio'][codigo] = nombre
+        for variante in _variantes((nombre,) + alias):
+            indice['municipios_departamento'][f'{variante}|{codigo[:2]}'] = codigo
+            # None: ambiguo sin departamento
+            previo = indice['municipios'].get(variante, codigo)
+            indice['municipios'][variante] = codigo if previo == codigo else None
+
+    return indice
+
+
+_memoria: Dict[Tuple, Optional[Municipio]] = {}
+
+
+def _indice() -> Dict:
+    return catalogos.cargar('divipola')
+
+
+def departamento(texto: Optional[str]) -> Optional[Departamento]:
+    """Departamento por nombre en cualquier escritura (None si no se reconoce)"""
+    if not texto:
+        return None
+    indice = _indice()
+    codigo = indice['departamentos'].get(clave(texto))
+    if codigo is None:
+        return None
+    return Departamento(codigo, indice['nombres_departamento'][codigo])
+
+
+def municipio(texto: Optional[str], nombre_departamento: Optional[str] = None) -> Optional[Municipio]:
+    """
+    Municipio por nombre en cualquier escritura
+
+    Args:
+        texto: Nombre del municipio ('Bogota', 'MEDELLÍN', 'Cali - Valle')
+        nombre_departamento: Opcional, desambigua nombres repetidos
+
+    Returns:
+        Municipio canónico o None si no se reconoce (o si el departamento
+        se reconoce y el municipio no está en él)
+    """
+    if not texto:
+        return None
+
+    llave = (texto, nombre_departamento)
+    if llave in _memoria:
+        return _memoria[llave]
+
+    resultado = _buscar_municipio(texto, nombre_departamento)
+    if len(_memoria) >= MAX_MEMORIA:
+        _memoria.clear()
+    _memoria[llave] = resultado
+    return resultado
+
+
+def _buscar_municipio(texto: str, nombre_departamento: Optional[str]) -> Optional[Municipio]:
+    indice = _indice()
+    dpto = departamento(nombre_departamento)
+
+    # 'MEDELLÍN (ANTIOQUIA)' o 'CALI - VALLE': el nombre va primero
+    completo, primero = clave(texto), clave(re.split(r'\(| - |,', texto)[0])
+    for candidato in dict.fromkeys((completo, _sin_sufijo(completo), primero, _sin_sufijo(primero))):
+        # Con departamento reconocido solo valen sus municipios: un nombre
+        # que no está bajo él (p. ej. Rionegro, Santander, si el catálogo
+        # solo trae el de Antioquia) no se resuelve a otro departamento
+        if dpto:
+            codigo = indice['municipios_departamento'].get(f'{candidato}|{dpto.codigo}')
+        else:
+            codigo = indice['municipios'].get(candidato)
+        if codigo:
+            return Municipio(
+                codigo,
+                indice['nombres_municipio'][codigo],
+                codigo[:2],
+                indice['nombres_departamento'][codigo[:2]]
+            )
+    return None
+
+
+def canonizar(datos: Dict) -> Dict:
+    """
+    Reemplaza municipio y departamento de un registro por sus nombres
+    canónicos y agrega codigo_municipio (lo no reconocido queda igual;
+    el departamento nunca se cambia por el de un municipio homónimo)
+    """
+    lugar = municipio(datos.get('municipio'), datos.get('departamento'))
+    if lugar:
+        datos['municipio'] = lugar.nombre
+        datos['departamento'] = lugar.departamento
+        datos['codigo_municipio'] = lugar.codigo
+        return datos
+
+    dpto = departamento(datos.get('departamento'))
+    if dpto:
+        datos['departamento'] = dpto.nombre
+    return datos
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("="*60)
+    print("🗺️  NOMENCLÁTOR DIVIPOLA")
+    print("="*60)
+
+    for texto in sys.argv[1:] or ['BOGOTÁ D.C.', 'Bogota', 'MEDELLÍN', 'santiago de cali', 'Cúcuta (Norte de Santander)']:
+        print(f"   {texto:32s} -> {municipio(texto)}")
+    print("="*60)
@@ -0,0 +1,110 @@
+"""
+Normalización de fechas
+Reconoce formatos numéricos y fechas en español sin depender del locale
+"""
+
+import re
+import unicodedata
+from datetime import date
+from functools import lru_cache
+from typing import Optional
+
+
+# Meses en español (nombres completos y abreviaturas)
+MESES = {
+    'enero': 1, 'ene': 1,
+    'febrero': 2, 'feb': 2,
+    'marzo': 3, 'mar': 3,
+    'abril': 4, 'abr': 4,
+    'mayo': 5, 'may': 5,
+    'junio': 6, 'jun': 6,
+    'julio': 7, 'jul': 7,
+    'agosto': 8, 'ago': 8,
+    'septiembre': 9, 'setiembre': 9, 'sep': 9, 'sept': 9, 'set': 9,
+    'octubre': 10, 'oct': 10,
+    'noviembre': 11, 'nov': 11,
+    'diciembre': 12, 'dic': 12,
+}
+
+# 2025-03-20, 2025/03/20, 2025-03-20T10:00:00
+_PATRON_ISO = re.compile(r'^(\d{4})[-/](\d{1,2})[-/](\d{1,2})(?:[T\s].*)?$')
+
+# 20/03/2025, 20-03-2025, 20.03.2025
+_PATRON_NUMERICO = re.compile(r'^(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})$')
+
+# 20 de marzo de 2025, 20 marzo 2025, 20 mar. 2025, 20-mar-2025
+_PATRON_TEXTO = re.compile(
+    r'^(\d{1,2})(?:\s+de\s+|[\s\-/]+)([a-z]+)\.?(?:\s+del?\s+|[\s\-/]+)(\d{4})$'
+)
+
+
+def _plegar(texto: str) -> str:
+    """Minúsculas, sin tildes y con espacios colapsados"""
+    sin_tildes = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sin_tildes.lower().split())
+
+
+def _ordinal(anio: int, mes: int, dia: int) -> Optional[int]:
+    """Ordinal de la fecha o None si no existe (p. ej. 31 de febrero)"""
+    if not (1 <= mes <= 12 and 1 <= dia <= 31):
+        return None
+    try:
+        return date(anio, mes, dia).toordinal()
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=8192)
+def fecha_a_ordinal(texto: Optional[str]) -> Optional[int]:
+    """
+    Convierte una fecha en texto a ordinal (date.toordinal)
+
+    Memoizada: los mismos textos se repiten en cada consulta y score
+
+    Args:
+        texto: Fecha en formato ISO, numérico día/mes/año o texto en español
+
+    Returns:
+        Ordinal o None si no se reconoce
+    """
+    if not texto:
+        return None
+
+    texto = texto.strip()
+
+    coincidencia = _PATRON_ISO.match(texto)
+    if coincidencia:
+        anio, mes, dia = coincidencia.groups()
+        return _ordinal(int(anio), int(mes), int(dia))
+
+    coincidencia = _PATRON_NUMERICO.match(texto)
+    if coincidencia:
+        dia, mes, anio = coincidencia.groups()
+        return _ordinal(int(anio), int(mes), int(dia))
+
+    coincidencia = _PATRON_TEXTO.match(_plegar(texto))
+    if coincidencia:
+        dia, nombre_mes, anio = coincidencia.groups()
+        mes = MESES.get(nombre_mes)
+        if mes:
+            return _ordinal(int(anio), mes, int(dia))
+
+    return None
+
+
+def normalizar_fecha(texto: Optional[str]) -> Optional[str]:
+    """
+    Normaliza una fecha a formato ISO (YYYY-MM-DD)
+
+    Returns:
+        Fecha ISO o None si no se reconoce
+    """
+    ordinal = fecha_a_ordinal(texto)
+    if ordinal is None:
+        return None
+    return date.fromordinal(ordinal).isoformat()
+
+
+def ordinal_hoy() -> int:
+    """Ordinal de la fecha actual"""
+    return date.today().toordinal()
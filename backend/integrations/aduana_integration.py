@@ -1,51 +1,164 @@
 """
 Integración con DIAN - Módulo Aduanas
-Estado: PLACEHOLDER (Futuro)
+Registro local de importadores/exportadores (datos abiertos DIAN)
 """
 
-from typing import Optional, Dict
+import csv
+import hashlib
+import os
+from datetime import date
+from typing import Optional, Dict, List
 from integrations.base_integration import BaseIntegration
+from config import RUTA_REGISTRO_ADUANA, ADUANA_DIAS_ACTIVO
+from fechas import fecha_a_ordinal, ordinal_hoy
+
+
+# Tipos de operador, en el orden en que se empaquetan en el índice
+TIPOS_OPERADOR = ('importador', 'exportador', 'ambos')
+
+
+class RegistroAduana:
+    """
+    Índice compacto de operadores de comercio exterior por NIT
+
+    Cada operador ocupa una entrada int -> int: el NIT como entero y
+    (ordinal de la última operación << 2) | tipo de operador.
+    La búsqueda es una sola consulta al diccionario.
+    """
+
+    def __init__(self):
+        self._operadores: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._operadores)
+
+    def agregar(self, nit: str, tipo: str, ordinal_ultima_operacion: int):
+        """Agrega o actualiza un operador"""
+        tipo_idx = TIPOS_OPERADOR.index(tipo.strip().lower())
+        self._operadores[int(nit)] = (ordinal_ultima_operacion << 2) | tipo_idx
+
+    def buscar(self, nit: str) -> Optional[Dict]:
+        """
+        Busca un operador por NIT
+
+        Returns:
+            Diccionario con tipo y última operación, o None si no está
+        """
+        valor = self._operadores.get(int(nit))
+        if valor is None:
+            return None
+
+        ordinal = valor >> 2
+        return {
+            'tipo': TIPOS_OPERADOR[valor & 0b11],
+            'ultima_operacion': date.fromordinal(ordinal).isoformat(),
+            'ordinal_ultima_operacion': ordinal
+        }
+
+    @classmethod
+    def desde_csv(cls, ruta: str) -> 'RegistroAduana':
+        """
+        Carga un extracto CSV (separado por ; o ,)
+
+        Columnas: nit, tipo_operador, fecha_ultima_operacion
+        Las filas con datos inválidos se omiten
+        """
+        registro = cls()
+
+        with open(ruta, encoding='utf-8', newline='') as archivo:
+            muestra = archivo.read(2048)
+            archivo.seek(0)
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=';,')
+
+            for fila in csv.DictReader(archivo, dialect=dialecto):
+                ordinal = fecha_a_ordinal(fila.get('fecha_ultima_operacion'))
+                if ordinal is None:
+                    continue
+                try:
+                    registro.agregar(
+                        fila['nit'].split('-')[0].strip(),
+                        fila['tipo_operador'],
+                        ordinal
+                    )
+                except (KeyError, ValueError, AttributeError):
+                    continue
+
+        return registro
+
+
+# Registro del proceso (se carga en el primer uso)
+_registro: Optional[RegistroAduana] = None
+_registro_cargado = False
+
+
+def obtener_registro() -> Optional[RegistroAduana]:
+    """Devuelve el registro local o None si no hay extracto disponible"""
+    global _registro, _registro_cargado
+    if not _registro_cargado:
+        if os.path.exists(RUTA_REGISTRO_ADUANA):
+            _registro = RegistroAduana.desde_csv(RUTA_REGISTRO_ADUANA)
+        _registro_cargado = True
+    return _registro
 
 
 class AduanaIntegration(BaseIntegration):
     """
-    Integración con sistema de aduanas
-    
-    Requiere: Convenio institucional con DIAN
-    Estado: Diseñado pero no implementado
+    Integración con el registro de operadores de comercio exterior
+
+    Usa el extracto local de datos abiertos DIAN cuando existe;
+    si no, datos simulados deterministas
     """
-    
+
+    # Empresas grandes conocidas con actividad aduanera (para simulación)
+    EMPRESAS_GRANDES = frozenset({
+        '890903938',  # Bancolombia
+        '860034313',  # Ecopetrol
+        '890900608',  # Éxito
+        '800197268',  # Avianca
+    })
+
     @property
     def nombre(self) -> str:
         return "ADUANA"
-    
+
     @property
     def disponible(self) -> bool:
-        return False  # TODO: Cambiar cuando esté disponible
-    
+        return obtener_registro() is not None
+
     async def consultar(self, nit: str) -> Optional[Dict]:
         """
-        Consulta registro de importador/exportador
-        
-        TODO: Implementar cuando tengamos acceso oficial
+        Consulta registro de importador/exportador en el extracto local
         """
-        # Por ahora, usar datos simulados
-        return self.datos_simulados(nit)
+        return self._consultar_registro(obtener_registro(), nit)
+    
+    async def consultar_lote(self, nits: List[str]) -> Dict[str, Optional[Dict]]:
+        """Búsquedas en el índice en memoria, sin una tarea por NIT"""
+        registro = obtener_registro()
+        return {nit: self._consultar_registro(registro, nit) for nit in nits}
     
+    def _consultar_registro(self, registro: RegistroAduana, nit: str) -> Dict:
+        operador = registro.buscar(nit)
+
+        if not operador:
+            return {
+                'tiene_registro': False,
+                'activo': False
+            }
+
+        dias = ordinal_hoy() - operador['ordinal_ultima_operacion']
+        return {
+            'tiene_registro': True,
+            'tipo': operador['tipo'],
+            'ultima_operacion': operador['ultima_operacion'],
+            'activo': dias <= ADUANA_DIAS_ACTIVO
+        }
+
     def datos_simulados(self, nit: str) -> Optional[Dict]:
         """
         Datos simulados basados en tamaño de empresa
         Empresas grandes típicamente tienen actividad aduanera
         """
-        # NITs de empresas grandes conocidas
-        empresas_grandes = [
-            '890903938',  # Bancolombia
-            '860034313',  # Ecopetrol
-            '890900608',  # Éxito
-            '800197268',  # Avianca
-        ]
-        
-        if nit in empresas_grandes:
+        if nit in self.EMPRESAS_GRANDES:
             return {
                 'tiene_registro': True,
                 'tipo': 'importador',  # o 'exportador' o 'ambos'
@@ -53,12 +166,12 @@ class AduanaIntegration(BaseIntegration):
                 'activo': True,
                 'volumen_anual_usd': 1000000  # Simulado
             }
-        
+
         # Empresas medianas: 30% tienen actividad
+        # Hash del NIT en lugar de random: consistente y sin estado global
         if nit.startswith('900'):
-            import random
-            random.seed(int(nit))  # Consistente para mismo NIT
-            if random.random() < 0.3:
+            digest = hashlib.blake2b(nit.encode('utf-8'), digest_size=8).digest()
+            if int.from_bytes(digest, 'big') / 2**64 < 0.3:
                 return {
                     'tiene_registro': True,
                     'tipo': 'importador',
@@ -66,9 +179,9 @@ class AduanaIntegration(BaseIntegration):
                     'activo': True,
                     'volumen_anual_usd': 50000
                 }
-        
+
         # Por defecto: sin actividad aduanera
         return {
             'tiene_registro': False,
             'activo': False
-        }
\ No newline at end of file
+        }
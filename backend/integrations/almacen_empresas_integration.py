@@ -0,0 +1,49 @@
+"""
+Integración con el almacén local de empresas
+(registros re-extraídos de las páginas archivadas del RUES)
+"""
+
+import os
+from typing import Optional, Dict, List
+from integrations.base_integration import BaseIntegration
+from config import DIRECTORIO_ALMACEN
+
+
+class AlmacenEmpresasIntegration(BaseIntegration):
+    """
+    Consulta el almacén generado por AlmacenEmpresasService.reparsear()
+    """
+    
+    # Copia local: que un NIT falte no confirma que no exista,
+    # y responde sin red (no se corta por plazo)
+    fuente_real = False
+    
+    def __init__(self):
+        self._almacen = None
+    
+    @property
+    def nombre(self) -> str:
+        return "ALMACEN_RUES"
+    
+    @property
+    def disponible(self) -> bool:
+        from services.almacen_empresas_service import BASE_EMPRESAS
+        return os.path.exists(os.path.join(DIRECTORIO_ALMACEN, BASE_EMPRESAS))
+    
+    @property
+    def almacen(self):
+        if self._almacen is None:
+            from services.almacen_empresas_service import AlmacenEmpresasService
+            self._almacen = AlmacenEmpresasService()
+        return self._almacen
+    
+    async def consultar(self, nit: str) -> Optional[Dict]:
+        """
+        Busca la empresa en el almacén local
+        """
+        return self.almacen.obtener(nit)
+    
+    async def consultar_lote(self, nits: List[str]) -> Dict[str, Optional[Dict]]:
+        """Un solo SELECT ... IN por bloque"""
+        encontradas = self.almacen.obtener_varios(nits)
+        return {nit: encontradas.get(nit) for nit in nits}
@@ -2,8 +2,17 @@
 Clase base para todas las integraciones
 """
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
+from cache.fabrica import obtener_cache
+from config import CACHE_INTEGRACIONES_BACKEND
+from integrations.resiliencia import obtener_presupuesto, obtener_latencias, espera_backoff
+from plazos import plazo_actual
+from trazas import obtener_logger, span
+
+logger = obtener_logger('integraciones')
 
 
 class BaseIntegration(ABC):
@@ -11,6 +20,28 @@ class BaseIntegration(ABC):
     Interfaz común para todas las integraciones externas
     """
     
+    # Segundos que se guardan en cache los resultados de consultar()
+    # 0 = sin cache (fuentes locales que ya responden rápido)
+    ttl_cache: float = 0
+    
+    # Fuente real (no de ejemplo ni simulada): solo sus respuestas
+    # vacías confirman que un NIT no existe
+    fuente_real: bool = True
+    
+    # Reintentos ante errores transitorios (con backoff y sujetos al
+    # presupuesto global de reintentos)
+    reintentos: int = 0
+    errores_reintentables: Tuple[type, ...] = (OSError,)
+    
+    # Cobertura (hedging): si un intento supera el p95 observado de la
+    # fuente se lanza otro en paralelo y se usa el primero que responda
+    cobertura: bool = False
+    
+    # Consultas por lote (consultar_lote): NITs por llamada y, en la
+    # implementación por defecto, consultas individuales en curso a la vez
+    tamano_lote: int = 500
+    max_concurrencia_lote: int = 8
+    
     @property
     @abstractmethod
     def nombre(self) -> str:
@@ -36,6 +67,34 @@ class BaseIntegration(ABC):
         """
         pass
     
+    async def consultar_lote(self, nits: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Consulta varias empresas (a lo sumo tamano_lote por llamada)
+        
+        Por defecto llama consultar() por NIT (con reintentos y cobertura)
+        con max_concurrencia_lote en curso. Las fuentes que responden
+        muchos NITs a la vez (registros locales, bases SQL, APIs masivas)
+        la sobreescriben con una sola consulta por llamada.
+        
+        Returns:
+            NIT -> datos (None si la fuente no lo tiene). Un NIT ausente
+            del resultado es un error de la fuente para ese NIT.
+        """
+        limite = asyncio.Semaphore(self.max_concurrencia_lote)
+        
+        async def consultar_uno(nit: str):
+            async with limite:
+                return await self._consultar_resiliente(nit)
+        
+        respuestas = await asyncio.gather(*map(consultar_uno, nits), return_exceptions=True)
+        resultados = {}
+        for nit, respuesta in zip(nits, respuestas):
+            if isinstance(respuesta, Exception):
+                logger.warning("Error en %s para %s: %s", self.nombre, nit, respuesta)
+            else:
+                resultados[nit] = respuesta
+        return resultados
+    
     def datos_simulados(self, nit: str) -> Optional[Dict]:
         """
         Retorna datos simulados cuando la integración no está disponible
@@ -48,14 +107,199 @@ class BaseIntegration(ABC):
         """
         return None
     
-    async def consultar_con_fallback(self, nit: str) -> Optional[Dict]:
+    def cache(self):
         """
-        Intenta consultar, si falla usa datos simulados
+        Cache de resultados de esta integración (L1 memoria / L2 disco)
+        None si la integración no usa cache
+        """
+        if not self.ttl_cache:
+            return None
+        return obtener_cache(
+            f'integracion:{self.nombre}',
+            self.ttl_cache,
+            backend=CACHE_INTEGRACIONES_BACKEND
+        )
+    
+    def ttl_resultado(self, datos: Dict) -> float:
+        """
+        Segundos de vida en cache de un resultado
+        Por defecto ttl_cache; las fuentes cuyos datos cambian en fechas
+        conocidas (p. ej. vencimientos tributarios) lo ajustan por resultado
+        """
+        return self.ttl_cache
+    
+    async def consultar_con_origen(self, nit: str) -> Tuple[Optional[Dict], str]:
         """
+        Consulta indicando de dónde salió la respuesta
+        Lee primero del cache (read-through) y guarda los resultados reales
+        (write-behind: el nivel en disco se escribe en segundo plano)
+        
+        Las fuentes reales se cortan al vencer el plazo de la consulta
+        (ver plazos.py); las de ejemplo responden localmente y no se cortan
+        
+        Returns:
+            (datos, origen) con origen 'cache', 'fuente', 'simulado' o 'plazo'.
+            ('fuente', None) significa que la fuente respondió sin datos.
+            (None, 'plazo') significa que no respondió dentro del plazo.
+        """
+        with span(f'integracion:{self.nombre}') as atributos:
+            datos, origen = await self._consultar_con_origen(nit)
+            atributos['origen'] = origen
+            return datos, origen
+    
+    async def _consultar_con_origen(self, nit: str) -> Tuple[Optional[Dict], str]:
         if self.disponible:
+            cache = self.cache()
+            if cache:
+                en_cache = await cache.obtener_async(nit)
+                if en_cache is not None:
+                    return en_cache, 'cache'
+            
+            plazo = plazo_actual() if self.fuente_real else None
             try:
-                return await self.consultar(nit)
+                consulta = self._consultar_resiliente(nit)
+                if plazo is not None:
+                    consulta = asyncio.wait_for(consulta, plazo.restante())
+                datos = await consulta
+                if datos is not None:
+                    # Frescura para fusionar respuestas de varias fuentes
+                    datos = {**datos, 'consultado_en': time.time()}
+                if cache and datos is not None:
+                    cache.guardar(nit, datos, self.ttl_resultado(datos))
+                return datos, 'fuente'
             except Exception as e:
-                print(f"Error en {self.nombre}: {e}")
+                if plazo is not None and plazo.vencido:
+                    logger.warning("%s no respondió dentro del plazo", self.nombre)
+                    return None, 'plazo'
+                logger.warning("Error en %s: %s", self.nombre, e)
         
-        return self.datos_simulados(nit)
\ No newline at end of file
+        return self.datos_simulados(nit), 'simulado'
+    
+    async def consultar_lote_con_origen(self, nits: List[str]) -> Dict[str, Tuple[Optional[Dict], str]]:
+        """
+        consultar_con_origen() para varios NITs
+        Los que están en cache no se consultan; el resto va a
+        consultar_lote() en bloques de tamano_lote
+        
+        Returns:
+            NIT -> (datos, origen) con los mismos orígenes que consultar_con_origen()
+        """
+        with span(f'integracion_lote:{self.nombre}') as atributos:
+            resultados = await self._consultar_lote_con_origen(list(dict.fromkeys(nits)))
+            atributos['nits'] = len(resultados)
+            return resultados
+    
+    async def _consultar_lote_con_origen(self, nits: List[str]) -> Dict[str, Tuple[Optional[Dict], str]]:
+        resultados: Dict[str, Tuple[Optional[Dict], str]] = {}
+        
+        if self.disponible:
+            cache = self.cache()
+            en_cache_por_nit = await cache.obtener_varios_async(nits) if cache else {}
+            pendientes = []
+            for nit in nits:
+                en_cache = en_cache_por_nit.get(nit)
+                if en_cache is not None:
+                    resultados[nit] = (en_cache, 'cache')
+                else:
+                    pendientes.append(nit)
+            
+            plazo = plazo_actual() if self.fuente_real else None
+            for inicio in range(0, len(pendientes), self.tamano_lote):
+                bloque = pendientes[inicio:inicio + self.tamano_lote]
+                try:
+                    consulta = self.consultar_lote(bloque)
+                    if plazo is not None:
+                        consulta = asyncio.wait_for(consulta, plazo.restante())
+                    respuestas = await consulta
+                except Exception as e:
+                    if plazo is not None and plazo.vencido:
+                        logger.warning("%s no respondió el lote dentro del plazo", self.nombre)
+                        for nit in pendientes[inicio:]:
+                            resultados[nit] = (None, 'plazo')
+                        break
+                    logger.warning("Error en lote de %s: %s", self.nombre, e)
+                    continue
+                
+                consultado_en = time.time()
+                for nit in bloque:
+                    if nit not in respuestas:
+                        continue
+                    datos = respuestas[nit]
+                    if datos is not None:
+                        datos = {**datos, 'consultado_en': consultado_en}
+                        if cache:
+                            cache.guardar(nit, datos, self.ttl_resultado(datos))
+                    resultados[nit] = (datos, 'fuente')
+        
+        for nit in nits:
+            if nit not in resultados:
+                resultados[nit] = (self.datos_simulados(nit), 'simulado')
+        return resultados
+    
+    async def _consultar_resiliente(self, nit: str) -> Optional[Dict]:
+        """
+        consultar() con cobertura y reintentos con backoff
+        Cada intento extra gasta presupuesto; sin presupuesto se propaga el error
+        """
+        presupuesto = obtener_presupuesto()
+        presupuesto.depositar()
+        
+        intento = 0
+        while True:
+            try:
+                return await self._consultar_con_cobertura(nit)
+            except self.errores_reintentables as e:
+                intento += 1
+                espera = espera_backoff(intento)
+                plazo = plazo_actual()
+                
+                # Sin reintento si la espera no cabe en el plazo restante
+                if plazo is not None and espera >= plazo.restante():
+                    raise
+                if intento > self.reintentos or not presupuesto.retirar():
+                    raise
+                logger.info("Reintento %d en %s: %s", intento, self.nombre, e)
+                await asyncio.sleep(espera)
+    
+    async def _consultar_con_cobertura(self, nit: str) -> Optional[Dict]:
+        """
+        Un intento; si no termina en el p95 observado y hay presupuesto,
+        lanza un segundo y retorna el primero que termine bien
+        """
+        p95 = obtener_latencias(self.nombre).percentil(95) if self.cobertura else None
+        tareas = [asyncio.ensure_future(self._intento_medido(nit))]
+        
+        try:
+            if p95 is not None:
+                terminadas, _ = await asyncio.wait(tareas, timeout=p95)
+                if not terminadas and obtener_presupuesto().retirar():
+                    tareas.append(asyncio.ensure_future(self._intento_medido(nit)))
+            
+            pendientes = set(tareas)
+            while True:
+                terminadas, pendientes = await asyncio.wait(
+                    pendientes, return_when=asyncio.FIRST_COMPLETED
+                )
+                exitosas = [tarea for tarea in terminadas if tarea.exception() is None]
+                if exitosas:
+                    return exitosas[0].result()
+                if not pendientes:
+                    # Ninguno terminó bien: se propaga el error de uno de ellos
+                    return next(iter(terminadas)).result()
+        finally:
+            for tarea in tareas:
+                tarea.cancel()
+    
+    async def _intento_medido(self, nit: str) -> Optional[Dict]:
+        """consultar() registrando su latencia si termina bien"""
+        inicio = time.perf_counter()
+        datos = await self.consultar(nit)
+        obtener_latencias(self.nombre).registrar(time.perf_counter() - inicio)
+        return datos
+    
+    async def consultar_con_fallback(self, nit: str) -> Optional[Dict]:
+        """
+        Intenta consultar, si falla usa datos simulados
+        """
+        datos, _ = await self.consultar_con_origen(nit)
+        return datos
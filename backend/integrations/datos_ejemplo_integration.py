@@ -3,9 +3,9 @@ Integración con datos de ejemplo
 (migración del datos_empresas_ejemplo.py actual)
 """
 
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from integrations.base_integration import BaseIntegration
-from datos_empresas_ejemplo import EMPRESAS_EJEMPLO
+import catalogos
 
 
 class DatosEjemploIntegration(BaseIntegration):
@@ -13,6 +13,9 @@ class DatosEjemploIntegration(BaseIntegration):
     Integración que usa los datos de ejemplo actuales
     """
     
+    # Datos de ejemplo: no confirma que un NIT no exista
+    fuente_real = False
+    
     @property
     def nombre(self) -> str:
         return "DATOS_EJEMPLO"
@@ -25,7 +28,12 @@ class DatosEjemploIntegration(BaseIntegration):
         """
         Consulta empresa en base de datos de ejemplo
         """
-        return EMPRESAS_EJEMPLO.get(nit, None)
+        return catalogos.cargar('empresas_ejemplo').get(nit, None)
+    
+    async def consultar_lote(self, nits: List[str]) -> Dict[str, Optional[Dict]]:
+        """Varias empresas con una sola carga del catálogo"""
+        empresas = catalogos.cargar('empresas_ejemplo')
+        return {nit: empresas.get(nit) for nit in nits}
     
     def datos_simulados(self, nit: str) -> Optional[Dict]:
         """
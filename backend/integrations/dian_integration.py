@@ -0,0 +1,293 @@
+"""
+Integración con DIAN - Consulta del estado del RUT (MUISCA)
+El formulario es JSF: cada consulta necesita la cookie de sesión y el
+ViewState de la vista, así que se mantiene un pool de sesiones calientes
+"""
+
+import asyncio
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import responsabilidades
+from integrations.base_integration import BaseIntegration
+from config import (
+    DIAN_HABILITADO,
+    DIAN_URL_RUT,
+    DIAN_TIMEOUT,
+    DIAN_SESIONES,
+    DIAN_SESION_MAX_USOS,
+    DIAN_SESION_INACTIVA_SEGUNDOS,
+    DIAN_TTL_CACHE
+)
+from plazos import limitar
+from pool_parseo import obtener_pool_parseo
+from trazas import obtener_logger
+
+logger = obtener_logger('dian')
+
+
+# Identificadores del formulario de consulta
+FORMULARIO = 'vistaConsultaEstadoRUT:formConsultaEstadoRUT'
+CAMPO_VIEW_STATE = 'javax.faces.ViewState'
+
+# Estado del registro que cuenta como RUT activo
+ESTADO_ACTIVO = 'REGISTRO ACTIVO'
+
+
+def interpretar_respuesta(html: bytes) -> Tuple[Optional[Dict], Optional[str], bool]:
+    """
+    Lee la página de respuesta del formulario
+
+    Returns:
+        (datos, ViewState nuevo, vista expirada). datos None si la
+        página no trae resultado; {'registrado': False, ...} si el NIT
+        no está inscrito
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    campo = soup.find('input', attrs={'name': CAMPO_VIEW_STATE})
+    view_state = campo.get('value') if campo else None
+    texto = soup.get_text(' ')
+
+    if 'ViewExpired' in texto or 'sesión ha expirado' in texto.lower():
+        return None, None, True
+
+    if 'no está inscrito en el rut' in texto.lower():
+        return {'registrado': False, 'activo': False, 'responsabilidades': []}, view_state, False
+
+    def valor(sufijo: str) -> Optional[str]:
+        nodo = soup.find(id=f'{FORMULARIO}:{sufijo}')
+        return nodo.get_text(strip=True) if nodo else None
+
+    estado = valor('estado')
+    if estado is None:
+        # El formulario sin resultado: el servidor no reconoció la vista
+        return None, view_state, True
+
+    tabla = soup.find(id=f'{FORMULARIO}:responsabilidades')
+    textos = [celda.get_text(strip=True) for celda in tabla.find_all('td')] if tabla else []
+    return {
+        'registrado': True,
+        'estado': estado.upper(),
+        'activo': estado.upper() == ESTADO_ACTIVO,
+        'dv': valor('dv'),
+        'razon_social': valor('razonSocial'),
+        'responsabilidades': responsabilidades.codigos(textos)
+    }, view_state, False
+
+
+Interpretar = Callable[[bytes], Tuple[Optional[Dict], Optional[str], bool]]
+
+
+def _interpretar_en_pool(loop: asyncio.AbstractEventLoop) -> Interpretar:
+    """
+    interpretar_respuesta para los hilos de las sesiones: el parseo corre
+    en el pool de procesos (no compite por el GIL con el event loop) y el
+    hilo espera su resultado
+    """
+    def interpretar(html: bytes):
+        return asyncio.run_coroutine_threadsafe(obtener_pool_parseo().interpretar_dian(html), loop).result()
+    return interpretar
+
+
+class SesionMUISCA:
+    """
+    Una sesión HTTP con su cookie y el ViewState de la vista de consulta
+
+    Se negocia (GET del formulario) solo cuando no tiene vista, superó
+    DIAN_SESION_MAX_USOS o lleva inactiva más de lo que el servidor la
+    conserva. Si el servidor responde que la vista expiró se renegocia
+    una vez y se repite la consulta.
+    """
+
+    def __init__(self, url: str):
+        # requests se importa en el primer uso (no se carga en el arranque)
+        import requests
+
+        self.url = url
+        self.http = requests.Session()
+        self.view_state: Optional[str] = None
+        self.usos = 0
+        self.consultas = 0
+        self.negociaciones = 0
+        self.ultimo_uso = 0.0
+
+    @property
+    def caliente(self) -> bool:
+        return (
+            self.view_state is not None
+            and self.usos < DIAN_SESION_MAX_USOS
+            and time.monotonic() - self.ultimo_uso < DIAN_SESION_INACTIVA_SEGUNDOS
+        )
+
+    def negociar(self, timeout: float, interpretar: Interpretar = interpretar_respuesta):
+        """Abre una sesión nueva y obtiene el ViewState del formulario"""
+        self.http.cookies.clear()
+        respuesta = self.http.get(self.url, timeout=timeout)
+        respuesta.raise_for_status()
+
+        _, view_state, _ = interpretar(respuesta.content)
+        if not view_state:
+            raise OSError("El formulario del RUT no trajo ViewState")
+
+        self.view_state = view_state
+        self.usos = 0
+        self.negociaciones += 1
+        self.ultimo_uso = time.monotonic()
+
+    def consultar(self, nit: str, timeout: float, interpretar: Interpretar = interpretar_respuesta) -> Dict:
+        """
+        Envía el formulario con el NIT (renegocia si hace falta)
+
+        Args:
+            interpretar: Parser de las páginas (por defecto en este hilo)
+        """
+        for _ in range(2):
+            if not self.caliente:
+                self.negociar(timeout, interpretar)
+
+            respuesta = self.http.post(self.url, data={
+                FORMULARIO: FORMULARIO,
+                f'{FORMULARIO}:numNit': nit,
+                f'{FORMULARIO}:btnBuscar': 'Buscar',
+                CAMPO_VIEW_STATE: self.view_state,
+            }, timeout=timeout)
+            respuesta.raise_for_status()
+
+            datos, view_state, expirada = interpretar(respuesta.content)
+            if expirada:
+                self.view_state = None
+                continue
+
+            self.view_state = view_state or self.view_state
+            self.usos += 1
+            self.consultas += 1
+            self.ultimo_uso = time.monotonic()
+            return datos
+
+        raise OSError("La vista del RUT expiró incluso con sesión nueva")
+
+
+class PoolSesionesMUISCA:
+    """
+    Sesiones MUISCA reutilizables y los hilos que las usan
+
+    Hay tantos hilos como sesiones: cada consulta toma la sesión usada más
+    recientemente (LIFO, la más caliente) y la devuelve al terminar. Los
+    hilos solo hacen HTTP; las páginas se parsean en el pool de parseo
+    """
+
+    def __init__(self, url: str = DIAN_URL_RUT, tamano: int = DIAN_SESIONES):
+        self.url = url
+        self.tamano = tamano
+        self._sesiones: List[SesionMUISCA] = [SesionMUISCA(url) for _ in range(tamano)]
+        self._libres: queue.LifoQueue = queue.LifoQueue()
+        for sesion in self._sesiones:
+            self._libres.put(sesion)
+        self._hilos = ThreadPoolExecutor(max_workers=tamano, thread_name_prefix='dian')
+
+    def _consultar(self, nit: str, timeout: float, interpretar: Interpretar) -> Dict:
+        sesion = self._libres.get()
+        try:
+            return sesion.consultar(nit, timeout, interpretar)
+        except Exception:
+            # Estado incierto tras un error: la próxima consulta renegocia
+            sesion.view_state = None
+            raise
+        finally:
+            self._libres.put(sesion)
+
+    async def consultar(self, nit: str, timeout: float) -> Dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._hilos, self._consultar, nit, timeout, _interpretar_en_pool(loop))
+
+    def calentar(self, timeout: float = DIAN_TIMEOUT, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Negocia por adelantado las sesiones frías (en paralelo)
+        Toma todas las sesiones: las consultas esperan a que termine
+
+        Args:
+            loop: Event loop del proceso; con él las páginas se parsean en
+                el pool de parseo (sin él, en los hilos del calentamiento)
+        """
+        sesiones = [self._libres.get() for _ in range(self.tamano)]
+        interpretar = _interpretar_en_pool(loop) if loop is not None else interpretar_respuesta
+
+        def negociar(sesion: SesionMUISCA):
+            if sesion.caliente:
+                return
+            try:
+                sesion.negociar(timeout, interpretar)
+            except Exception as e:
+                logger.warning("No se pudo calentar una sesión del RUT: %s", e)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.tamano) as hilos:
+                list(hilos.map(negociar, sesiones))
+        finally:
+            for sesion in sesiones:
+                self._libres.put(sesion)
+
+    def estadisticas(self) -> Dict:
+        return {
+            'sesiones': self.tamano,
+            'calientes': sum(1 for sesion in self._sesiones if sesion.caliente),
+            'consultas': sum(sesion.consultas for sesion in self._sesiones),
+            'negociaciones': sum(sesion.negociaciones for sesion in self._sesiones),
+        }
+
+    def cerrar(self):
+        self._hilos.shutdown(wait=False, cancel_futures=True)
+        for sesion in self._sesiones:
+            sesion.http.close()
+
+
+# Pool del proceso (se crea en el primer uso)
+_pool: Optional[PoolSesionesMUISCA] = None
+
+
+def obtener_pool_sesiones() -> PoolSesionesMUISCA:
+    global _pool
+    if _pool is None:
+        _pool = PoolSesionesMUISCA()
+    return _pool
+
+
+def cerrar_pool_sesiones():
+    global _pool
+    if _pool is not None:
+        _pool.cerrar()
+        _pool = None
+
+
+class DIANIntegration(BaseIntegration):
+    """
+    Estado del RUT y responsabilidades tributarias (códigos DIAN)
+    """
+
+    # El RUT cambia poco: una semana en cache
+    ttl_cache = DIAN_TTL_CACHE
+
+    # Un reintento ante errores de red; sin cobertura (cada intento
+    # ocupa una de las pocas sesiones del pool)
+    reintentos = 1
+    
+    # Lotes: una consulta en curso por sesión del pool
+    max_concurrencia_lote = DIAN_SESIONES
+
+    @property
+    def nombre(self) -> str:
+        return "DIAN"
+
+    @property
+    def disponible(self) -> bool:
+        return DIAN_HABILITADO
+
+    async def consultar(self, nit: str) -> Optional[Dict]:
+        """
+        Consulta el estado del RUT con una sesión del pool
+        """
+        return await obtener_pool_sesiones().consultar(nit, limitar(DIAN_TIMEOUT))
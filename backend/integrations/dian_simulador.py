@@ -0,0 +1,205 @@
+"""
+Servidor local que imita el formulario JSF de consulta del RUT (MUISCA)
+Sesiones con cookie, ViewState por vista, vistas que expiran y un costo
+de negociación configurable: sirve para probar y medir el pool de sesiones
+
+Uso:
+    python -m integrations.dian_simulador 8702 0.05 0.01
+    DIAN_HABILITADO=1 DIAN_URL_RUT=http://127.0.0.1:8702/rut uvicorn api:app
+
+Respuestas deterministas por NIT: ~5% no inscritos, ~5% suspendidos
+"""
+
+import hashlib
+import html
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from integrations.dian_integration import CAMPO_VIEW_STATE, FORMULARIO
+from nit import calcular_dv
+
+
+# Vistas que el servidor conserva por sesión (numberOfViewsInSession en JSF)
+VISTAS_POR_SESION = 15
+
+# Responsabilidades posibles (texto como lo muestra el formulario)
+RESPONSABILIDADES = (
+    '05 - Impuesto renta y compl. régimen ordinario',
+    '07 - Retención en la fuente a título de renta',
+    '09 - Retención en la fuente en el impuesto sobre las ventas',
+    '13 - Gran contribuyente',
+    '14 - Informante de exógena',
+    '42 - Obligado a llevar contabilidad',
+    '48 - Impuesto sobre las ventas - IVA',
+    '52 - Facturador electrónico',
+)
+
+
+def registro(nit: str) -> Optional[Dict]:
+    """Registro simulado del NIT (None = no inscrito)"""
+    valor = int.from_bytes(hashlib.blake2b(nit.encode('utf-8'), digest_size=8).digest(), 'big')
+    if valor % 100 < 5:
+        return None
+    return {
+        'razon_social': f'EMPRESA {nit} S.A.S.',
+        'estado': 'REGISTRO SUSPENDIDO' if valor % 100 < 10 else 'REGISTRO ACTIVO',
+        'dv': str(calcular_dv(nit)),
+        # Renta siempre; las demás según los bits del hash
+        'responsabilidades': [RESPONSABILIDADES[0]] + [
+            texto for i, texto in enumerate(RESPONSABILIDADES[1:]) if valor >> (8 + i) & 1
+        ],
+    }
+
+
+def _pagina(view_state: Optional[str], cuerpo: str) -> str:
+    campo = f'<input type="hidden" name="{CAMPO_VIEW_STATE}" value="{view_state}">' if view_state else ''
+    return (
+        f'<html><body><form id="{FORMULARIO}" method="post">'
+        f'<input type="text" name="{FORMULARIO}:numNit">{cuerpo}{campo}</form></body></html>'
+    )
+
+
+def _resultado(datos: Dict) -> str:
+    filas = ''.join(f'<tr><td>{html.escape(texto)}</td></tr>' for texto in datos['responsabilidades'])
+    return (
+        f'<span id="{FORMULARIO}:razonSocial">{html.escape(datos["razon_social"])}</span>'
+        f'<span id="{FORMULARIO}:dv">{datos["dv"]}</span>'
+        f'<span id="{FORMULARIO}:estado">{datos["estado"]}</span>'
+        f'<table id="{FORMULARIO}:responsabilidades">{filas}</table>'
+    )
+
+
+class EstadoServidor:
+    """Sesiones y contadores del servidor simulado"""
+
+    def __init__(self, expira_sesion: float):
+        self.expira_sesion = expira_sesion
+        self.sesiones: Dict[str, Dict] = {}
+        self.contadores = {'negociaciones': 0, 'consultas': 0, 'vistas_expiradas': 0}
+        self.candado = threading.Lock()
+
+    def nueva_vista(self, id_sesion: Optional[str]) -> Tuple[str, str]:
+        """(id de sesión, ViewState nuevo); crea la sesión si no existe o expiró"""
+        with self.candado:
+            sesion = self._vigente(id_sesion)
+            if sesion is None:
+                id_sesion = secrets.token_hex(16)
+                sesion = self.sesiones[id_sesion] = {'vistas': OrderedDict(), 'ultimo': 0.0}
+            view_state = secrets.token_urlsafe(24)
+            sesion['vistas'][view_state] = True
+            while len(sesion['vistas']) > VISTAS_POR_SESION:
+                sesion['vistas'].popitem(last=False)
+            sesion['ultimo'] = time.monotonic()
+            return id_sesion, view_state
+
+    def vista_valida(self, id_sesion: Optional[str], view_state: Optional[str]) -> bool:
+        with self.candado:
+            sesion = self._vigente(id_sesion)
+            return sesion is not None and view_state in sesion['vistas']
+
+    def _vigente(self, id_sesion: Optional[str]) -> Optional[Dict]:
+        sesion = self.sesiones.get(id_sesion or '')
+        if sesion is None or time.monotonic() - sesion['ultimo'] > self.expira_sesion:
+            self.sesiones.pop(id_sesion or '', None)
+            return None
+        return sesion
+
+    def contar(self, contador: str):
+        with self.candado:
+            self.contadores[contador] += 1
+
+
+def crear_servidor(
+    puerto: int = 0,
+    retardo_negociacion: float = 0.05,
+    retardo_consulta: float = 0.01,
+    expira_sesion: float = 1800
+) -> ThreadingHTTPServer:
+    """
+    Servidor en 127.0.0.1 (puerto 0 = libre, ver server_address)
+    Formulario en /rut y contadores en /estadisticas
+
+    Args:
+        retardo_negociacion: Segundos de la carga inicial del formulario
+        retardo_consulta: Segundos de cada consulta
+        expira_sesion: Inactividad tras la que el servidor olvida la sesión
+    """
+    estado = EstadoServidor(expira_sesion)
+
+    class Manejador(BaseHTTPRequestHandler):
+        def _sesion(self) -> Optional[str]:
+            cookie = SimpleCookie(self.headers.get('Cookie', ''))
+            return cookie['JSESSIONID'].value if 'JSESSIONID' in cookie else None
+
+        def _responder(self, cuerpo: str, tipo: str = 'text/html', id_sesion: Optional[str] = None):
+            contenido = cuerpo.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', f'{tipo}; charset=utf-8')
+            self.send_header('Content-Length', str(len(contenido)))
+            if id_sesion:
+                self.send_header('Set-Cookie', f'JSESSIONID={id_sesion}; Path=/; HttpOnly')
+            self.end_headers()
+            try:
+                self.wfile.write(contenido)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # el cliente cortó por timeout
+
+        def do_GET(self):
+            if self.path == '/estadisticas':
+                return self._responder(json.dumps(estado.contadores), 'application/json')
+            time.sleep(retardo_negociacion)
+            estado.contar('negociaciones')
+            id_sesion, view_state = estado.nueva_vista(self._sesion())
+            self._responder(_pagina(view_state, ''), id_sesion=id_sesion)
+
+        def do_POST(self):
+            largo = int(self.headers.get('Content-Length', 0))
+            campos = parse_qs(self.rfile.read(largo).decode('utf-8'))
+            id_sesion = self._sesion()
+
+            if not estado.vista_valida(id_sesion, campos.get(CAMPO_VIEW_STATE, [None])[0]):
+                estado.contar('vistas_expiradas')
+                return self._responder(_pagina(None, 'javax.faces.application.ViewExpiredException'))
+
+            time.sleep(retardo_consulta)
+            estado.contar('consultas')
+            nit = campos.get(f'{FORMULARIO}:numNit', [''])[0].strip()
+            _, view_state = estado.nueva_vista(id_sesion)
+            datos = registro(nit)
+            cuerpo = _resultado(datos) if datos else f'<p>El NIT {html.escape(nit)} no está inscrito en el RUT</p>'
+            self._responder(_pagina(view_state, cuerpo))
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', puerto), Manejador)
+    servidor.estado = estado
+    return servidor
+
+
+def iniciar(puerto: int = 0, **opciones) -> ThreadingHTTPServer:
+    """Servidor en un hilo de fondo; detener con servidor.shutdown()"""
+    servidor = crear_servidor(puerto, **opciones)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    import sys
+
+    puerto = int(sys.argv[1]) if len(sys.argv) > 1 else 8702
+    negociacion = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    consulta = float(sys.argv[3]) if len(sys.argv) > 3 else 0.01
+
+    print("="*60)
+    print(f"🧾 RUT MUISCA SIMULADO en http://127.0.0.1:{puerto}/rut")
+    print(f"   Negociación: {negociacion}s | Consulta: {consulta}s")
+    print("="*60)
+    crear_servidor(puerto, negociacion, consulta).serve_forever()
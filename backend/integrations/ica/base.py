@@ -0,0 +1,129 @@
+"""
+Base de los adaptadores de ICA municipal
+Cada alcaldía tiene su portal: el adaptador sabe pedir y leer sus páginas,
+la base resuelve el pool del host, el período exigible y la vigencia en cache
+"""
+
+import re
+import time
+from abc import abstractmethod
+from datetime import date, datetime, time as hora
+from typing import Dict, List, Optional, Tuple
+
+from config import ICA_URLS, ICA_TIMEOUT, ICA_TTL_MAXIMO, ICA_TTL_PENDIENTE, ICA_MAX_CONEXIONES_HOST
+from integrations.base_integration import BaseIntegration
+from integrations.ica.calendario import ANUAL, CalendarioICA, Periodo
+from integrations.ica.pools import obtener_pool
+from plazos import limitar
+
+
+_PERIODO = re.compile(r'(\d{4})(?:\D+(\d{1,2}))?')
+
+
+def leer_periodo(texto: str) -> Optional[Periodo]:
+    """'2025' -> (2025, 1); '2026-B3', '2026-03', '2026/3' -> (2026, 3)"""
+    encontrado = _PERIODO.search(texto or '')
+    if not encontrado:
+        return None
+    return int(encontrado.group(1)), int(encontrado.group(2) or 1)
+
+
+class AdaptadorICA(BaseIntegration):
+    """
+    Consulta del ICA en el portal de una alcaldía
+
+    Las subclases definen clave, municipios (códigos DIVIPOLA que atiende),
+    calendario, solicitar() e interpretar(). La URL del portal sale de
+    ICA_URL_<CLAVE>, así el mismo adaptador se prueba contra un servidor
+    local (ver simulador.py)
+    """
+
+    clave: str = ''
+    municipios: Tuple[str, ...] = ()
+    calendario: CalendarioICA = ANUAL
+
+    # Vigencia real por resultado en ttl_resultado()
+    ttl_cache = ICA_TTL_MAXIMO
+
+    # Sin cobertura: duplicar consultas a una alcaldía lenta la hace más lenta
+    reintentos = 1
+    cobertura = False
+    
+    # Lotes: las conexiones del host (más en curso solo harían cola)
+    max_concurrencia_lote = ICA_MAX_CONEXIONES_HOST
+
+    @property
+    def nombre(self) -> str:
+        return f"ICA:{self.clave.upper()}"
+
+    @property
+    def url(self) -> Optional[str]:
+        return ICA_URLS.get(self.clave)
+
+    @property
+    def disponible(self) -> bool:
+        return self.url is not None
+
+    @abstractmethod
+    def solicitar(self, sesion, nit: str, timeout: float):
+        """
+        Pide al portal el estado del contribuyente
+
+        Returns:
+            requests.Response
+        """
+        pass
+
+    @abstractmethod
+    def interpretar(self, respuesta) -> Optional[List[Periodo]]:
+        """
+        Lee los períodos declarados de la respuesta del portal
+
+        Returns:
+            Períodos declarados (posiblemente vacío) o None si el NIT no
+            está inscrito en el municipio
+        """
+        pass
+
+    def _descargar(self, sesion, nit: str, timeout: float) -> Optional[List[Periodo]]:
+        """Solicitud e interpretación (en un hilo del pool del host)"""
+        respuesta = self.solicitar(sesion, nit, timeout)
+        if respuesta.status_code == 404:
+            return None
+        # Errores HTTP son OSError (requests): se reintentan
+        respuesta.raise_for_status()
+        return self.interpretar(respuesta)
+
+    async def consultar(self, nit: str) -> Optional[Dict]:
+        """
+        Estado del ICA del NIT en este municipio
+        """
+        declarados = await obtener_pool(self.url).ejecutar(self._descargar, nit, limitar(ICA_TIMEOUT))
+        return self.resultado(declarados, date.today())
+
+    def resultado(self, declarados: Optional[List[Periodo]], hoy: date) -> Dict:
+        """
+        Compara lo declarado con el período exigible del calendario
+        """
+        if declarados is None:
+            return {'inscrito': False, 'al_dia': False}
+
+        exigible = self.calendario.periodo_exigible(hoy)
+        ultimo = max(declarados, default=None)
+        return {
+            'inscrito': True,
+            'al_dia': exigible is None or (ultimo is not None and ultimo >= exigible),
+            'ultimo_periodo_declarado': self.calendario.etiqueta(ultimo),
+            'periodo_exigible': self.calendario.etiqueta(exigible),
+            'proximo_vencimiento': self.calendario.proximo_vencimiento(hoy).isoformat()
+        }
+
+    def ttl_resultado(self, datos: Dict) -> float:
+        """
+        Un contribuyente al día lo sigue estando hasta el próximo vencimiento
+        del calendario; uno pendiente puede declarar en cualquier momento
+        """
+        if not datos.get('al_dia') or not datos.get('proximo_vencimiento'):
+            return ICA_TTL_PENDIENTE
+        vence = datetime.combine(date.fromisoformat(datos['proximo_vencimiento']), hora.min)
+        return max(60.0, min(self.ttl_cache, vence.timestamp() - time.time()))
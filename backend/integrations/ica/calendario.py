@@ -0,0 +1,70 @@
+"""
+Calendario de declaración del ICA de un municipio
+Períodos gravables, período exigible a una fecha y próximo vencimiento
+"""
+
+import calendar
+from datetime import date
+from typing import List, NamedTuple, Optional, Tuple
+
+
+# (año, número del período dentro del año)
+Periodo = Tuple[int, int]
+
+# Letra de las etiquetas según los meses del período ('2026-B3': tercer bimestre)
+_LETRA_PERIODO = {2: 'B', 3: 'T', 4: 'C', 6: 'S'}
+
+
+class CalendarioICA(NamedTuple):
+    """
+    Calendario simplificado: períodos de igual duración dentro del año y
+    un día fijo de vencimiento unos meses después del cierre del período
+
+    Las alcaldías publican el calendario cada año; estos valores son la
+    regla general y se ajustan en el adaptador del municipio
+    """
+    meses_periodo: int          # 12 anual, 2 bimestral
+    meses_para_declarar: int    # meses entre el cierre y el vencimiento
+    dia_vencimiento: int
+
+    def vencimiento(self, periodo: Periodo) -> date:
+        """Fecha límite para declarar un período"""
+        anio, numero = periodo
+        mes = numero * self.meses_periodo + self.meses_para_declarar
+        anio, mes = anio + (mes - 1) // 12, (mes - 1) % 12 + 1
+        dia = min(self.dia_vencimiento, calendar.monthrange(anio, mes)[1])
+        return date(anio, mes, dia)
+
+    def _vencimientos(self, hoy: date) -> List[Tuple[date, Periodo]]:
+        # Los vencimientos cercanos a hoy caen en períodos de este año o los dos anteriores
+        return sorted(
+            (self.vencimiento((anio, numero)), (anio, numero))
+            for anio in range(hoy.year - 2, hoy.year + 1)
+            for numero in range(1, 12 // self.meses_periodo + 1)
+        )
+
+    def periodo_exigible(self, hoy: date) -> Optional[Periodo]:
+        """Último período cuyo plazo de declaración ya venció"""
+        vencidos = [periodo for fecha, periodo in self._vencimientos(hoy) if fecha <= hoy]
+        return vencidos[-1] if vencidos else None
+
+    def proximo_vencimiento(self, hoy: date) -> date:
+        """Primera fecha posterior a hoy en que otro período pasa a ser exigible"""
+        for fecha, _ in self._vencimientos(hoy):
+            if fecha > hoy:
+                return fecha
+        return self.vencimiento((hoy.year, 12 // self.meses_periodo))
+
+    def etiqueta(self, periodo: Optional[Periodo]) -> Optional[str]:
+        """'2025' para períodos anuales, '2026-B3' para el tercer bimestre"""
+        if periodo is None:
+            return None
+        anio, numero = periodo
+        if self.meses_periodo == 12:
+            return str(anio)
+        return f'{anio}-{_LETRA_PERIODO.get(self.meses_periodo, "P")}{numero}'
+
+
+# Calendarios más comunes
+ANUAL = CalendarioICA(meses_periodo=12, meses_para_declarar=3, dia_vencimiento=31)
+BIMESTRAL = CalendarioICA(meses_periodo=2, meses_para_declarar=1, dia_vencimiento=19)
@@ -0,0 +1,49 @@
+"""
+Tabla de enrutamiento: código DIVIPOLA del municipio -> adaptador de su alcaldía
+"""
+
+from typing import Dict, List, Optional
+
+from integrations.ica.base import AdaptadorICA
+from integrations.ica.portales import (
+    AdaptadorBarranquilla, AdaptadorBogota, AdaptadorCali, AdaptadorMedellin
+)
+
+
+ADAPTADORES = (
+    AdaptadorBogota,
+    AdaptadorMedellin,
+    AdaptadorCali,
+    AdaptadorBarranquilla,
+)
+
+# Una instancia por adaptador y proceso (se crean en el primer uso)
+_tabla: Optional[Dict[str, AdaptadorICA]] = None
+
+
+def _enrutamiento() -> Dict[str, AdaptadorICA]:
+    global _tabla
+    if _tabla is None:
+        tabla = {}
+        for clase in ADAPTADORES:
+            adaptador = clase()
+            for codigo in clase.municipios:
+                tabla[codigo] = adaptador
+        _tabla = tabla
+    return _tabla
+
+
+def adaptadores() -> List[AdaptadorICA]:
+    """Todos los adaptadores registrados"""
+    return list(dict.fromkeys(_enrutamiento().values()))
+
+
+def adaptador_para(codigo_municipio: Optional[str]) -> Optional[AdaptadorICA]:
+    """
+    Adaptador de la alcaldía del municipio
+    None si el municipio no tiene adaptador o su portal no está configurado
+    """
+    adaptador = _enrutamiento().get(codigo_municipio or '')
+    if adaptador is None or not adaptador.disponible:
+        return None
+    return adaptador
@@ -0,0 +1,84 @@
+"""
+Pool de conexiones e hilos por host municipal
+
+Cada host tiene su propia sesión HTTP y su propio ejecutor con tantos
+hilos como conexiones: una alcaldía lenta solo agota sus hilos y las
+consultas a ese host esperan en su cola, sin tomar hilos del ejecutor
+por defecto ni conexiones de los demás municipios
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+from urllib.parse import urlsplit
+
+from config import ICA_MAX_CONEXIONES_HOST
+
+
+class PoolHost:
+    """Sesión HTTP y límite de concurrencia de un host"""
+
+    def __init__(self, host: str, max_conexiones: int = ICA_MAX_CONEXIONES_HOST):
+        # requests se importa en el primer uso (no se carga en el arranque)
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.host = host
+        self.max_conexiones = max_conexiones
+        self.sesion = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max_conexiones, pool_block=True)
+        self.sesion.mount('http://', adaptador)
+        self.sesion.mount('https://', adaptador)
+        self._hilos = ThreadPoolExecutor(max_workers=max_conexiones, thread_name_prefix=f'ica-{host}')
+        self.en_curso = 0
+
+    async def ejecutar(self, funcion: Callable, *args):
+        """
+        Ejecuta funcion(sesion, *args) en un hilo de este host
+        Si la consulta se cancela antes de empezar (plazo vencido) sale
+        de la cola sin ocupar un hilo
+        """
+        self.en_curso += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._hilos, funcion, self.sesion, *args)
+        finally:
+            self.en_curso -= 1
+
+    def estadisticas(self) -> Dict:
+        return {
+            'max_conexiones': self.max_conexiones,
+            'en_curso': self.en_curso,  # incluye las que esperan hilo
+        }
+
+    def cerrar(self):
+        self._hilos.shutdown(wait=False, cancel_futures=True)
+        self.sesion.close()
+
+
+# Un pool por host y proceso (varios municipios pueden compartir plataforma)
+_pools: Dict[str, PoolHost] = {}
+_candado = threading.Lock()
+
+
+def obtener_pool(url: str) -> PoolHost:
+    """Pool del host de una URL (se crea en el primer uso)"""
+    host = urlsplit(url).netloc
+    with _candado:
+        if host not in _pools:
+            _pools[host] = PoolHost(host)
+        return _pools[host]
+
+
+def estadisticas() -> Dict:
+    """Estado de los pools creados en este proceso"""
+    return {host: pool.estadisticas() for host, pool in _pools.items()}
+
+
+def cerrar_pools():
+    """Cierra sesiones e hilos de todos los hosts"""
+    with _candado:
+        for pool in _pools.values():
+            pool.cerrar()
+        _pools.clear()
@@ -0,0 +1,91 @@
+"""
+Formatos de portal de ICA y adaptadores por alcaldía
+
+Un formato sabe pedir y leer un tipo de portal; cada alcaldía es una
+subclase con su clave, sus municipios y su calendario. Un portal nuevo
+es una subclase más y una entrada en enrutador.ADAPTADORES
+"""
+
+from typing import List, Optional
+
+from integrations.ica.base import AdaptadorICA, leer_periodo
+from integrations.ica.calendario import ANUAL, BIMESTRAL, Periodo
+
+
+# Estados de declaración que cuentan como presentada
+ESTADOS_PRESENTADA = ('PRESENTADA', 'PAGADA', 'APLICADA')
+
+
+class PortalJSON(AdaptadorICA):
+    """
+    Servicio REST: GET {url}/contribuyentes/{nit}/ica
+    {"declaraciones": [{"periodo": "2026-3", "estado": "PRESENTADA"}, ...]}
+    404 si el NIT no está inscrito
+    """
+
+    def solicitar(self, sesion, nit: str, timeout: float):
+        return sesion.get(f"{self.url.rstrip('/')}/contribuyentes/{nit}/ica", timeout=timeout)
+
+    def interpretar(self, respuesta) -> Optional[List[Periodo]]:
+        contenido = respuesta.json()
+        if not contenido.get('inscrito', True):
+            return None
+        return [
+            periodo
+            for declaracion in contenido.get('declaraciones', [])
+            if str(declaracion.get('estado', '')).upper() in ESTADOS_PRESENTADA
+            for periodo in [leer_periodo(str(declaracion.get('periodo', '')))]
+            if periodo
+        ]
+
+
+class PortalHTML(AdaptadorICA):
+    """
+    Formulario de consulta: POST {url} con nit=...
+    Tabla id="declaraciones" con filas (período, estado); la página dice
+    'no se encuentra inscrito' si el NIT no está en el registro
+    """
+
+    def solicitar(self, sesion, nit: str, timeout: float):
+        return sesion.post(self.url, data={'nit': nit}, timeout=timeout)
+
+    def interpretar(self, respuesta) -> Optional[List[Periodo]]:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(respuesta.content, 'html.parser')
+        if 'no se encuentra inscrito' in soup.get_text(' ').lower():
+            return None
+
+        tabla = soup.find('table', id='declaraciones')
+        declarados = []
+        for fila in tabla.find_all('tr') if tabla else ():
+            celdas = [celda.get_text(strip=True) for celda in fila.find_all('td')]
+            if len(celdas) >= 2 and celdas[1].upper() in ESTADOS_PRESENTADA:
+                periodo = leer_periodo(celdas[0])
+                if periodo:
+                    declarados.append(periodo)
+        return declarados
+
+
+class AdaptadorBogota(PortalJSON):
+    clave = 'bogota'
+    municipios = ('11001',)
+    calendario = BIMESTRAL
+
+
+class AdaptadorMedellin(PortalHTML):
+    clave = 'medellin'
+    municipios = ('05001',)
+    calendario = ANUAL
+
+
+class AdaptadorCali(PortalHTML):
+    clave = 'cali'
+    municipios = ('76001',)
+    calendario = ANUAL
+
+
+class AdaptadorBarranquilla(PortalJSON):
+    clave = 'barranquilla'
+    municipios = ('08001',)
+    calendario = BIMESTRAL
@@ -0,0 +1,113 @@
+"""
+Servidor local que imita los portales de ICA (formatos JSON y HTML)
+Para probar los adaptadores sin salir a las alcaldías
+
+Uso:
+    python -m integrations.ica.simulador 8701 json 0.2
+    ICA_URL_BOGOTA=http://127.0.0.1:8701 uvicorn api:app
+
+Respuestas deterministas por NIT: ~10% no inscritos, ~70% al día
+"""
+
+import hashlib
+import json
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs
+
+from integrations.ica.calendario import ANUAL, BIMESTRAL, CalendarioICA
+
+
+def _fraccion(nit: str) -> float:
+    digest = hashlib.blake2b(nit.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') / 2**64
+
+
+def declaraciones(nit: str, calendario: CalendarioICA) -> Optional[List[str]]:
+    """Etiquetas de períodos declarados del NIT (None = no inscrito)"""
+    fraccion = _fraccion(nit)
+    if fraccion < 0.1:
+        return None
+
+    exigible = calendario.periodo_exigible(date.today())
+    anio, numero = exigible
+    periodos = [(anio, n) for n in range(1, numero + 1)]
+    # ~30% atrasados: les falta el último período exigible
+    if fraccion >= 0.7:
+        periodos = periodos[:-1] or [(anio - 1, 12 // calendario.meses_periodo)]
+    return [calendario.etiqueta(periodo) for periodo in periodos]
+
+
+def crear_servidor(puerto: int = 0, formato: str = 'json', retardo: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Servidor en 127.0.0.1 (puerto 0 = libre, ver server_address)
+
+    Args:
+        formato: 'json' (PortalJSON, calendario bimestral) o 'html' (PortalHTML, anual)
+        retardo: Segundos de espera antes de cada respuesta (alcaldía lenta)
+    """
+    calendario = BIMESTRAL if formato == 'json' else ANUAL
+
+    class Manejador(BaseHTTPRequestHandler):
+        def _responder(self, estado: int, cuerpo: str, tipo: str):
+            contenido = cuerpo.encode('utf-8')
+            self.send_response(estado)
+            self.send_header('Content-Type', f'{tipo}; charset=utf-8')
+            self.send_header('Content-Length', str(len(contenido)))
+            self.end_headers()
+            try:
+                self.wfile.write(contenido)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # el cliente cortó por timeout
+
+        def do_GET(self):
+            time.sleep(retardo)
+            partes = self.path.strip('/').split('/')
+            if len(partes) != 3 or partes[0] != 'contribuyentes' or partes[2] != 'ica':
+                return self._responder(400, '{}', 'application/json')
+            periodos = declaraciones(partes[1], calendario)
+            if periodos is None:
+                return self._responder(404, '{"inscrito": false}', 'application/json')
+            cuerpo = {'inscrito': True, 'declaraciones': [
+                {'periodo': periodo, 'estado': 'PRESENTADA'} for periodo in periodos
+            ]}
+            self._responder(200, json.dumps(cuerpo), 'application/json')
+
+        def do_POST(self):
+            time.sleep(retardo)
+            largo = int(self.headers.get('Content-Length', 0))
+            nit = parse_qs(self.rfile.read(largo).decode('utf-8')).get('nit', [''])[0]
+            periodos = declaraciones(nit, calendario)
+            if periodos is None:
+                return self._responder(200, '<p>El contribuyente no se encuentra inscrito</p>', 'text/html')
+            filas = ''.join(f'<tr><td>{p}</td><td>Presentada</td></tr>' for p in periodos)
+            self._responder(200, f'<table id="declaraciones">{filas}</table>', 'text/html')
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer(('127.0.0.1', puerto), Manejador)
+
+
+def iniciar(puerto: int = 0, formato: str = 'json', retardo: float = 0.0) -> ThreadingHTTPServer:
+    """Servidor en un hilo de fondo; detener con servidor.shutdown()"""
+    servidor = crear_servidor(puerto, formato, retardo)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    import sys
+
+    puerto = int(sys.argv[1]) if len(sys.argv) > 1 else 8701
+    formato = sys.argv[2] if len(sys.argv) > 2 else 'json'
+    retardo = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+
+    print("="*60)
+    print(f"🏛️  PORTAL ICA SIMULADO ({formato}) en http://127.0.0.1:{puerto}")
+    print(f"   Retardo por respuesta: {retardo}s")
+    print("="*60)
+    crear_servidor(puerto, formato, retardo).serve_forever()
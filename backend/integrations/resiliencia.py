@@ -0,0 +1,121 @@
+"""
+Resiliencia frente a fuentes públicas inestables
+Latencias observadas por fuente, presupuesto global de reintentos y backoff
+"""
+
+import random
+import threading
+from collections import deque
+from typing import Dict
+
+from config import (
+    PRESUPUESTO_REINTENTOS_PROPORCION,
+    PRESUPUESTO_REINTENTOS_MAXIMO,
+    COBERTURA_MIN_MUESTRAS
+)
+
+
+class LatenciasObservadas:
+    """
+    Ventana de las últimas latencias exitosas de una fuente
+    Sirve para decidir cuándo lanzar una consulta de cobertura (hedging)
+    """
+
+    def __init__(self, tamano: int = 200):
+        self._muestras = deque(maxlen=tamano)
+
+    def registrar(self, segundos: float):
+        self._muestras.append(segundos)
+
+    def percentil(self, p: float):
+        """
+        Percentil p (0-100) de la ventana
+        None si aún no hay muestras suficientes para confiar en él
+        """
+        if len(self._muestras) < COBERTURA_MIN_MUESTRAS:
+            return None
+        ordenadas = sorted(self._muestras)
+        indice = min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))
+        return ordenadas[indice]
+
+    def estadisticas(self) -> Dict:
+        return {
+            'muestras': len(self._muestras),
+            'p50': self.percentil(50),
+            'p95': self.percentil(95)
+        }
+
+
+class PresupuestoReintentos:
+    """
+    Cubeta de fichas compartida por todas las integraciones
+
+    Cada consulta original deposita `proporcion` fichas y cada intento
+    adicional (reintento o cobertura) gasta una. Así los intentos extra
+    nunca superan esa fracción de la carga: si una fuente cae, los
+    reintentos se agotan en vez de multiplicar el tráfico hacia ella.
+    """
+
+    def __init__(self, proporcion: float, maximo: float):
+        self.proporcion = proporcion
+        self.maximo = maximo
+        self._fichas = maximo
+        self._lock = threading.Lock()
+        self.concedidos = 0
+        self.denegados = 0
+
+    def depositar(self):
+        """Registra una consulta original"""
+        with self._lock:
+            self._fichas = min(self.maximo, self._fichas + self.proporcion)
+
+    def retirar(self) -> bool:
+        """Intenta pagar un intento extra; False si no hay presupuesto"""
+        with self._lock:
+            if self._fichas >= 1:
+                self._fichas -= 1
+                self.concedidos += 1
+                return True
+            self.denegados += 1
+            return False
+
+    def estadisticas(self) -> Dict:
+        return {
+            'fichas': round(self._fichas, 2),
+            'proporcion': self.proporcion,
+            'concedidos': self.concedidos,
+            'denegados': self.denegados
+        }
+
+
+def espera_backoff(intento: int, base: float = 0.2, maximo: float = 5.0) -> float:
+    """
+    Segundos a esperar antes del reintento `intento` (desde 1)
+    Backoff exponencial con jitter completo para no sincronizar clientes
+    """
+    return random.uniform(0, min(maximo, base * (2 ** intento)))
+
+
+# Presupuesto único del proceso
+_presupuesto = PresupuestoReintentos(PRESUPUESTO_REINTENTOS_PROPORCION, PRESUPUESTO_REINTENTOS_MAXIMO)
+
+# Latencias por nombre de fuente
+_latencias: Dict[str, LatenciasObservadas] = {}
+
+
+def obtener_presupuesto() -> PresupuestoReintentos:
+    return _presupuesto
+
+
+def obtener_latencias(fuente: str) -> LatenciasObservadas:
+    if fuente not in _latencias:
+        _latencias[fuente] = LatenciasObservadas()
+    return _latencias[fuente]
+
+
+def estadisticas() -> Dict:
+    """Presupuesto y latencias observadas, para monitoreo"""
+    return {
+        'presupuesto': _presupuesto.estadisticas(),
+        'latencias': {fuente: l.estadisticas() for fuente, l in _latencias.items()}
+    }
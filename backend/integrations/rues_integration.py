@@ -0,0 +1,107 @@
+"""
+Integración con RUES (Confecámaras)
+Descarga en un hilo, archiva la página y parsea en el pool de procesos
+"""
+
+import asyncio
+from typing import Optional, Dict
+from integrations.base_integration import BaseIntegration
+from config import RUES_HABILITADO, RUES_TIMEOUT, RUES_TTL_CACHE, ARCHIVO_HABILITADO
+from pool_parseo import obtener_pool_parseo
+from plazos import limitar
+from services.fusion_datos import campo_lleno
+from trazas import obtener_logger
+
+logger = obtener_logger('rues')
+
+
+class RUESIntegration(BaseIntegration):
+    """
+    Integración con el Registro Único Empresarial y Social
+    
+    La descarga usa requests en un hilo; el parseo con BeautifulSoup
+    corre en el pool de procesos para no bloquear el event loop
+    """
+    
+    # La matrícula cambia poco: un día en cache
+    ttl_cache = RUES_TTL_CACHE
+    
+    # Conexiones lentas o caídas ocasionales: reintentar y cubrir la cola
+    reintentos = 2
+    cobertura = True
+    
+    # Lotes: pocas descargas simultáneas hacia el mismo sitio
+    max_concurrencia_lote = 4
+    
+    def __init__(self):
+        self._scraper = None
+        self._archivo = None
+    
+    @property
+    def scraper(self):
+        """
+        Scraper del RUES, importado en el primer uso
+        (requests y BeautifulSoup no se cargan en el arranque)
+        """
+        if self._scraper is None:
+            from rues_scraper import RUESScraper
+            self._scraper = RUESScraper()
+        return self._scraper
+    
+    @property
+    def archivo(self):
+        """Archivo de páginas crudas (None si está deshabilitado)"""
+        if self._archivo is None and ARCHIVO_HABILITADO:
+            from services.archivo_service import ArchivoService
+            self._archivo = ArchivoService()
+        return self._archivo
+    
+    def _descargar(self, nit: str, timeout: float) -> bytes:
+        """
+        Descarga la página y la archiva (en el hilo de la descarga)
+        Si el archivo falla la consulta sigue: solo se pierde la copia
+        """
+        html = self.scraper.obtener_html(nit, timeout)
+        
+        if self.archivo is not None:
+            try:
+                self.archivo.guardar(self.nombre, nit, html)
+            except Exception as e:
+                logger.warning("No se pudo archivar la página de %s: %s", nit, e)
+        
+        return html
+    
+    @property
+    def nombre(self) -> str:
+        return "RUES"
+    
+    @property
+    def disponible(self) -> bool:
+        return RUES_HABILITADO
+    
+    async def consultar(self, nit: str) -> Optional[Dict]:
+        """
+        Consulta la matrícula mercantil en el RUES
+        
+        Returns:
+            Datos de la matrícula o None solo si el RUES responde
+            explícitamente que no hay resultados para el NIT
+        
+        Raises:
+            OSError: Respuesta distinta de 200 o página que no se pudo
+                interpretar (se reintenta; no confirma que el NIT no exista)
+        """
+        from rues_scraper import PaginaNoReconocida, sin_resultados
+        
+        # El timeout de red no excede lo que queda del plazo de la consulta
+        html = await asyncio.to_thread(self._descargar, nit, limitar(RUES_TIMEOUT))
+        
+        if sin_resultados(html):
+            return None
+        
+        datos = await obtener_pool_parseo().extraer_rues(html, nit)
+        
+        if not campo_lleno(datos.get('razon_social')):
+            raise PaginaNoReconocida(f"Página del RUES sin razón social para {nit}")
+        
+        return datos
@@ -16,6 +16,7 @@ class DatosBasicos(BaseModel):
     departamento: str
     actividad_principal: str
     codigo_ciiu: Optional[str] = None
+    codigo_municipio: Optional[str] = None  # DIVIPOLA
 
 
 class DatosRegistrales(BaseModel):
@@ -32,6 +33,7 @@ class DatosOperacionales(BaseModel):
     tamano: Optional[str] = None
     empleados_rango: Optional[str] = None
     responsabilidades_tributarias: List[str] = []
+    codigos_responsabilidades: List[str] = []  # códigos DIAN normalizados ('05', '48', ...)
 
 
 class SeñalesAduana(BaseModel):
@@ -42,9 +44,29 @@ class SeñalesAduana(BaseModel):
     activo: bool = False
 
 
+class SeñalesRUT(BaseModel):
+    """Estado del RUT consultado en la DIAN (MUISCA)"""
+    registrado: bool = False
+    estado: Optional[str] = None  # 'REGISTRO ACTIVO', 'REGISTRO SUSPENDIDO', ...
+    activo: bool = False
+    dv: Optional[str] = None
+    responsabilidades: List[str] = []  # códigos DIAN
+
+
+class SeñalesICA(BaseModel):
+    """Estado del ICA en el municipio de la empresa (portal de la alcaldía)"""
+    inscrito: bool = False
+    al_dia: bool = False
+    ultimo_periodo_declarado: Optional[str] = None
+    periodo_exigible: Optional[str] = None
+    proximo_vencimiento: Optional[str] = None
+
+
 class MetadataFuentes(BaseModel):
     """Metadata sobre las fuentes de datos"""
     fuentes_verificadas: List[str] = []
+    fuentes_omitidas: List[str] = []  # sin respuesta dentro del plazo de la consulta
+    procedencia_campos: Dict[str, str] = {}  # campo -> fuente de la que salió
     ultima_actualizacion: str = Field(default_factory=lambda: datetime.now().isoformat())
     version_datos: str = "1.0"
 
@@ -74,6 +96,12 @@ class EmpresaCompleta(BaseModel):
     # Señales aduaneras (futuro)
     señales_aduana: Optional[SeñalesAduana] = None
     
+    # RUT consultado en la DIAN (None si la fuente no respondió)
+    señales_rut: Optional[SeñalesRUT] = None
+    
+    # ICA municipal (solo municipios con portal configurado)
+    señales_ica: Optional[SeñalesICA] = None
+    
     # Metadata
     metadata: MetadataFuentes
     
@@ -93,7 +121,8 @@ class EmpresaCompleta(BaseModel):
                 municipio=datos_dict['municipio'],
                 departamento=datos_dict['departamento'],
                 actividad_principal=datos_dict['actividad_principal'],
-                codigo_ciiu=datos_dict.get('codigo_ciiu')
+                codigo_ciiu=datos_dict.get('codigo_ciiu'),
+                codigo_municipio=datos_dict.get('codigo_municipio')
             ),
             datos_registrales=DatosRegistrales(
                 fecha_matricula=datos_dict['fecha_matricula'],
@@ -105,7 +134,8 @@ class EmpresaCompleta(BaseModel):
             datos_operacionales=DatosOperacionales(
                 tamano=datos_dict.get('tamano'),
                 empleados_rango=datos_dict.get('empleados_rango'),
-                responsabilidades_tributarias=datos_dict.get('responsabilidades_tributarias', [])
+                responsabilidades_tributarias=datos_dict.get('responsabilidades_tributarias', []),
+                codigos_responsabilidades=datos_dict.get('codigos_responsabilidades', [])
             ),
             metadata=MetadataFuentes(
                 fuentes_verificadas=['datos_ejemplo'],
@@ -126,4 +156,10 @@ class EmpresaCompleta(BaseModel):
         if self.señales_aduana:
             resultado['operaciones_aduana'] = self.señales_aduana.dict()
         
+        if self.señales_rut:
+            resultado['rut'] = self.señales_rut.dict()
+        
+        if self.señales_ica:
+            resultado['ica'] = self.señales_ica.dict()
+        
         return resultado
\ No newline at end of file
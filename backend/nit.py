@@ -0,0 +1,79 @@
+"""
+Validación de NIT colombianos
+Dígito de verificación (DV) según el algoritmo de la DIAN (módulo 11)
+"""
+
+from typing import Optional, Tuple
+
+
+# Pesos DIAN, aplicados de derecha a izquierda
+PESOS_DV = (3, 7, 13, 17, 19, 23, 29, 37, 41, 43, 47, 53, 59, 67, 71)
+
+# Longitud de los NIT de persona jurídica que maneja la herramienta
+LONGITUD_NIT = 9
+
+
+def calcular_dv(nit: str) -> int:
+    """
+    Calcula el dígito de verificación de un NIT
+
+    Args:
+        nit: NIT sin DV (solo dígitos)
+
+    Returns:
+        Dígito de verificación (0-9)
+    """
+    suma = sum(int(digito) * peso for digito, peso in zip(reversed(nit), PESOS_DV))
+    residuo = suma % 11
+    return residuo if residuo < 2 else 11 - residuo
+
+
+def separar_nit(texto: str) -> Tuple[str, Optional[int]]:
+    """
+    Separa un NIT en número y DV
+
+    Acepta '890903938', '890.903.938', '890903938-8', '890.903.938-8'
+    y '8909039388' (NIT + DV sin separador)
+
+    Returns:
+        (nit, dv) con dv None si no se indicó
+
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    limpio = texto.replace('.', '').replace(' ', '')
+    dv = None
+
+    # Guion antes de un solo dígito final: separador de DV
+    base, guion, final = limpio.rpartition('-')
+    if guion and len(final) == 1 and final.isdigit():
+        limpio, dv = base, int(final)
+
+    # Otros guiones son separadores de grupos
+    limpio = limpio.replace('-', '')
+
+    if not limpio.isdigit():
+        raise ValueError('El NIT debe contener solo números')
+
+    if dv is None and len(limpio) == LONGITUD_NIT + 1:
+        limpio, dv = limpio[:-1], int(limpio[-1])
+
+    if len(limpio) != LONGITUD_NIT:
+        raise ValueError(f'El NIT debe tener {LONGITUD_NIT} dígitos')
+
+    return limpio, dv
+
+
+def normalizar_nit(texto: str) -> str:
+    """
+    Valida un NIT (y su DV si viene) y lo devuelve sin DV ni separadores
+
+    Raises:
+        ValueError: Si el formato no es válido o el DV no corresponde
+    """
+    nit, dv = separar_nit(texto)
+
+    if dv is not None and dv != calcular_dv(nit):
+        raise ValueError('El dígito de verificación no corresponde al NIT')
+
+    return nit
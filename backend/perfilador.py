@@ -0,0 +1,146 @@
+"""
+Perfilador estadístico por muestreo para workers en producción
+Un hilo lee la pila del hilo del event loop cada pocos milisegundos y las
+agrega en formato de pilas colapsadas (compatible con flamegraph.pl/speedscope)
+Apagado no hay hilo ni hooks: el costo es cero
+"""
+
+import asyncio
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+
+class PerfilEnCurso(Exception):
+    """Ya hay un perfil corriendo en este worker"""
+    pass
+
+
+def _etiqueta(frame) -> str:
+    codigo = frame.f_code
+    return f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+
+
+def _inactivo(frame) -> bool:
+    """El event loop está esperando eventos en el selector (sin trabajo)"""
+    codigo = frame.f_code
+    return codigo.co_name == 'select' and os.path.basename(codigo.co_filename) == 'selectors.py'
+
+
+class Muestreador:
+    """
+    Muestreo de la pila de un hilo durante una ventana de tiempo
+
+    Las muestras con el hilo esperando en el selector del event loop se
+    cuentan en `inactivas` y no entran en las pilas
+
+    Args:
+        intervalo: Segundos entre muestras
+        hilo: Ident del hilo a muestrear (el del event loop)
+        fraccion: Fracción de requests a perfilar (1.0 = todo el tiempo).
+            Con fracción < 1 solo se toman muestras mientras haya en curso
+            algún request elegido
+    """
+
+    def __init__(self, intervalo: float, hilo: int, fraccion: float = 1.0):
+        self.intervalo = intervalo
+        self.hilo = hilo
+        self.fraccion = fraccion
+        self.pilas: Counter = Counter()
+        self.muestras = 0
+        self.inactivas = 0
+        self._requests_elegidos = 0
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, name='perfilador', daemon=True)
+
+    def _muestrear(self):
+        nombre = next((hilo.name for hilo in threading.enumerate() if hilo.ident == self.hilo), str(self.hilo))
+
+        while not self._detener.wait(self.intervalo):
+            if self.fraccion < 1.0 and self._requests_elegidos == 0:
+                continue
+
+            frame = sys._current_frames().get(self.hilo)
+            if frame is None:
+                continue
+            self.muestras += 1
+            if _inactivo(frame):
+                self.inactivas += 1
+                continue
+
+            pila = []
+            while frame is not None:
+                pila.append(_etiqueta(frame))
+                frame = frame.f_back
+            pila.append(nombre)
+            self.pilas[';'.join(reversed(pila))] += 1
+
+    @contextmanager
+    def request(self):
+        """Marca un request como perfilado con probabilidad `fraccion`"""
+        if self.fraccion >= 1.0 or random.random() >= self.fraccion:
+            yield
+            return
+
+        self._requests_elegidos += 1
+        try:
+            yield
+        finally:
+            self._requests_elegidos -= 1
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        self._hilo.join()
+
+    def colapsado(self) -> str:
+        """Una línea por pila: 'raíz;...;hoja N'"""
+        return '\n'.join(f"{pila} {n}" for pila, n in self.pilas.most_common()) + '\n'
+
+
+# Perfil activo del proceso (None = apagado)
+activo: Optional[Muestreador] = None
+_lock = threading.Lock()
+
+
+def iniciar(intervalo: float, fraccion: float = 1.0) -> Muestreador:
+    """
+    Enciende el muestreo del hilo que llama (el del event loop)
+
+    Raises:
+        PerfilEnCurso: Si ya hay uno corriendo
+    """
+    global activo
+    with _lock:
+        if activo is not None:
+            raise PerfilEnCurso("Ya hay un perfil en curso en este worker")
+        activo = Muestreador(intervalo, threading.get_ident(), fraccion)
+        activo.iniciar()
+        return activo
+
+
+def detener() -> Optional[Muestreador]:
+    """Apaga el muestreo y retorna el muestreador con lo recolectado"""
+    global activo
+    with _lock:
+        muestreador, activo = activo, None
+    if muestreador is not None:
+        muestreador.detener()
+    return muestreador
+
+
+async def perfilar(segundos: float, intervalo: float, fraccion: float = 1.0) -> Muestreador:
+    """Perfila el event loop durante `segundos` sin bloquearlo"""
+    iniciar(intervalo, fraccion)
+    try:
+        await asyncio.sleep(segundos)
+    finally:
+        # Esperar al hilo muestreador (join) fuera del event loop
+        muestreador = await asyncio.to_thread(detener)
+    return muestreador
@@ -0,0 +1,55 @@
+"""
+Plazo total de una consulta (deadline)
+Viaja en una variable de contexto desde el servicio hasta cada integración
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class Plazo:
+    """Momento límite de una consulta, en reloj monotónico"""
+
+    def __init__(self, segundos: float):
+        self.segundos = segundos
+        self.vence = time.monotonic() + segundos
+
+    def restante(self) -> float:
+        """Segundos que quedan (0 si ya venció)"""
+        return max(0.0, self.vence - time.monotonic())
+
+    @property
+    def vencido(self) -> bool:
+        return self.restante() <= 0
+
+
+_plazo_actual: contextvars.ContextVar = contextvars.ContextVar('plazo_actual', default=None)
+
+
+def plazo_actual() -> Optional[Plazo]:
+    """Plazo de la consulta en curso (None fuera de una consulta)"""
+    return _plazo_actual.get()
+
+
+@contextmanager
+def usar_plazo(plazo: Plazo):
+    """
+    Establece el plazo para el código (y las tareas) creados dentro del bloque
+    Las tareas de asyncio copian el contexto al crearse, así que lo conservan
+    aunque el bloque ya haya terminado
+    """
+    token = _plazo_actual.set(plazo)
+    try:
+        yield plazo
+    finally:
+        _plazo_actual.reset(token)
+
+
+def limitar(timeout: float) -> float:
+    """Timeout acotado por lo que queda del plazo actual (si hay)"""
+    plazo = plazo_actual()
+    if plazo is None:
+        return timeout
+    return min(timeout, plazo.restante())
@@ -0,0 +1,242 @@
+"""
+Pool de procesos para el parseo de HTML
+Saca el trabajo de BeautifulSoup del event loop de uvicorn
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional, Tuple
+
+from config import (
+    PARSEO_WORKERS,
+    PARSEO_MAX_PENDIENTES,
+    PARSEO_TIMEOUT,
+    PARSEO_TAREAS_POR_WORKER
+)
+
+
+class PoolSaturado(Exception):
+    """La cola del pool está llena; la tarea se rechaza de inmediato"""
+    pass
+
+
+class ParseoTimeout(Exception):
+    """La tarea no terminó dentro del tiempo permitido"""
+    pass
+
+
+class ParseoInterrumpido(OSError):
+    """
+    La tarea se perdió porque el pool se rompió (otra tarea excedió su
+    timeout o un proceso murió); es un OSError para que quien la envió
+    la reintente como cualquier falla transitoria
+    """
+    pass
+
+
+# Cola por la que cada worker avisa qué proceso tomó cada tarea
+_cola_inicios = None
+
+
+def _inicializar_worker(cola_inicios):
+    """Importa los parsers una vez por proceso"""
+    global _cola_inicios
+    _cola_inicios = cola_inicios
+    import bs4  # noqa: F401
+    import rues_scraper  # noqa: F401
+
+
+def _ejecutar_tarea(id_tarea: int, funcion: Callable, *args):
+    """Avisa el PID del proceso que toma la tarea y la ejecuta"""
+    _cola_inicios.put((id_tarea, os.getpid()))
+    return funcion(*args)
+
+
+class PoolParseo:
+    """
+    Pool de procesos acotado para tareas de parseo
+
+    - Cola acotada: si hay max_pendientes tareas en curso, las nuevas
+      se rechazan con PoolSaturado en lugar de acumularse
+    - Timeout por tarea: quien espera recibe ParseoTimeout. Una tarea que
+      ya corre no se puede cancelar, así que se termina el proceso que la
+      tomó (un parseo colgado no retiene un worker). Eso rompe el pool:
+      se reemplaza y las demás tareas en curso reciben ParseoInterrumpido
+    - Reciclaje por worker: cada proceso se reemplaza tras
+      tareas_por_worker tareas (max_tasks_per_child), lo que acota el
+      crecimiento de memoria sin parar a los demás
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = PARSEO_WORKERS,
+        max_pendientes: int = PARSEO_MAX_PENDIENTES,
+        timeout: float = PARSEO_TIMEOUT,
+        tareas_por_worker: int = PARSEO_TAREAS_POR_WORKER
+    ):
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.max_pendientes = max_pendientes
+        self.timeout = timeout
+        self.tareas_por_worker = tareas_por_worker
+
+        self._contexto = multiprocessing.get_context('spawn')
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Una cola por pool: un proceso terminado a mitad de un put()
+        # dejaría tomado el lock de la suya
+        self._cola_inicios = None
+        self._ids_tareas = itertools.count()
+        self._procesos: Dict[int, int] = {}  # id de tarea en curso -> PID
+        self._pendientes = 0
+        self.reemplazos = 0
+
+    def _obtener_executor(self) -> Tuple[ProcessPoolExecutor, object]:
+        if self._executor is None:
+            self._cola_inicios = self._contexto.SimpleQueue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self._contexto,
+                initializer=_inicializar_worker,
+                initargs=(self._cola_inicios,),
+                max_tasks_per_child=self.tareas_por_worker
+            )
+        return self._executor, self._cola_inicios
+
+    def _reemplazar(self, executor: ProcessPoolExecutor):
+        """Descarta un pool; el próximo envío crea otro"""
+        if self._executor is executor:
+            self._executor = None
+            self._cola_inicios = None
+            self.reemplazos += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _leer_inicios(self, cola):
+        """Registra los PIDs que avisaron los workers (sin bloquear)"""
+        while not cola.empty():
+            id_tarea, pid = cola.get()
+            self._procesos[id_tarea] = pid
+
+    def _terminar(self, executor: ProcessPoolExecutor, cola, id_tarea: int):
+        """
+        Termina el proceso que corre la tarea y reemplaza el pool
+        ProcessPoolExecutor no cancela tareas en curso: sin esto un parseo
+        colgado seguiría ocupando el proceso indefinidamente
+        """
+        self._leer_inicios(cola)
+        pid = self._procesos.pop(id_tarea, None)
+        if pid is not None:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        self._reemplazar(executor)
+
+    def _enviar(self, id_tarea: int, funcion: Callable, *args):
+        executor, cola = self._obtener_executor()
+        try:
+            return executor, cola, executor.submit(_ejecutar_tarea, id_tarea, funcion, *args)
+        except BrokenProcessPool:
+            # Un proceso murió (p. ej. por memoria): pool nuevo y un reintento
+            self._reemplazar(executor)
+            executor, cola = self._obtener_executor()
+            return executor, cola, executor.submit(_ejecutar_tarea, id_tarea, funcion, *args)
+
+    async def ejecutar(self, funcion: Callable, *args, timeout: Optional[float] = None):
+        """
+        Ejecuta una función de módulo en el pool y espera su resultado
+
+        Args:
+            funcion: Función importable (se envía por pickle)
+            args: Argumentos simples (bytes, str, dict)
+            timeout: Segundos máximos (por defecto el del pool)
+
+        Raises:
+            PoolSaturado: Demasiadas tareas pendientes
+            ParseoTimeout: La tarea excedió el timeout
+            ParseoInterrumpido: El pool se rompió con la tarea en curso
+        """
+        if self._pendientes >= self.max_pendientes:
+            raise PoolSaturado(f"{self._pendientes} tareas de parseo pendientes")
+
+        self._pendientes += 1
+        id_tarea = next(self._ids_tareas)
+        cola = None
+        try:
+            executor, cola, futuro = self._enviar(id_tarea, funcion, *args)
+            try:
+                return await asyncio.wait_for(
+                    asyncio.wrap_future(futuro),
+                    timeout=timeout or self.timeout
+                )
+            except asyncio.TimeoutError:
+                if not futuro.cancel():
+                    # Ya estaba corriendo: solo se detiene terminando el proceso
+                    self._terminar(executor, cola, id_tarea)
+                raise ParseoTimeout(f"Parseo excedió {timeout or self.timeout}s")
+            except BrokenProcessPool as e:
+                # Otra tarea excedió su timeout o un proceso murió
+                self._reemplazar(executor)
+                raise ParseoInterrumpido(f"Pool de parseo interrumpido: {e}") from e
+        finally:
+            self._pendientes -= 1
+            # El worker avisa antes de empezar: al terminar la tarea su
+            # aviso ya está en la cola (así no se acumulan PIDs viejos)
+            if cola is not None and cola is self._cola_inicios:
+                self._leer_inicios(cola)
+            self._procesos.pop(id_tarea, None)
+
+    async def extraer_rues(self, html: bytes, nit: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Parsea una página del RUES en el pool
+
+        Args:
+            html: HTML crudo
+            nit: NIT consultado
+
+        Returns:
+            Diccionario de campos extraídos
+        """
+        from rues_scraper import extraer_campos
+
+        return await self.ejecutar(extraer_campos, html, nit, timeout=timeout)
+
+    async def interpretar_dian(self, html: bytes, timeout: Optional[float] = None) -> Tuple:
+        """
+        Parsea una respuesta del formulario del RUT en el pool
+
+        Returns:
+            (datos, ViewState nuevo, vista expirada), como interpretar_respuesta
+        """
+        from integrations.dian_integration import interpretar_respuesta
+
+        return await self.ejecutar(interpretar_respuesta, html, timeout=timeout)
+
+    def cerrar(self):
+        """Cierra el pool (al apagar la aplicación)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Pool compartido del proceso (se crea en el primer uso)
+_pool: Optional[PoolParseo] = None
+
+
+def obtener_pool_parseo() -> PoolParseo:
+    """Devuelve el pool de parseo del proceso"""
+    global _pool
+    if _pool is None:
+        _pool = PoolParseo()
+    return _pool
+
+
+def cerrar_pool_parseo():
+    """Cierra el pool de parseo del proceso si existe"""
+    global _pool
+    if _pool is not None:
+        _pool.cerrar()
+        _pool = None
@@ -0,0 +1,190 @@
+"""
+Popularidad de los NITs consultados
+Sketch count-min con decaimiento en el tiempo: memoria fija sin importar
+cuántos NITs distintos lleguen, y los NITs que dejan de consultarse se
+enfrían solos
+
+Lo usan el cache en memoria (admisión por frecuencia) y el calentador
+(refresca las empresas más consultadas antes de que venzan)
+"""
+
+import hashlib
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from config import (
+    POPULARIDAD_ANCHO,
+    POPULARIDAD_PROFUNDIDAD,
+    POPULARIDAD_VIDA_MEDIA_SEGUNDOS,
+    POPULARIDAD_CANDIDATOS
+)
+
+
+class SketchFrecuencias:
+    """
+    Frecuencias aproximadas por clave (count-min)
+
+    - Cada clave incrementa un contador en cada una de las `profundidad`
+      filas; la estimación es el mínimo de esos contadores (nunca menor
+      que la frecuencia real, mayor solo por colisiones)
+    - Cada vida media todos los contadores se reducen a la mitad
+    - Las `max_candidatos` claves con mayor estimación se guardan por
+      nombre para poder listar el top-K (el sketch solo sabe contar)
+    """
+
+    def __init__(
+        self,
+        ancho: int = POPULARIDAD_ANCHO,
+        profundidad: int = POPULARIDAD_PROFUNDIDAD,
+        vida_media: float = POPULARIDAD_VIDA_MEDIA_SEGUNDOS,
+        max_candidatos: int = POPULARIDAD_CANDIDATOS
+    ):
+        # Ancho potencia de 2: el índice es una máscara de bits
+        self.ancho = 1 << max(1, ancho - 1).bit_length()
+        self.profundidad = profundidad
+        self.vida_media = vida_media
+        self.max_candidatos = max_candidatos
+        self._filas = [array('I', bytes(4 * self.ancho)) for _ in range(profundidad)]
+        self._candidatos: Dict[str, int] = {}
+        self._piso = 0  # menor estimación entre los candidatos (con la lista llena)
+        self._ultimo_decaimiento = time.monotonic()
+        self._lock = threading.Lock()
+        self.registrados = 0
+
+    def _indices(self, clave: str) -> List[int]:
+        # Doble hash: h1 + i*h2 da `profundidad` posiciones independientes
+        resumen = hashlib.blake2b(clave.encode('utf-8'), digest_size=8).digest()
+        h1 = int.from_bytes(resumen[:4], 'little')
+        h2 = int.from_bytes(resumen[4:], 'little') | 1
+        mascara = self.ancho - 1
+        return [(h1 + i * h2) & mascara for i in range(self.profundidad)]
+
+    def registrar(self, clave: str) -> int:
+        """Cuenta una consulta de la clave y retorna su frecuencia estimada"""
+        with self._lock:
+            self._decaer()
+            estimacion = None
+            for fila, indice in zip(self._filas, self._indices(clave)):
+                if fila[indice] < 0xFFFFFFFF:
+                    fila[indice] += 1
+                estimacion = fila[indice] if estimacion is None else min(estimacion, fila[indice])
+            self.registrados += 1
+            self._actualizar_candidato(clave, estimacion)
+            return estimacion
+
+    def estimar(self, clave: str) -> int:
+        """Frecuencia estimada (con decaimiento) sin contar una consulta"""
+        return min(fila[indice] for fila, indice in zip(self._filas, self._indices(clave)))
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """Las k claves más frecuentes, de mayor a menor"""
+        with self._lock:
+            self._decaer()
+            candidatos = list(self._candidatos.items())
+        candidatos.sort(key=lambda par: par[1], reverse=True)
+        return candidatos[:k]
+
+    def _actualizar_candidato(self, clave: str, estimacion: int):
+        if clave in self._candidatos or len(self._candidatos) < self.max_candidatos:
+            self._candidatos[clave] = estimacion
+            return
+        if estimacion <= self._piso:
+            return
+
+        # Reemplaza al candidato menos frecuente si esta clave lo supera
+        victima = min(self._candidatos, key=self._candidatos.get)
+        if estimacion > self._candidatos[victima]:
+            del self._candidatos[victima]
+            self._candidatos[clave] = estimacion
+        self._piso = min(self._candidatos.values())
+
+    def _decaer(self):
+        """Divide los contadores por 2 por cada vida media transcurrida"""
+        transcurrido = time.monotonic() - self._ultimo_decaimiento
+        mitades = int(transcurrido // self.vida_media) if self.vida_media > 0 else 0
+        if not mitades:
+            return
+
+        self._ultimo_decaimiento += mitades * self.vida_media
+        mitades = min(mitades, 32)
+        for i, fila in enumerate(self._filas):
+            self._filas[i] = array('I', (contador >> mitades for contador in fila))
+        self._candidatos = {
+            clave: estimacion >> mitades
+            for clave, estimacion in self._candidatos.items()
+            if estimacion >> mitades
+        }
+        self._piso = min(self._candidatos.values(), default=0)
+
+    def estadisticas(self) -> Dict:
+        return {
+            'registrados': self.registrados,
+            'candidatos': len(self._candidatos),
+            'ancho': self.ancho,
+            'profundidad': self.profundidad,
+            'memoria_kb': round(self.ancho * self.profundidad * 4 / 1024, 1),
+            'vida_media_segundos': self.vida_media
+        }
+
+
+def nit_de_clave(clave: str) -> Optional[str]:
+    """NIT de una clave de cache ('empresas:890903938', 'integracion:RUES:890903938')"""
+    for parte in clave.split(':'):
+        if parte.isdigit():
+            return parte
+    return None
+
+
+_sketch: Optional[SketchFrecuencias] = None
+
+
+def obtener_sketch() -> SketchFrecuencias:
+    """Sketch del worker (se crea en el primer uso)"""
+    global _sketch
+    if _sketch is None:
+        _sketch = SketchFrecuencias()
+    return _sketch
+
+
+def registrar(nit: str) -> int:
+    """Cuenta una consulta del NIT"""
+    return obtener_sketch().registrar(nit)
+
+
+def admitir(candidata: str, victima: str) -> bool:
+    """
+    Política de admisión del cache en memoria lleno (TinyLFU)
+
+    La entrada nueva entra solo si su NIT se consulta al menos tanto como
+    el de la que desalojaría: un recorrido por muchos NITs fríos (un lote,
+    un recálculo) no saca del cache a las empresas populares
+    """
+    nit_candidata, nit_victima = nit_de_clave(candidata), nit_de_clave(victima)
+    if nit_victima is None:
+        return True
+    sketch = obtener_sketch()
+    frecuencia_candidata = sketch.estimar(nit_candidata) if nit_candidata else 0
+    return frecuencia_candidata >= sketch.estimar(nit_victima)
+
+
+if __name__ == "__main__":
+    import random
+
+    sketch = SketchFrecuencias(vida_media=0)
+    populares = [f'8600{i:05d}' for i in range(20)]
+    for _ in range(100000):
+        # 80% de las consultas a 20 NITs, el resto a 50000 distintos
+        if random.random() < 0.8:
+            sketch.registrar(random.choice(populares))
+        else:
+            sketch.registrar(str(900000000 + random.randrange(50000)))
+
+    print("="*60)
+    print("🔥 NITS MÁS CONSULTADOS (sketch count-min)")
+    print("="*60)
+    for nit, frecuencia in sketch.top(10):
+        print(f"   {nit}  {frecuencia:6d}  {'✅' if nit in populares else '❌'}")
+    print(f"   {sketch.estadisticas()}")
+    print("="*60)
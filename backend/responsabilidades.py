@@ -0,0 +1,93 @@
+"""
+Responsabilidades tributarias del RUT (casilla 53 del formulario 001)
+Textos de cualquier fuente -> lista normalizada de códigos DIAN
+"""
+
+import re
+import unicodedata
+from typing import Iterable, List, Optional
+
+
+# Código DIAN -> descripción
+RESPONSABILIDADES = {
+    '05': 'Impuesto de renta y complementarios régimen ordinario',
+    '07': 'Retención en la fuente a título de renta',
+    '09': 'Retención en la fuente en el impuesto sobre las ventas',
+    '10': 'Obligado aduanero',
+    '13': 'Gran contribuyente',
+    '14': 'Informante de exógena',
+    '15': 'Autorretenedor',
+    '42': 'Obligado a llevar contabilidad',
+    '47': 'Régimen simple de tributación - SIMPLE',
+    '48': 'Impuesto sobre las ventas - IVA',
+    '49': 'No responsable de IVA',
+    '52': 'Facturador electrónico',
+}
+
+# Códigos anteriores a la Ley 2010 de 2019 -> equivalente vigente
+EQUIVALENCIAS = {
+    '11': '48',  # Ventas régimen común
+    '12': '49',  # Ventas régimen simplificado
+}
+
+# Textos libres: palabras que deben aparecer -> código
+# En orden: las reglas más específicas primero
+REGLAS = (
+    (('NO', 'RESPONSABLE', 'IVA'), '49'),
+    (('REGIMEN', 'SIMPLIFICADO'), '49'),
+    (('RETENCION', 'IVA'), '09'),
+    (('RETENCION', 'VENTAS'), '09'),
+    (('RETENCION',), '07'),
+    (('AUTORRETENEDOR',), '15'),
+    (('GRAN', 'CONTRIBUYENTE'), '13'),
+    (('ADUANERO',), '10'),
+    (('EXOGENA',), '14'),
+    (('CONTABILIDAD',), '42'),
+    (('SIMPLE',), '47'),
+    (('FACTURADOR',), '52'),
+    (('FACTURACION', 'ELECTRONICA'), '52'),
+    (('IVA',), '48'),
+    (('VENTAS',), '48'),
+    (('RENTA',), '05'),
+)
+
+_CODIGO_INICIAL = re.compile(r'^\s*(\d{1,2})\b')
+_NO_ALFANUMERICO = re.compile(r'[^A-Z0-9]+')
+
+
+def _palabras(texto: str) -> set:
+    plano = unicodedata.normalize('NFKD', texto.upper()).encode('ascii', 'ignore').decode('ascii')
+    return set(_NO_ALFANUMERICO.sub(' ', plano).split())
+
+
+def codigo(texto: Optional[str]) -> Optional[str]:
+    """
+    Código DIAN de una responsabilidad
+
+    '05 - Impuesto renta y compl.' -> '05'; 'IVA - RÉGIMEN COMÚN' -> '48'
+    None si el texto no es una responsabilidad del RUT (p. ej. 'ICA - CALI')
+    """
+    if not texto:
+        return None
+
+    inicial = _CODIGO_INICIAL.match(texto)
+    if inicial:
+        numero = inicial.group(1).zfill(2)
+        numero = EQUIVALENCIAS.get(numero, numero)
+        if numero in RESPONSABILIDADES:
+            return numero
+
+    palabras = _palabras(texto)
+    for requeridas, numero in REGLAS:
+        if palabras.issuperset(requeridas):
+            return numero
+    return None
+
+
+def codigos(textos: Iterable[str]) -> List[str]:
+    """Códigos ordenados y sin repetir de una lista de responsabilidades"""
+    return sorted({numero for numero in map(codigo, textos) if numero})
+
+
+def descripcion(numero: str) -> Optional[str]:
+    return RESPONSABILIDADES.get(numero)
@@ -5,7 +5,37 @@ Scraper para obtener datos reales del RUES (Confecámaras)
 import requests
 from bs4 import BeautifulSoup
 import re
-from datetime import datetime
+import unicodedata
+import ciiu
+import divipola
+from fechas import normalizar_fecha
+
+
+# Mensajes con los que el RUES dice explícitamente que el NIT no tiene matrícula
+_SIN_RESULTADOS = re.compile(
+    r'no se encontr(o|aron) (resultados|registros|informacion)'
+    r'|no (hay|existen) (resultados|registros)'
+    r'|sin resultados'
+)
+
+
+class PaginaNoReconocida(OSError):
+    """
+    La página no es de resultados ni de "sin resultados" (mantenimiento,
+    captcha o un cambio de formato). Error de la fuente: se reintenta y
+    nunca confirma que el NIT no exista
+    """
+
+
+def sin_resultados(html):
+    """
+    True si la página es la respuesta explícita de "sin resultados"
+    (solo entonces se puede concluir que el NIT no está en el RUES)
+    """
+    texto = html.decode('utf-8', 'ignore') if isinstance(html, bytes) else html
+    plano = unicodedata.normalize('NFKD', texto.lower()).encode('ascii', 'ignore').decode('ascii')
+    return _SIN_RESULTADOS.search(plano) is not None
+
 
 class RUESScraper:
     """
@@ -32,30 +62,48 @@ class RUESScraper:
             dict: Datos de la empresa o None si hay error
         """
         try:
-            # Hacer la petición POST
-            payload = {'nit': nit}
-            response = requests.post(
-                self.consulta_url, 
-                data=payload, 
-                headers=self.headers, 
-                timeout=15
-            )
+            html = self.obtener_html(nit)
             
-            if response.status_code != 200:
+            if sin_resultados(html):
                 return None
             
-            # Parsear HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extraer datos
-            datos = self._extraer_datos(soup, nit)
-            
-            return datos
+            # Parsear HTML y extraer datos
+            return extraer_campos(html, nit)
             
         except Exception as e:
             print(f"Error en consulta RUES: {e}")
             return None
     
+    def obtener_html(self, nit, timeout=15):
+        """
+        Descarga la página de consulta del RUES
+        
+        Args:
+            nit (str): NIT de 9 dígitos
+            timeout (float): Segundos máximos de espera
+            
+        Returns:
+            bytes: HTML crudo
+            
+        Raises:
+            requests.HTTPError: Si la respuesta no es 200 (caída, 5xx,
+                límite de peticiones); es un OSError, así que se reintenta
+        """
+        payload = {'nit': nit}
+        response = requests.post(
+            self.consulta_url, 
+            data=payload, 
+            headers=self.headers, 
+            timeout=timeout
+        )
+        
+        if response.status_code != 200:
+            raise requests.HTTPError(
+                f"El RUES respondió {response.status_code}", response=response
+            )
+        
+        return response.content
+    
     def _extraer_datos(self, soup, nit):
         """
         Extrae información del HTML del RUES
@@ -67,20 +115,23 @@ class RUESScraper:
         Returns:
             dict: Datos extraídos
         """
+        actividad = self._extraer_actividad(soup)
         datos = {
             'nit': nit,
             'razon_social': self._extraer_razon_social(soup),
             'estado': self._extraer_estado(soup),
             'municipio': self._extraer_municipio(soup),
             'departamento': self._extraer_departamento(soup),
-            'actividad_principal': self._extraer_actividad(soup),
+            'actividad_principal': actividad,
+            'codigo_ciiu': ciiu.codigo_para(actividad),
             'fecha_matricula': self._extraer_fecha_matricula(soup),
             'ultima_renovacion': self._extraer_ultima_renovacion(soup),
             'tipo_sociedad': self._extraer_tipo_sociedad(soup),
             'camara': self._extraer_camara(soup)
         }
         
-        return datos
+        # Nombres canónicos y código DIVIPOLA del municipio
+        return divipola.canonizar(datos)
     
     def _extraer_texto_por_label(self, soup, label):
         """
@@ -188,26 +239,27 @@ class RUESScraper:
         if not fecha_str or fecha_str == "No disponible":
             return "No disponible"
         
-        try:
-            # Intentar parsear diferentes formatos comunes
-            formatos = [
-                '%d/%m/%Y',
-                '%d-%m-%Y',
-                '%Y-%m-%d',
-                '%d de %B de %Y'
-            ]
-            
-            for formato in formatos:
-                try:
-                    fecha = datetime.strptime(fecha_str, formato)
-                    return fecha.strftime('%Y-%m-%d')
-                except:
-                    continue
-            
-            return fecha_str
-            
-        except:
-            return fecha_str
+        # Formatos numéricos y fechas en español (ver fechas.py)
+        return normalizar_fecha(fecha_str) or fecha_str
+
+def extraer_campos(html, nit, parser='html.parser'):
+    """
+    Parsea el HTML crudo del RUES y extrae los campos
+    
+    Función de módulo (sin estado) para poder ejecutarse
+    en un pool de procesos
+    
+    Args:
+        html (bytes): HTML crudo de la respuesta
+        nit (str): NIT consultado
+        parser (str): Parser de BeautifulSoup ('html.parser' o 'lxml' si está instalado)
+        
+    Returns:
+        dict: Campos extraídos como valores simples
+    """
+    soup = BeautifulSoup(html, parser)
+    return RUESScraper()._extraer_datos(soup, nit)
+
 
 # Función helper para uso fácil
 def consultar_rues(nit):
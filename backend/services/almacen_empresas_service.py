@@ -0,0 +1,318 @@
+"""
+Almacén de empresas derivado de las páginas archivadas
+Re-parseo masivo en un pool de procesos, sin tocar la red
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from base_datos import transaccion
+from config import DIRECTORIO_BACKEND, REPARSEO_WORKERS, REPARSEO_LOTE, RUTA_CATALOGO_CIIU
+from services.archivo_service import ArchivoService
+from services.fusion_datos import CAMPOS_REQUERIDOS, campo_lleno
+
+
+BASE_EMPRESAS = 'empresas.db'
+
+# Fuentes cuyas páginas archivadas se saben re-parsear:
+# (módulo, función extractora, función que reconoce la página de "sin resultados")
+EXTRACTORES = {
+    'RUES': ('rues_scraper', 'extraer_campos', 'sin_resultados'),
+}
+
+# Archivos de los que depende la salida de cada extractor: si cambia
+# alguno, el punto de control de un reparseo anterior ya no vale
+DEPENDENCIAS_EXTRACTOR = {
+    'RUES': tuple(
+        os.path.join(DIRECTORIO_BACKEND, archivo)
+        for archivo in ('rues_scraper.py', 'ciiu.py', 'divipola.py', 'datos_divipola.py', 'fechas.py')
+    ) + (RUTA_CATALOGO_CIIU,),
+}
+
+
+def huella_extractor(fuente: str) -> str:
+    """Hash del código y los catálogos que usa el extractor de la fuente"""
+    resumen = hashlib.sha256()
+    for ruta in DEPENDENCIAS_EXTRACTOR[fuente]:
+        # El catálogo CIIU es opcional
+        if os.path.exists(ruta):
+            with open(ruta, 'rb') as f:
+                resumen.update(f.read())
+    return resumen.hexdigest()[:16]
+
+
+def _reparsear_worker(fuente: str, nit: str, hash_contenido: str) -> Optional[Tuple]:
+    """
+    Tarea del pool: lee el documento archivado y extrae los campos
+    (la descompresión también corre en el worker)
+
+    Returns:
+        (nit, hash, datos, sin_resultado); datos es None si la página es
+        de "sin resultados" o el extractor falló. None si el documento
+        ya no está en el archivo
+    """
+    import importlib
+
+    nombre_modulo, funcion, reconocer_sin_resultados = EXTRACTORES[fuente]
+    modulo = importlib.import_module(nombre_modulo)
+
+    html = ArchivoService().leer(hash_contenido)
+    if html is None:
+        return None
+    if getattr(modulo, reconocer_sin_resultados)(html):
+        return nit, hash_contenido, None, True
+
+    try:
+        datos = getattr(modulo, funcion)(html, nit)
+    except Exception:
+        return nit, hash_contenido, None, False
+    return nit, hash_contenido, datos, False
+
+
+class AlmacenEmpresasService:
+    """
+    Registros de empresa extraídos de las páginas archivadas
+
+    Una fila por NIT con los campos extraídos, la fuente y el hash del
+    documento del que salieron. reparsear() lo reconstruye cuando cambia
+    el extractor (el punto de control es de una versión del extractor).
+    """
+
+    # Las tablas se crean una vez por proceso
+    _tablas_creadas = False
+
+    def __init__(self):
+        if not AlmacenEmpresasService._tablas_creadas:
+            self._crear_tablas()
+            AlmacenEmpresasService._tablas_creadas = True
+
+    def _crear_tablas(self):
+        with transaccion(BASE_EMPRESAS) as con:
+            con.execute('''
+                CREATE TABLE IF NOT EXISTS empresas (
+                    nit TEXT PRIMARY KEY,
+                    fuente TEXT NOT NULL,
+                    datos_json TEXT NOT NULL,
+                    hash_documento TEXT NOT NULL,
+                    extraido_en TEXT NOT NULL
+                )
+            ''')
+            con.execute('''
+                CREATE TABLE IF NOT EXISTS empresas_progreso (
+                    clave TEXT PRIMARY KEY,
+                    valor TEXT NOT NULL
+                )
+            ''')
+
+    def obtener(self, nit: str) -> Optional[Dict]:
+        """Datos de la empresa o None si no está en el almacén"""
+        with transaccion(BASE_EMPRESAS) as con:
+            fila = con.execute('SELECT datos_json FROM empresas WHERE nit = ?', (nit,)).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def obtener_varios(self, nits: List[str]) -> Dict[str, Dict]:
+        """Datos de las empresas que estén en el almacén (NIT -> datos)"""
+        encontradas = {}
+        with transaccion(BASE_EMPRESAS) as con:
+            # Bajo el límite de parámetros de SQLite
+            for inicio in range(0, len(nits), 500):
+                parte = nits[inicio:inicio + 500]
+                filas = con.execute(
+                    f"SELECT nit, datos_json FROM empresas WHERE nit IN ({','.join('?' * len(parte))})",
+                    parte
+                )
+                encontradas.update((nit, json.loads(datos)) for nit, datos in filas)
+        return encontradas
+    
+    def total(self) -> int:
+        with transaccion(BASE_EMPRESAS) as con:
+            return con.execute('SELECT COUNT(*) FROM empresas').fetchone()[0]
+
+    def _punto_control(self, fuente: str, version: str) -> str:
+        """Último NIT procesado con esa versión del extractor ('' si ninguno)"""
+        with transaccion(BASE_EMPRESAS) as con:
+            fila = con.execute(
+                'SELECT valor FROM empresas_progreso WHERE clave = ?', (f'reparseo:{fuente}',)
+            ).fetchone()
+        if not fila:
+            return ''
+        version_guardada, _, ultimo_nit = fila[0].partition(':')
+        return ultimo_nit if version_guardada == version else ''
+
+    def _guardar_lote(self, fuente: str, filas: List[Tuple], eliminados: List[str], version: str, ultimo_nit: str):
+        """
+        Escribe un lote, borra los NITs que ahora son "sin resultados" y
+        avanza el punto de control en la misma transacción
+        """
+        with transaccion(BASE_EMPRESAS) as con:
+            con.executemany(
+                'INSERT OR REPLACE INTO empresas (nit, fuente, datos_json, hash_documento, extraido_en) '
+                'VALUES (?, ?, ?, ?, ?)',
+                filas
+            )
+            con.executemany(
+                'DELETE FROM empresas WHERE nit = ? AND fuente = ?',
+                [(nit, fuente) for nit in eliminados]
+            )
+            con.execute(
+                'INSERT OR REPLACE INTO empresas_progreso (clave, valor) VALUES (?, ?)',
+                (f'reparseo:{fuente}', f'{version}:{ultimo_nit}')
+            )
+
+    def reiniciar(self, fuente: str):
+        """Olvida el punto de control: el próximo reparseo empieza de cero"""
+        with transaccion(BASE_EMPRESAS) as con:
+            con.execute('DELETE FROM empresas_progreso WHERE clave = ?', (f'reparseo:{fuente}',))
+
+    def reparsear(
+        self,
+        fuente: str = 'RUES',
+        max_workers: Optional[int] = None,
+        tamano_lote: int = REPARSEO_LOTE,
+        reporte=None
+    ) -> Dict:
+        """
+        Re-extrae la última página archivada de cada NIT de una fuente
+
+        Los documentos van por lotes a un pool de procesos; cada lote se
+        escribe en una transacción junto con el punto de control (versión
+        del extractor y último NIT), así una corrida interrumpida sigue
+        donde quedó y una corrida tras cambiar el extractor empieza de cero.
+
+        Un NIT cuya página ahora es de "sin resultados" sale del almacén;
+        una página sin razón social que no lo es cuenta como fallo y deja
+        el registro anterior.
+
+        Args:
+            fuente: Fuente archivada (ver EXTRACTORES)
+            max_workers: Procesos del pool (por defecto REPARSEO_WORKERS)
+            tamano_lote: Documentos por lote
+            reporte: Función opcional que recibe las estadísticas tras cada lote
+
+        Returns:
+            Estadísticas: documentos, documentos/seg, fallos, páginas sin
+            resultado y tasa de extracción por campo (sobre las empresas
+            encontradas)
+        """
+        if fuente not in EXTRACTORES:
+            raise ValueError(f"No hay extractor para la fuente {fuente}")
+
+        version = huella_extractor(fuente)
+        desde = self._punto_control(fuente, version)
+        pendientes = (
+            (nit, hash_contenido)
+            for nit, hash_contenido in ArchivoService().ultimas_capturas(fuente)
+            if nit > desde
+        )
+
+        campos_llenos: Counter = Counter()
+        conteo = {'documentos': 0, 'fallos': 0, 'sin_resultado': 0}
+        inicio = time.perf_counter()
+        estadisticas = {}
+        workers = max_workers or REPARSEO_WORKERS
+
+        def procesar(lote, resultados):
+            ahora = datetime.now().isoformat()
+            filas, eliminados = [], []
+            for resultado in resultados:
+                conteo['documentos'] += 1
+                if resultado is None:
+                    conteo['fallos'] += 1
+                    continue
+
+                nit, hash_contenido, datos, sin_resultado = resultado
+                if sin_resultado:
+                    conteo['sin_resultado'] += 1
+                    eliminados.append(nit)
+                    continue
+                if datos is None or not campo_lleno(datos.get('razon_social')):
+                    # Extractor falló o página no reconocida: queda el registro anterior
+                    conteo['fallos'] += 1
+                    continue
+                
+                campos_llenos.update(campo for campo, valor in datos.items() if campo_lleno(valor))
+                filas.append((nit, fuente, json.dumps(datos, ensure_ascii=False), hash_contenido, ahora))
+
+            self._guardar_lote(fuente, filas, eliminados, version, lote[-1][0])
+
+            documentos, fallos, sin_resultado = conteo['documentos'], conteo['fallos'], conteo['sin_resultado']
+            segundos = time.perf_counter() - inicio
+            estadisticas.update({
+                'documentos': documentos,
+                'fallos': fallos,
+                'sin_resultado': sin_resultado,
+                'segundos': round(segundos, 2),
+                'documentos_por_segundo': round(documentos / segundos, 1) if segundos else None,
+                'tasa_por_campo': {
+                    campo: round(campos_llenos[campo] / max(1, documentos - fallos - sin_resultado), 4)
+                    for campo in CAMPOS_REQUERIDOS
+                }
+            })
+            if reporte:
+                reporte(estadisticas)
+
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as pool:
+            # Un lote de adelanto: el pool trabaja mientras se escribe el anterior
+            anterior = None
+            for lote in _lotes(pendientes, tamano_lote):
+                resultados = pool.map(
+                    _reparsear_worker,
+                    [fuente] * len(lote),
+                    [nit for nit, _ in lote],
+                    [hash_contenido for _, hash_contenido in lote],
+                    chunksize=max(1, len(lote) // (4 * workers))
+                )
+                if anterior:
+                    procesar(*anterior)
+                anterior = (lote, resultados)
+
+            if anterior:
+                procesar(*anterior)
+
+        return estadisticas or {'documentos': 0, 'fallos': 0, 'sin_resultado': 0}
+
+
+def _lotes(iterable, tamano: int) -> Iterator[List]:
+    iterador = iter(iterable)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+if __name__ == "__main__":
+    import sys
+
+    almacen = AlmacenEmpresasService()
+    fuente = 'RUES'
+
+    print("="*60)
+    print("♻️  REPARSEO DE PÁGINAS ARCHIVADAS")
+    print("="*60)
+
+    if '--reiniciar' in sys.argv:
+        almacen.reiniciar(fuente)
+        print("   Punto de control reiniciado")
+
+    def imprimir(estadisticas):
+        print(f"   {estadisticas['documentos']} documentos "
+              f"({estadisticas['documentos_por_segundo']} docs/seg, {estadisticas['fallos']} fallos, "
+              f"{estadisticas['sin_resultado']} sin resultado)")
+
+    resultado = almacen.reparsear(fuente, reporte=imprimir)
+
+    print("\n   Tasa de extracción por campo:")
+    for campo, tasa in resultado.get('tasa_por_campo', {}).items():
+        print(f"   {campo:22s} {tasa:7.2%}")
+    print(f"\n✅ {almacen.total()} empresas en el almacén")
+    print("="*60)
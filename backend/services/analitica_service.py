@@ -0,0 +1,145 @@
+"""
+Analítica de portafolio sobre los snapshots de score
+Conteos, distribución de score, niveles y prevalencia de señales por
+departamento, municipio, CIIU, tamaño o nivel
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Optional
+
+from base_datos import transaccion
+from services.compliance_service import ComplianceService
+from services.snapshot_service import (
+    BASE_SNAPSHOTS, DIMENSIONES, DIMENSION_TOTAL, SnapshotService, contribuciones
+)
+
+
+class AnaliticaService:
+    """
+    Agregados por dimensión
+
+    Sin lista de NITs se leen los agregados que SnapshotService mantiene
+    al guardar cada fila (una lectura por índice, sin recorrer la tabla).
+    Con la lista de un cliente se agrupan solo esas filas.
+    """
+
+    def __init__(self):
+        # Asegura las tablas y la construcción inicial de los agregados
+        SnapshotService()
+
+    def agrupar(
+        self,
+        dimension: str,
+        valor: Optional[str] = None,
+        nits: Optional[Iterable[str]] = None
+    ) -> Dict:
+        """
+        Agregados de una dimensión
+
+        Args:
+            dimension: Una de DIMENSIONES
+            valor: Solo ese grupo (p. ej. 'ANTIOQUIA')
+            nits: Restringir a estos NITs (portafolio de un cliente)
+
+        Returns:
+            {'dimension', 'total', 'grupos': [...]} con los grupos de mayor
+            a menor número de empresas
+
+        Raises:
+            ValueError: Dimensión desconocida
+        """
+        if dimension not in DIMENSIONES:
+            raise ValueError(f"Dimensión desconocida: {dimension}. Opciones: {', '.join(DIMENSIONES)}")
+
+        if nits is None:
+            metricas = self._leer_agregados(dimension, valor)
+        else:
+            metricas = self._agrupar_nits(dimension, valor, nits)
+
+        total = metricas.pop('', {})
+        grupos = [_formatear(valor_grupo, m) for valor_grupo, m in metricas.items()]
+        grupos.sort(key=lambda grupo: (-grupo['empresas'], grupo['valor']))
+
+        return {
+            'dimension': dimension,
+            'total': _formatear(DIMENSION_TOTAL, total) if total else None,
+            'grupos': grupos
+        }
+
+    def _leer_agregados(self, dimension: str, valor: Optional[str]) -> Dict[str, Dict[str, int]]:
+        condicion, parametros = 'dimension = ?', [dimension]
+        if valor is not None:
+            condicion += ' AND valor = ?'
+            parametros.append(valor)
+
+        with transaccion(BASE_SNAPSHOTS) as con:
+            filas = con.execute(
+                f'''SELECT dimension, valor, metrica, n FROM snapshots_agregados
+                    WHERE ({condicion}) OR dimension = ?''',
+                parametros + [DIMENSION_TOTAL]
+            ).fetchall()
+
+        metricas = defaultdict(dict)
+        for dimension_fila, valor_fila, metrica, n in filas:
+            # El total queda bajo la clave ''
+            metricas['' if dimension_fila == DIMENSION_TOTAL else valor_fila][metrica] = n
+        return metricas
+
+    def _agrupar_nits(self, dimension: str, valor: Optional[str], nits: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        nits = list(dict.fromkeys(nits))
+        suma = Counter()
+
+        version = ComplianceService.huella_configuracion()
+        with transaccion(BASE_SNAPSHOTS) as con:
+            for fila in SnapshotService().filas_por_nit(con, nits, version):
+                suma.update(contribuciones(fila))
+
+        metricas = defaultdict(dict)
+        for (dimension_fila, valor_fila, metrica), n in suma.items():
+            if dimension_fila == DIMENSION_TOTAL:
+                metricas[''][metrica] = n
+            elif dimension_fila == dimension and valor in (None, valor_fila):
+                metricas[valor_fila][metrica] = n
+        return metricas
+
+
+def _formatear(valor: str, metricas: Dict[str, int]) -> Dict:
+    """Conteos de un grupo en formato de respuesta"""
+    empresas = metricas.get('empresas', 0)
+
+    def por_prefijo(prefijo: str) -> Dict[str, int]:
+        return {
+            metrica[len(prefijo):]: n
+            for metrica, n in sorted(metricas.items())
+            if metrica.startswith(prefijo)
+        }
+
+    return {
+        'valor': valor,
+        'empresas': empresas,
+        'score_promedio': round(metricas.get('suma_score', 0) / empresas, 1) if empresas else None,
+        'distribucion_score': por_prefijo('score:'),
+        'niveles': {
+            nivel: {'empresas': n, 'proporcion': round(n / empresas, 4)}
+            for nivel, n in por_prefijo('nivel:').items()
+        },
+        'prevalencia_senales': {
+            señal: round(n / empresas, 4) for señal, n in por_prefijo('senal:').items()
+        }
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    dimension = sys.argv[1] if len(sys.argv) > 1 else 'departamento'
+    resultado = AnaliticaService().agrupar(dimension)
+
+    print("="*60)
+    print(f"📊 PORTAFOLIO POR {dimension.upper()}")
+    print("="*60)
+
+    for grupo in resultado['grupos']:
+        niveles = ', '.join(f"{nivel} {d['proporcion']:.0%}" for nivel, d in grupo['niveles'].items())
+        print(f"   {grupo['valor']:28s} {grupo['empresas']:6d}  score {grupo['score_promedio']}  ({niveles})")
+    print("="*60)
@@ -0,0 +1,270 @@
+"""
+Archivo de respuestas crudas de las fuentes (direccionado por contenido)
+Guarda cada página descargada para poder re-parsear sin volver a la red
+"""
+
+import gzip
+import hashlib
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from base_datos import transaccion
+from config import DIRECTORIO_ARCHIVO, ARCHIVO_RETENCION_DIAS, ARCHIVO_MAX_CAPTURAS_POR_NIT
+
+# zstd comprime mejor y más rápido que gzip; es opcional
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+BASE_ARCHIVO = 'archivo.db'
+
+
+def _comprimir(contenido: bytes) -> Tuple[bytes, str]:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(contenido), 'zst'
+    return gzip.compress(contenido, compresslevel=6), 'gz'
+
+
+def _descomprimir(datos: bytes, codec: str) -> bytes:
+    if codec == 'zst':
+        if zstandard is None:
+            raise RuntimeError("Documento en zstd y el paquete zstandard no está instalado")
+        return zstandard.ZstdDecompressor().decompress(datos)
+    return gzip.decompress(datos)
+
+
+class ArchivoService:
+    """
+    Documentos crudos por hash SHA-256 del contenido
+
+    - Cada documento se guarda una sola vez (comprimido) aunque varias
+      capturas o NITs devuelvan la misma página
+    - El índice registra cada captura por fuente, NIT y fecha
+    - Si el contenido no cambió desde la última captura del NIT no se
+      registra una nueva
+    - La retención borra capturas viejas (conservando siempre la última
+      de cada NIT) y los documentos que quedan sin referencias
+    """
+
+    # Las tablas se crean una vez por proceso
+    _tablas_creadas = False
+
+    def __init__(self):
+        if not ArchivoService._tablas_creadas:
+            self._crear_tablas()
+            ArchivoService._tablas_creadas = True
+
+    def _crear_tablas(self):
+        with transaccion(BASE_ARCHIVO) as con:
+            con.execute('''
+                CREATE TABLE IF NOT EXISTS documentos (
+                    hash TEXT PRIMARY KEY,
+                    codec TEXT NOT NULL,
+                    tamano INTEGER NOT NULL,
+                    tamano_comprimido INTEGER NOT NULL,
+                    creado_en REAL NOT NULL
+                )
+            ''')
+            con.execute('''
+                CREATE TABLE IF NOT EXISTS capturas (
+                    id INTEGER PRIMARY KEY,
+                    fuente TEXT NOT NULL,
+                    nit TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    capturado_en REAL NOT NULL
+                )
+            ''')
+            con.execute('CREATE INDEX IF NOT EXISTS idx_capturas_nit ON capturas (fuente, nit, capturado_en)')
+            con.execute('CREATE INDEX IF NOT EXISTS idx_capturas_hash ON capturas (hash)')
+
+    def _ruta(self, hash_contenido: str, codec: str) -> str:
+        return os.path.join(DIRECTORIO_ARCHIVO, hash_contenido[:2], f"{hash_contenido}.{codec}")
+
+    def guardar(self, fuente: str, nit: str, contenido: bytes, si_cambio: bool = True) -> Tuple[str, bool]:
+        """
+        Archiva una respuesta
+
+        Args:
+            fuente: Nombre de la fuente (p. ej. 'RUES')
+            nit: NIT consultado
+            contenido: Bytes crudos de la respuesta
+            si_cambio: No registrar captura si es igual a la última del NIT
+
+        Returns:
+            (hash, registrada) con registrada False si no cambió
+        """
+        hash_contenido = hashlib.sha256(contenido).hexdigest()
+
+        if si_cambio and self.ultimo_hash(fuente, nit) == hash_contenido:
+            return hash_contenido, False
+
+        with transaccion(BASE_ARCHIVO) as con:
+            # Con el lock de escritura desde la consulta: la retención no
+            # puede borrar el documento entre que se ve y se referencia
+            con.execute('BEGIN IMMEDIATE')
+            existe = con.execute(
+                'SELECT 1 FROM documentos WHERE hash = ?', (hash_contenido,)
+            ).fetchone()
+
+            if not existe:
+                comprimido, codec = _comprimir(contenido)
+                ruta = self._ruta(hash_contenido, codec)
+                os.makedirs(os.path.dirname(ruta), exist_ok=True)
+
+                # Escritura atómica: otro proceso puede estar guardando el mismo documento
+                temporal = f"{ruta}.{os.getpid()}.tmp"
+                with open(temporal, 'wb') as f:
+                    f.write(comprimido)
+                os.replace(temporal, ruta)
+
+                con.execute(
+                    'INSERT OR IGNORE INTO documentos (hash, codec, tamano, tamano_comprimido, creado_en) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (hash_contenido, codec, len(contenido), len(comprimido), time.time())
+                )
+
+            con.execute(
+                'INSERT INTO capturas (fuente, nit, hash, capturado_en) VALUES (?, ?, ?, ?)',
+                (fuente, nit, hash_contenido, time.time())
+            )
+
+        return hash_contenido, True
+
+    def ultimo_hash(self, fuente: str, nit: str) -> Optional[str]:
+        """Hash de la última captura de un NIT (None si no hay)"""
+        with transaccion(BASE_ARCHIVO) as con:
+            fila = con.execute(
+                'SELECT hash FROM capturas WHERE fuente = ? AND nit = ? '
+                'ORDER BY capturado_en DESC LIMIT 1',
+                (fuente, nit)
+            ).fetchone()
+        return fila[0] if fila else None
+
+    def leer(self, hash_contenido: str) -> Optional[bytes]:
+        """Contenido original de un documento (None si no está)"""
+        with transaccion(BASE_ARCHIVO) as con:
+            fila = con.execute(
+                'SELECT codec FROM documentos WHERE hash = ?', (hash_contenido,)
+            ).fetchone()
+        if not fila:
+            return None
+
+        try:
+            with open(self._ruta(hash_contenido, fila[0]), 'rb') as f:
+                return _descomprimir(f.read(), fila[0])
+        except FileNotFoundError:
+            # La retención lo borró después de la consulta
+            return None
+
+    def capturas(self, fuente: str, nit: str) -> List[Dict]:
+        """Historial de capturas de un NIT, la más reciente primero"""
+        with transaccion(BASE_ARCHIVO) as con:
+            filas = con.execute(
+                'SELECT hash, capturado_en FROM capturas WHERE fuente = ? AND nit = ? '
+                'ORDER BY capturado_en DESC',
+                (fuente, nit)
+            ).fetchall()
+        return [{'hash': h, 'capturado_en': t} for h, t in filas]
+
+    def ultimas_capturas(self, fuente: str) -> Iterator[Tuple[str, str]]:
+        """
+        (nit, hash) de la última captura de cada NIT de una fuente, por NIT
+        Lee en páginas para no cargar todo el índice en memoria
+        """
+        ultimo_nit = ''
+        while True:
+            with transaccion(BASE_ARCHIVO) as con:
+                filas = con.execute(
+                    '''SELECT nit, hash FROM capturas c
+                       WHERE fuente = ? AND nit > ?
+                         AND capturado_en = (SELECT MAX(capturado_en) FROM capturas
+                                             WHERE fuente = c.fuente AND nit = c.nit)
+                       ORDER BY nit LIMIT 1000''',
+                    (fuente, ultimo_nit)
+                ).fetchall()
+            if not filas:
+                return
+            yield from filas
+            ultimo_nit = filas[-1][0]
+
+    def aplicar_retencion(
+        self,
+        dias: float = ARCHIVO_RETENCION_DIAS,
+        max_por_nit: int = ARCHIVO_MAX_CAPTURAS_POR_NIT
+    ) -> Dict:
+        """
+        Borra capturas de más de `dias` o más allá de las `max_por_nit`
+        más recientes (la última de cada NIT siempre se conserva) y luego
+        los documentos sin capturas
+
+        Returns:
+            Conteo de capturas y documentos borrados
+        """
+        limite = time.time() - dias * 86400
+
+        with transaccion(BASE_ARCHIVO) as con:
+            capturas = con.execute(
+                '''DELETE FROM capturas WHERE id IN (
+                       SELECT id FROM (
+                           SELECT id, capturado_en, ROW_NUMBER() OVER (
+                               PARTITION BY fuente, nit ORDER BY capturado_en DESC
+                           ) AS orden
+                           FROM capturas
+                       )
+                       WHERE orden > 1 AND (orden > ? OR capturado_en < ?)
+                   )''',
+                (max_por_nit, limite)
+            ).rowcount
+
+            huerfanos = con.execute(
+                'SELECT hash, codec FROM documentos WHERE hash NOT IN (SELECT hash FROM capturas)'
+            ).fetchall()
+            con.executemany('DELETE FROM documentos WHERE hash = ?', [(h,) for h, _ in huerfanos])
+
+            # Los archivos se borran con el lock de escritura tomado: un
+            # guardar() concurrente del mismo contenido espera al commit y
+            # entonces ya no ve el documento, así que lo vuelve a escribir
+            for hash_contenido, codec in huerfanos:
+                try:
+                    os.remove(self._ruta(hash_contenido, codec))
+                except FileNotFoundError:
+                    pass
+
+        return {'capturas_borradas': capturas, 'documentos_borrados': len(huerfanos)}
+
+    def estadisticas(self) -> Dict:
+        with transaccion(BASE_ARCHIVO) as con:
+            documentos, tamano, comprimido = con.execute(
+                'SELECT COUNT(*), COALESCE(SUM(tamano), 0), COALESCE(SUM(tamano_comprimido), 0) FROM documentos'
+            ).fetchone()
+            capturas, nits = con.execute(
+                'SELECT COUNT(*), COUNT(DISTINCT fuente || nit) FROM capturas'
+            ).fetchone()
+        return {
+            'documentos': documentos,
+            'capturas': capturas,
+            'nits': nits,
+            'bytes_originales': tamano,
+            'bytes_comprimidos': comprimido,
+            'codec': 'zst' if zstandard is not None else 'gz'
+        }
+
+
+if __name__ == "__main__":
+    import sys
+
+    archivo = ArchivoService()
+
+    print("="*60)
+    print("🗄️  ARCHIVO DE RESPUESTAS CRUDAS")
+    print("="*60)
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'retencion':
+        print(f"   Retención: {archivo.aplicar_retencion()}")
+
+    for clave, valor in archivo.estadisticas().items():
+        print(f"   {clave}: {valor}")
+    print("="*60)
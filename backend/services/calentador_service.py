@@ -0,0 +1,138 @@
+"""
+Calentador del cache de empresas
+Refresca en segundo plano las empresas más consultadas antes de que
+venza su entrada, para que una consulta popular nunca llegue en frío
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from cache.fabrica import obtener_cache
+from config import (
+    CACHE_TTL_EMPRESAS,
+    CALENTADOR_INTERVALO_SEGUNDOS,
+    CALENTADOR_TOP,
+    CALENTADOR_MIN_FRECUENCIA,
+    CALENTADOR_ANTICIPACION_SEGUNDOS
+)
+import popularidad
+from trazas import obtener_logger
+
+logger = obtener_logger('calentador')
+
+
+class CalentadorCache:
+    """
+    Cada intervalo toma el top de popularidad.obtener_sketch() y vuelve a
+    verificar (por lote) las empresas cuya entrada falta o vence dentro
+    de la anticipación; también deja calculado su score
+    """
+
+    def __init__(
+        self,
+        intervalo: float = CALENTADOR_INTERVALO_SEGUNDOS,
+        top: int = CALENTADOR_TOP,
+        min_frecuencia: int = CALENTADOR_MIN_FRECUENCIA,
+        anticipacion: float = CALENTADOR_ANTICIPACION_SEGUNDOS
+    ):
+        self.intervalo = intervalo
+        self.top = top
+        self.min_frecuencia = min_frecuencia
+        self.anticipacion = anticipacion
+        self.cache = obtener_cache('empresas', CACHE_TTL_EMPRESAS)
+        self.ciclos = 0
+        self.refrescadas = 0
+        self.ultimo_ciclo: Optional[float] = None
+
+    def populares(self) -> List[str]:
+        """NITs del top con frecuencia suficiente para mantenerlos calientes"""
+        return [
+            nit for nit, frecuencia in popularidad.obtener_sketch().top(self.top)
+            if frecuencia >= self.min_frecuencia
+        ]
+
+    def vence_pronto(self, entrada: Optional[Dict]) -> bool:
+        """La entrada (del cache de empresas) falta o vence dentro de la anticipación"""
+        if not entrada:
+            return True
+        try:
+            actualizada = datetime.fromisoformat(entrada['metadata']['ultima_actualizacion']).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return True
+        return actualizada + CACHE_TTL_EMPRESAS - time.time() < self.anticipacion
+
+    async def ciclo(self) -> int:
+        """
+        Una pasada del calentador
+
+        Returns:
+            Número de empresas refrescadas
+        """
+        from services.verificacion_service import VerificacionService
+        from services.snapshot_service import SnapshotService
+
+        entradas = await self.cache.obtener_varios_async(self.populares())
+        por_refrescar = [nit for nit, entrada in entradas.items() if self.vence_pronto(entrada)]
+        self.ciclos += 1
+        self.ultimo_ciclo = time.time()
+        if not por_refrescar:
+            return 0
+
+        empresas = await VerificacionService().verificar_lote(por_refrescar, refrescar=True)
+        encontradas = [empresa for empresa in empresas.values() if empresa]
+
+        # Score listo para la próxima consulta (SQLite: fuera del event loop)
+        snapshots = SnapshotService()
+        await asyncio.to_thread(lambda: [snapshots.obtener_o_calcular(empresa) for empresa in encontradas])
+
+        self.refrescadas += len(encontradas)
+        logger.info("Calentador: %d de %d empresas populares refrescadas", len(encontradas), len(por_refrescar))
+        return len(encontradas)
+
+    async def ejecutar(self):
+        """Ciclos cada intervalo hasta que se cancele la tarea"""
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await self.ciclo()
+            except Exception as e:
+                # Un ciclo fallido no detiene al calentador
+                logger.warning("Error en el ciclo del calentador: %s", e)
+
+    def estadisticas(self) -> Dict:
+        return {
+            'ciclos': self.ciclos,
+            'refrescadas': self.refrescadas,
+            'ultimo_ciclo': datetime.fromtimestamp(self.ultimo_ciclo).isoformat() if self.ultimo_ciclo else None,
+            'intervalo_segundos': self.intervalo,
+            'top': self.top,
+            'min_frecuencia': self.min_frecuencia
+        }
+
+
+# Calentador del worker y su tarea en el event loop
+_calentador: Optional[CalentadorCache] = None
+_tarea: Optional[asyncio.Task] = None
+
+
+def obtener_calentador() -> CalentadorCache:
+    global _calentador
+    if _calentador is None:
+        _calentador = CalentadorCache()
+    return _calentador
+
+
+def iniciar_calentador():
+    """Lanza el calentador en el event loop actual (una vez por worker)"""
+    global _tarea
+    if _tarea is None or _tarea.done():
+        _tarea = asyncio.get_running_loop().create_task(obtener_calentador().ejecutar())
+
+
+def detener_calentador():
+    global _tarea
+    if _tarea is not None:
+        _tarea.cancel()
+        _tarea = None
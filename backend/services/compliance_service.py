@@ -3,9 +3,12 @@ Servicio de compliance y scoring
 Genera el Corenta Score
 """
 
+import hashlib
+import json
 from typing import Dict, List
 from models.empresa import EmpresaCompleta, ScoreCompliance, SeñalesAduana
-from datetime import datetime, timedelta
+from datetime import datetime
+from fechas import fecha_a_ordinal, ordinal_hoy
 
 
 class ComplianceService:
@@ -13,6 +16,23 @@ class ComplianceService:
     Motor de scoring y predicción de compliance
     """
     
+    # Versión de la lógica de scoring
+    # Incrementar cuando cambie el cálculo para invalidar snapshots
+    VERSION_MOTOR = '3'
+    
+    # Días que una renovación se considera vigente
+    DIAS_RENOVACION_VIGENTE = 365
+    
+    # Obligaciones del mapa que informa cada fuente
+    # Si la fuente no respondió dentro del plazo quedan 'Por verificar'
+    # (las alcaldías se agrupan: 'ICA:BOGOTA' -> 'ICA'; Aduana no informa
+    # ninguna obligación del mapa, solo señales)
+    OBLIGACIONES_POR_FUENTE = {
+        'RUES': ('renovacion_camara',),
+        'DIAN': ('iva', 'retencion', 'renta'),
+        'ICA': ('ica',),
+    }
+    
     # Configuración de señales
     SEÑALES_CONFIG = {
         'matricula_activa': {
@@ -52,6 +72,19 @@ class ComplianceService:
         }
     }
     
+    @classmethod
+    def huella_configuracion(cls) -> str:
+        """
+        Hash de SEÑALES_CONFIG y de la versión del motor
+        Identifica los snapshots calculados con esta configuración
+        """
+        contenido = json.dumps(
+            {'señales': cls.SEÑALES_CONFIG, 'motor': cls.VERSION_MOTOR},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16]
+    
     def calcular_score(self, empresa: EmpresaCompleta) -> ScoreCompliance:
         """
         Calcula el Corenta Score completo
@@ -96,12 +129,21 @@ class ComplianceService:
             }
         
         # Señal 4: RUT verificado
-        if empresa.datos_operacionales.responsabilidades_tributarias:
+        # Con respuesta de la DIAN: RUT activo con responsabilidades;
+        # sin ella, las responsabilidades que reportan las fuentes de registro
+        operacionales = empresa.datos_operacionales
+        if empresa.señales_rut is not None:
+            rut_verificado = empresa.señales_rut.activo and bool(empresa.señales_rut.responsabilidades)
+        else:
+            rut_verificado = bool(operacionales.responsabilidades_tributarias)
+        if rut_verificado:
             score += self.SEÑALES_CONFIG['rut_verificado']['peso']
             señales_activas.append('rut_verificado')
             detalles['rut'] = {
                 'estado': 'VERIFICADO',
-                'responsabilidades': len(empresa.datos_operacionales.responsabilidades_tributarias),
+                'fuente': 'dian' if empresa.señales_rut is not None else 'registro',
+                'responsabilidades': len(operacionales.responsabilidades_tributarias),
+                'codigos': operacionales.codigos_responsabilidades,
                 'puntos': self.SEÑALES_CONFIG['rut_verificado']['peso']
             }
         
@@ -115,8 +157,17 @@ class ComplianceService:
                 'puntos': self.SEÑALES_CONFIG['comercio_exterior_activo']['peso']
             }
         
+        # Señal 5: ICA vigente (municipios con portal configurado)
+        if empresa.señales_ica and empresa.señales_ica.al_dia:
+            score += self.SEÑALES_CONFIG['ica_vigente']['peso']
+            señales_activas.append('ica_vigente')
+            detalles['ica'] = {
+                'estado': 'AL DÍA',
+                'ultimo_periodo': empresa.señales_ica.ultimo_periodo_declarado,
+                'puntos': self.SEÑALES_CONFIG['ica_vigente']['peso']
+            }
+        
         # TODO: Implementar cuando tengamos las integraciones:
-        # - Señal 5: ICA vigente
         # - Señal 6: Sin sanciones
         
         # Clasificar nivel
@@ -132,15 +183,12 @@ class ComplianceService:
     def _renovacion_vigente(self, empresa: EmpresaCompleta) -> bool:
         """
         Verifica si la renovación está vigente (últimos 12 meses)
+        Compara ordinales: la fecha se parsea una vez y queda memoizada
         """
-        try:
-            fecha_renovacion = datetime.fromisoformat(
-                empresa.datos_registrales.ultima_renovacion
-            )
-            hace_un_ano = datetime.now() - timedelta(days=365)
-            return fecha_renovacion >= hace_un_ano
-        except:
+        ordinal_renovacion = fecha_a_ordinal(empresa.datos_registrales.ultima_renovacion)
+        if ordinal_renovacion is None:
             return False
+        return ordinal_renovacion > ordinal_hoy() - self.DIAS_RENOVACION_VIGENTE
     
     def _score_por_tamano(self, empresa: EmpresaCompleta) -> int:
         """
@@ -180,7 +228,7 @@ class ComplianceService:
         Genera el mapa de cumplimiento (formato actual de la API)
         Para mantener compatibilidad con frontend
         """
-        return {
+        mapa = {
             'estado_matricula': {
                 'estado': empresa.datos_basicos.estado,
                 'icono': '✅' if empresa.datos_basicos.estado == 'ACTIVA' else '❌',
@@ -202,11 +250,7 @@ class ComplianceService:
                     'icono': '🕐',
                     'descripcion': 'Pendiente consulta DIAN'
                 },
-                'ica': {
-                    'estado': 'Por verificar con Alcaldía',
-                    'icono': '🕐',
-                    'descripcion': f"Consulta Alcaldía de {empresa.datos_basicos.municipio}"
-                },
+                'ica': self._obligacion_ica(empresa),
                 'renta': {
                     'estado': 'Por verificar en DIAN',
                     'icono': '🕐',
@@ -218,6 +262,80 @@ class ComplianceService:
             'nivel': score.nivel,
             'fecha_consulta': datetime.now().isoformat()
         }
+        
+        # Con el RUT de la DIAN, las obligaciones nacionales salen de sus códigos
+        if empresa.señales_rut is not None:
+            mapa['obligaciones'].update(self._obligaciones_rut(empresa))
+        
+        # Resultado parcial: lo que dependía de fuentes omitidas no se afirma
+        for fuente in empresa.metadata.fuentes_omitidas:
+            for obligacion in self.OBLIGACIONES_POR_FUENTE.get(fuente.split(':')[0], ()):
+                mapa['obligaciones'][obligacion] = {
+                    'estado': 'Por verificar',
+                    'icono': '🕐',
+                    'descripcion': f'{fuente} no respondió a tiempo'
+                }
+        
+        return mapa
+    
+    def _obligaciones_rut(self, empresa: EmpresaCompleta) -> Dict:
+        """IVA, retención y renta según las responsabilidades del RUT"""
+        rut = empresa.señales_rut
+        
+        if not rut.registrado:
+            sin_rut = {'estado': 'Sin RUT', 'icono': '❌', 'descripcion': 'NIT no inscrito en el RUT'}
+            return {'iva': sin_rut, 'retencion': dict(sin_rut), 'renta': dict(sin_rut)}
+        
+        codigos = set(rut.responsabilidades)
+        
+        def obligacion(aplica: bool, estado: str, descripcion: str) -> Dict:
+            if not rut.activo:
+                return {'estado': 'RUT no activo', 'icono': '❌', 'descripcion': rut.estado or 'RUT no activo'}
+            if not aplica:
+                return {'estado': 'No aplica', 'icono': '➖', 'descripcion': 'Sin la responsabilidad en el RUT'}
+            return {'estado': estado, 'icono': '✅', 'descripcion': descripcion}
+        
+        return {
+            'iva': (
+                obligacion(True, 'No responsable', 'No responsable de IVA (49) según RUT')
+                if '49' in codigos and '48' not in codigos
+                else obligacion('48' in codigos, 'Responsable', 'Responsable de IVA (48) según RUT')
+            ),
+            'retencion': obligacion(
+                bool(codigos & {'07', '09'}), 'Agente retenedor',
+                f"Retención en la fuente ({', '.join(sorted(codigos & {'07', '09'}))}) según RUT"
+            ),
+            'renta': obligacion('05' in codigos, 'Contribuyente', 'Renta régimen ordinario (05) según RUT'),
+        }
+    
+    def _obligacion_ica(self, empresa: EmpresaCompleta) -> Dict:
+        """Estado del ICA según el portal de la alcaldía (si se consultó)"""
+        municipio = empresa.datos_basicos.municipio
+        ica = empresa.señales_ica
+        
+        if ica is None:
+            return {
+                'estado': 'Por verificar con Alcaldía',
+                'icono': '🕐',
+                'descripcion': f"Consulta Alcaldía de {municipio}"
+            }
+        if not ica.inscrito:
+            return {
+                'estado': 'No inscrito',
+                'icono': '❌',
+                'descripcion': f"Sin registro de ICA en {municipio}"
+            }
+        if ica.al_dia:
+            return {
+                'estado': 'Al día',
+                'icono': '✅',
+                'descripcion': f"Declarado {ica.ultimo_periodo_declarado} en {municipio}"
+            }
+        return {
+            'estado': 'Pendiente',
+            'icono': '⚠️',
+            'descripcion': f"Falta declarar {ica.periodo_exigible} en {municipio}"
+        }
     
     def _generar_proximos_pasos(self, empresa: EmpresaCompleta, score: ScoreCompliance) -> List[str]:
         """
@@ -226,15 +344,22 @@ class ComplianceService:
         pasos = []
         
         # Si no tiene RUT verificado
-        if 'rut_verificado' not in score.señales_activas:
+        if empresa.señales_rut is not None and empresa.señales_rut.registrado and not empresa.señales_rut.activo:
+            pasos.append(f'Reactivar el RUT ({empresa.señales_rut.estado})')
+        elif 'rut_verificado' not in score.señales_activas:
             pasos.append('Verificar RUT en DIAN')
         
         # Si tiene comercio exterior, priorizar actualización
         if empresa.señales_aduana and empresa.señales_aduana.activo:
             pasos.append('Validar actividad de comercio exterior en RUT')
         
+        # ICA: consultar si no se verificó, declarar si está pendiente
+        if empresa.señales_ica is None:
+            pasos.append(f'Consultar estado ICA en {empresa.datos_basicos.municipio}')
+        elif 'ica_vigente' not in score.señales_activas:
+            pasos.append(f'Ponerse al día con el ICA en {empresa.datos_basicos.municipio}')
+        
         # Siempre incluir
-        pasos.append(f'Consultar estado ICA en {empresa.datos_basicos.municipio}')
         pasos.append('Validar facturación electrónica')
         pasos.append('Revisar declaraciones recientes')
         
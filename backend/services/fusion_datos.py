@@ -0,0 +1,93 @@
+"""
+Fusión por campo de los datos básicos de varias fuentes principales
+"""
+
+from typing import Dict, Optional
+
+from config import PRECEDENCIA_FUENTES
+
+
+# Campos sin los que no se puede armar EmpresaCompleta
+CAMPOS_REQUERIDOS = (
+    'razon_social', 'estado', 'municipio', 'departamento', 'actividad_principal',
+    'fecha_matricula', 'ultima_renovacion', 'tipo_sociedad', 'camara'
+)
+
+# Valores que las fuentes usan para "sin dato"
+VALORES_VACIOS = ('', 'No disponible', 'N/A')
+
+# Marca de tiempo que BaseIntegration agrega a cada respuesta de una fuente
+CAMPO_FRESCURA = 'consultado_en'
+
+
+def campo_lleno(valor) -> bool:
+    """Indica si un valor trae información (no vacío ni marcador)"""
+    if valor is None or valor == []:
+        return False
+    return not (isinstance(valor, str) and valor.strip() in VALORES_VACIOS)
+
+
+def precedencia(fuente: str) -> int:
+    """Posición de la fuente en PRECEDENCIA_FUENTES (menor gana)"""
+    try:
+        return PRECEDENCIA_FUENTES.index(fuente)
+    except ValueError:
+        return len(PRECEDENCIA_FUENTES)
+
+
+class FusionDatos:
+    """
+    Combina las respuestas de las fuentes principales campo por campo
+
+    Para cada campo gana la fuente de mayor precedencia que lo trae lleno;
+    entre fuentes de igual precedencia, la respuesta más reciente. Se
+    registra de qué fuente salió cada campo.
+    """
+
+    def __init__(self, nit: str):
+        self.valores: Dict = {'nit': nit}
+        self.procedencia: Dict[str, str] = {}
+        self._rango: Dict[str, tuple] = {}
+        self._confiable: Dict[str, bool] = {}
+
+    def agregar(self, fuente: str, datos: Dict, confiable: bool):
+        """
+        Incorpora la respuesta de una fuente
+
+        Args:
+            fuente: Nombre de la integración
+            datos: Respuesta de la fuente
+            confiable: La respuesta viene de una fuente real (no simulada)
+        """
+        rango = (precedencia(fuente), -datos.get(CAMPO_FRESCURA, 0))
+
+        for campo, valor in datos.items():
+            if campo in ('nit', CAMPO_FRESCURA):
+                continue
+
+            if not campo_lleno(valor):
+                # Un marcador sirve solo si ninguna fuente trae el dato
+                self.valores.setdefault(campo, valor)
+                continue
+
+            if campo not in self._rango or rango < self._rango[campo]:
+                self.valores[campo] = valor
+                self.procedencia[campo] = fuente
+                self._rango[campo] = rango
+                self._confiable[campo] = confiable
+
+    def completa(self) -> bool:
+        """Todos los campos requeridos llenos por fuentes confiables"""
+        return all(self._confiable.get(campo) for campo in CAMPOS_REQUERIDOS)
+
+    def resultado(self) -> Optional[Dict]:
+        """Datos fusionados o None si ninguna fuente trajo un requerido"""
+        if not any(campo in self.procedencia for campo in CAMPOS_REQUERIDOS):
+            return None
+        if not all(campo in self.valores for campo in CAMPOS_REQUERIDOS):
+            return None
+        return self.valores
+
+    def fuentes(self):
+        """Fuentes que aportaron al menos un campo, por precedencia"""
+        return sorted(set(self.procedencia.values()), key=precedencia)
@@ -0,0 +1,611 @@
+"""
+Servicio de snapshots de score
+Materializa score, nivel, señales activas y mapa de cumplimiento por NIT
+para leerlos en línea sin recalcular
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import multiprocessing
+import sqlite3
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import catalogos
+from base_datos import ruta_base, transaccion
+from cache.fabrica import obtener_cache
+from config import SNAPSHOTS_WORKERS, CACHE_TTL_SCORES, ADUANA_DIAS_ACTIVO
+from fechas import fecha_a_ordinal, ordinal_hoy
+from models.empresa import EmpresaCompleta, ScoreCompliance
+from services.compliance_service import ComplianceService
+from trazas import span
+
+
+BASE_SNAPSHOTS = 'snapshots.db'
+
+# Lock de archivo: un solo proceso (de todos los workers) recalcula a la vez
+LOCK_RECALCULO = 'snapshots.recalculo.lock'
+
+# Sin fecha de expiración (la renovación no puede volverse vigente sola)
+SIN_EXPIRACION = date.max.toordinal()
+
+# Columnas del snapshot por las que se mantienen agregados
+DIMENSIONES = ('departamento', 'municipio', 'codigo_ciiu', 'tamano', 'nivel')
+
+# Dimensión con el total de todas las empresas
+DIMENSION_TOTAL = 'total'
+
+# NITs por tarea del pool de procesos (cada tarea es un lote por fuente)
+NITS_POR_TAREA = 64
+
+# Posición de cada columna en las filas de snapshots_score
+_COLUMNA = {'nivel': 4, 'departamento': 8, 'municipio': 9, 'codigo_ciiu': 10, 'tamano': 11}
+
+
+def rango_score(score: int) -> str:
+    """Rango de 10 puntos del score ('0-9' ... '90-100')"""
+    inicio = min(score // 10, 9) * 10
+    return f"{inicio}-{inicio + 9 if inicio < 90 else 100}"
+
+
+def contribuciones(fila: Tuple) -> Counter:
+    """
+    Aporte de una fila de snapshot a los agregados
+
+    Returns:
+        {(dimension, valor, metrica): n} con métricas 'empresas',
+        'suma_score', 'score:<rango>', 'nivel:<nivel>' y 'senal:<señal>'
+    """
+    score, nivel = fila[3], fila[4]
+    señales = json.loads(fila[5]).get('señales_activas', [])
+
+    metricas = Counter({'empresas': 1, 'suma_score': score, f'score:{rango_score(score)}': 1, f'nivel:{nivel}': 1})
+    metricas.update(f'senal:{señal}' for señal in señales)
+
+    grupos = [(DIMENSION_TOTAL, '')] + [
+        (dimension, fila[_COLUMNA[dimension]] or 'N/A') for dimension in DIMENSIONES
+    ]
+    return Counter({
+        (dimension, valor, metrica): n
+        for dimension, valor in grupos
+        for metrica, n in metricas.items()
+    })
+
+
+def huella_datos(empresa: EmpresaCompleta) -> str:
+    """
+    Hash de los datos de la empresa que alimentan el score
+    Excluye metadata y score, que cambian en cada consulta
+    """
+    contenido = json.dumps(
+        empresa.dict(exclude={'metadata', 'score_compliance'}),
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16]
+
+
+def _calcular_fila(empresa: EmpresaCompleta, version: str) -> Tuple:
+    """
+    Calcula score y mapa de una empresa y arma la fila del snapshot
+    """
+    compliance_service = ComplianceService()
+    with span('score'):
+        score = compliance_service.calcular_score(empresa)
+    with span('mapa'):
+        mapa = compliance_service.generar_mapa_cumplimiento(empresa, score)
+    basicos = empresa.datos_basicos
+
+    return (
+        basicos.nit,
+        version,
+        huella_datos(empresa),
+        score.score,
+        score.nivel,
+        json.dumps(score.dict(), ensure_ascii=False),
+        json.dumps(mapa, ensure_ascii=False),
+        _valido_hasta(empresa, score),
+        basicos.departamento,
+        basicos.municipio,
+        basicos.codigo_ciiu,
+        empresa.datos_operacionales.tamano,
+        datetime.now().isoformat(),
+        # Entradas del cálculo: el recálculo vuelve a puntuar sin consultar fuentes
+        json.dumps(empresa.dict(exclude={'score_compliance'}), ensure_ascii=False, default=str)
+    )
+
+
+def _valido_hasta(empresa: EmpresaCompleta, score: ScoreCompliance) -> int:
+    """
+    Ordinal del primer día en que el snapshot deja de ser válido
+
+    - La renovación vigente caduca DIAS_RENOVACION_VIGENTE días después
+    - Las señales que las fuentes derivaron de la fecha de la consulta
+      cambian en la fecha de vigencia_entradas()
+    """
+    valido_hasta = vigencia_entradas(empresa)
+    if 'renovacion_vigente' in score.señales_activas:
+        ordinal_renovacion = fecha_a_ordinal(empresa.datos_registrales.ultima_renovacion)
+        valido_hasta = min(valido_hasta, ordinal_renovacion + ComplianceService.DIAS_RENOVACION_VIGENTE)
+    return valido_hasta
+
+
+def vigencia_entradas(empresa: EmpresaCompleta) -> int:
+    """
+    Ordinal del primer día en que cambia alguna señal que las fuentes
+    calcularon con la fecha de la consulta; desde ese día la empresa
+    guardada ya no sirve para volver a puntuar sin consultarlas
+
+    - ICA: en proximo_vencimiento otro período pasa a ser exigible
+    - Aduana: el operador deja de estar activo ADUANA_DIAS_ACTIVO días
+      después de su última operación
+    """
+    limites = [SIN_EXPIRACION]
+    ica = empresa.señales_ica
+    if ica and ica.proximo_vencimiento:
+        limites.append(fecha_a_ordinal(ica.proximo_vencimiento))
+    aduana = empresa.señales_aduana
+    if aduana and aduana.activo and aduana.ultima_operacion:
+        ordinal_operacion = fecha_a_ordinal(aduana.ultima_operacion)
+        if ordinal_operacion is not None:
+            limites.append(ordinal_operacion + ADUANA_DIAS_ACTIVO + 1)
+    return min(limite for limite in limites if limite is not None)
+
+
+def _calcular_snapshots_worker(nits: List[str], version: str) -> List[Tuple]:
+    """
+    Tarea del pool de procesos: consulta un bloque de empresas con una
+    consulta por lote a cada fuente y calcula sus snapshots
+    """
+    from services.verificacion_service import VerificacionService
+
+    empresas = asyncio.run(VerificacionService().verificar_lote(nits))
+    return [_calcular_fila(empresa, version) for empresa in empresas.values() if empresa]
+
+
+def _rescorear_worker(entradas: List[str], version: str) -> Tuple[List[Tuple], List[str]]:
+    """
+    Tarea del pool de procesos: vuelve a calcular los snapshots de un
+    bloque a partir de las entradas guardadas (sin consultar fuentes)
+
+    Returns:
+        (filas, NITs cuyas entradas ya no están vigentes y hay que consultar)
+    """
+    filas, vencidos = [], []
+    hoy = ordinal_hoy()
+    for entrada in entradas:
+        empresa = EmpresaCompleta(**json.loads(entrada))
+        if vigencia_entradas(empresa) <= hoy:
+            vencidos.append(empresa.datos_basicos.nit)
+        else:
+            filas.append(_calcular_fila(empresa, version))
+    return filas, vencidos
+
+
+class SnapshotService:
+    """
+    Tabla materializada de scores por NIT
+
+    Cada fila guarda la huella de configuración con la que se calculó y
+    la huella de los datos de la empresa. En línea se lee la fila si ambas
+    coinciden; si no, se calcula en vivo y se guarda.
+    """
+
+    # Las tablas se crean una vez por proceso
+    _tablas_creadas = False
+
+    def __init__(self):
+        if not SnapshotService._tablas_creadas:
+            self._crear_tablas()
+            SnapshotService._tablas_creadas = True
+
+    def _crear_tablas(self):
+        with transaccion(BASE_SNAPSHOTS) as con:
+            con.execute('''
+                CREATE TABLE IF NOT EXISTS snapshots_score (
+                    nit TEXT PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    huella_datos TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    nivel TEXT NOT NULL,
+                    score_json TEXT NOT NULL,
+                    mapa_json TEXT NOT NULL,
+                    valido_hasta INTEGER NOT NULL,
+                    departamento TEXT,
+                    municipio TEXT,
+                    codigo_ciiu TEXT,
+                    tamano TEXT,
+                    calculado_en TEXT NOT NULL,
+                    empresa_json TEXT
+                )
+            ''')
+            # Bases anteriores a las entradas guardadas
+            columnas = {fila[1] for fila in con.execute('PRAGMA table_info(snapshots_score)')}
+            if 'empresa_json' not in columnas:
+                try:
+                    con.execute('ALTER TABLE snapshots_score ADD COLUMN empresa_json TEXT')
+                except sqlite3.OperationalError as e:
+                    # Otro worker que arrancaba a la vez ya la agregó
+                    if 'duplicate column' not in str(e):
+                        raise
+            con.execute('''
+                CREATE TABLE IF NOT EXISTS snapshots_meta (
+                    clave TEXT PRIMARY KEY,
+                    valor TEXT NOT NULL
+                )
+            ''')
+            con.execute('''
+                CREATE TABLE IF NOT EXISTS snapshots_agregados (
+                    dimension TEXT NOT NULL,
+                    valor TEXT NOT NULL,
+                    metrica TEXT NOT NULL,
+                    n INTEGER NOT NULL,
+                    PRIMARY KEY (dimension, valor, metrica)
+                ) WITHOUT ROWID
+            ''')
+            agregados = con.execute(
+                "SELECT valor FROM snapshots_meta WHERE clave = 'agregados'"
+            ).fetchone()
+
+        # Los agregados cuentan solo las filas de la versión actual: se
+        # construyen en bases anteriores a ellos y cuando cambia la versión
+        if not agregados or agregados[0] != ComplianceService.huella_configuracion():
+            self.reconstruir_agregados()
+
+    def obtener(self, empresa: EmpresaCompleta) -> Optional[Tuple[ScoreCompliance, Dict]]:
+        """
+        Lee el snapshot vigente de una empresa
+        Primero del cache de scores, luego de la tabla materializada
+
+        Returns:
+            (score, mapa) o None si no hay snapshot vigente
+        """
+        nit = empresa.datos_basicos.nit
+        version = ComplianceService.huella_configuracion()
+        huella = huella_datos(empresa)
+        clave_cache = f'{nit}:{version}:{huella}'
+        cache = obtener_cache('scores', CACHE_TTL_SCORES)
+
+        entrada = cache.obtener(clave_cache)
+        if entrada is None or entrada['valido_hasta'] <= ordinal_hoy():
+            with transaccion(BASE_SNAPSHOTS) as con:
+                fila = con.execute(
+                    '''SELECT score_json, mapa_json, valido_hasta FROM snapshots_score
+                       WHERE nit = ? AND version = ? AND huella_datos = ?
+                         AND valido_hasta > ?''',
+                    (nit, version, huella, ordinal_hoy())
+                ).fetchone()
+
+            if not fila:
+                return None
+
+            entrada = {
+                'score': json.loads(fila[0]),
+                'mapa': json.loads(fila[1]),
+                'valido_hasta': fila[2]
+            }
+            cache.guardar(clave_cache, entrada)
+
+        mapa = dict(entrada['mapa'])
+        mapa['fecha_consulta'] = datetime.now().isoformat()
+        return ScoreCompliance(**entrada['score']), mapa
+
+    def obtener_o_calcular(self, empresa: EmpresaCompleta) -> Tuple[ScoreCompliance, Dict]:
+        """
+        Ruta en línea: snapshot si está vigente, cálculo en vivo si no
+        Los resultados parciales (fuentes omitidas por plazo) se calculan
+        en vivo y no se guardan
+        """
+        if empresa.metadata.fuentes_omitidas:
+            compliance = ComplianceService()
+            with span('score'):
+                score = compliance.calcular_score(empresa)
+            with span('mapa'):
+                return score, compliance.generar_mapa_cumplimiento(empresa, score)
+        
+        with span('snapshot') as atributos:
+            snapshot = self.obtener(empresa)
+            atributos['vigente'] = snapshot is not None
+        if snapshot:
+            return snapshot
+
+        fila = _calcular_fila(empresa, ComplianceService.huella_configuracion())
+        self._guardar_filas([fila])
+        return ScoreCompliance(**json.loads(fila[5])), json.loads(fila[6])
+
+    def _guardar_filas(self, filas: List[Tuple]):
+        """
+        Escribe filas y actualiza los agregados en la misma transacción:
+        resta el aporte de la fila anterior de cada NIT y suma el de la nueva
+        (solo las de la versión actual cuentan en los agregados)
+        """
+        filas = list({fila[0]: fila for fila in filas}.values())
+        version = ComplianceService.huella_configuracion()
+
+        with transaccion(BASE_SNAPSHOTS) as con:
+            delta = Counter()
+            for fila in self.filas_por_nit(con, [fila[0] for fila in filas], version):
+                delta.subtract(contribuciones(fila))
+            for fila in filas:
+                if fila[1] == version:
+                    delta.update(contribuciones(fila))
+
+            con.executemany(
+                '''INSERT OR REPLACE INTO snapshots_score
+                   (nit, version, huella_datos, score, nivel, score_json, mapa_json,
+                    valido_hasta, departamento, municipio, codigo_ciiu, tamano, calculado_en,
+                    empresa_json)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                filas
+            )
+            self._aplicar_delta(con, delta)
+
+    def filas_por_nit(self, con, nits: List[str], version: Optional[str] = None) -> List[Tuple]:
+        """
+        Filas guardadas de esos NITs (solo las columnas de los agregados)
+        Con version, solo las calculadas con esa versión
+        """
+        filas = []
+        for i in range(0, len(nits), 500):
+            parte = nits[i:i + 500]
+            condicion = f"nit IN ({','.join('?' * len(parte))})"
+            if version is not None:
+                condicion += ' AND version = ?'
+                parte = parte + [version]
+            filas.extend(con.execute(
+                f'''SELECT nit, version, NULL, score, nivel, score_json, NULL, NULL,
+                          departamento, municipio, codigo_ciiu, tamano
+                   FROM snapshots_score WHERE {condicion}''',
+                parte
+            ))
+        return filas
+
+    def _aplicar_delta(self, con, delta: Counter):
+        cambios = [(dimension, valor, metrica, n) for (dimension, valor, metrica), n in delta.items() if n]
+        con.executemany(
+            '''INSERT INTO snapshots_agregados (dimension, valor, metrica, n) VALUES (?, ?, ?, ?)
+               ON CONFLICT (dimension, valor, metrica) DO UPDATE SET n = n + excluded.n''',
+            cambios
+        )
+        # Solo las claves tocadas pueden haber quedado en cero (por índice, sin recorrer la tabla)
+        con.executemany(
+            'DELETE FROM snapshots_agregados WHERE dimension = ? AND valor = ? AND metrica = ? AND n = 0',
+            [cambio[:3] for cambio in cambios]
+        )
+
+    def reconstruir_agregados(self):
+        """
+        Recalcula los agregados desde cero con una pasada por las filas de
+        la versión actual (las de versiones anteriores no cuentan)
+        """
+        version = ComplianceService.huella_configuracion()
+        with transaccion(BASE_SNAPSHOTS) as con:
+            total = Counter()
+            filas = con.execute(
+                '''SELECT nit, version, NULL, score, nivel, score_json, NULL, NULL,
+                          departamento, municipio, codigo_ciiu, tamano
+                   FROM snapshots_score WHERE version = ?''',
+                (version,)
+            )
+            for fila in filas:
+                total.update(contribuciones(fila))
+
+            con.execute('DELETE FROM snapshots_agregados')
+            self._aplicar_delta(con, total)
+            con.execute(
+                "INSERT OR REPLACE INTO snapshots_meta (clave, valor) VALUES ('agregados', ?)",
+                (version,)
+            )
+
+    def empresas_vigentes(self, nits: Iterable[str], max_edad: float) -> Dict[str, EmpresaCompleta]:
+        """
+        Empresas con snapshot vigente de la versión actual cuyas entradas
+        se consultaron hace menos de max_edad segundos
+        Sirven la consulta en línea sin volver a consultar las fuentes
+
+        Returns:
+            NIT -> EmpresaCompleta (solo los NITs que cumplen)
+        """
+        nits = list(nits)
+        version = ComplianceService.huella_configuracion()
+        ahora = datetime.now()
+        hoy = ordinal_hoy()
+        vigentes = {}
+
+        with transaccion(BASE_SNAPSHOTS) as con:
+            for i in range(0, len(nits), 500):
+                parte = nits[i:i + 500]
+                filas = con.execute(
+                    f'''SELECT nit, empresa_json FROM snapshots_score
+                       WHERE nit IN ({','.join('?' * len(parte))})
+                         AND version = ? AND valido_hasta > ? AND empresa_json IS NOT NULL''',
+                    parte + [version, hoy]
+                )
+                for nit, entrada in filas:
+                    empresa = EmpresaCompleta(**json.loads(entrada))
+                    if vigencia_entradas(empresa) <= hoy:
+                        continue
+                    try:
+                        edad = ahora - datetime.fromisoformat(empresa.metadata.ultima_actualizacion)
+                    except ValueError:
+                        continue
+                    if edad.total_seconds() < max_edad:
+                        vigentes[nit] = empresa
+        return vigentes
+
+    def entradas_guardadas(self, nits: List[str]) -> Dict[str, str]:
+        """
+        Entradas guardadas (empresa_json) de esos NITs, si las tienen y su
+        snapshot no ha caducado (si caducó, alguna señal de las fuentes
+        pudo cambiar con la fecha y hay que volver a consultarlas)
+        """
+        entradas = {}
+        hoy = ordinal_hoy()
+        with transaccion(BASE_SNAPSHOTS) as con:
+            for i in range(0, len(nits), 500):
+                parte = nits[i:i + 500]
+                entradas.update(con.execute(
+                    f'''SELECT nit, empresa_json FROM snapshots_score
+                       WHERE nit IN ({','.join('?' * len(parte))})
+                         AND empresa_json IS NOT NULL AND valido_hasta > ?''',
+                    parte + [hoy]
+                ))
+        return entradas
+
+    def nits_conocidos(self) -> List[str]:
+        """
+        NITs de los datos de ejemplo y los que ya tienen snapshot
+        """
+        empresas_ejemplo = catalogos.cargar('empresas_ejemplo')
+
+        with transaccion(BASE_SNAPSHOTS) as con:
+            guardados = [fila[0] for fila in con.execute('SELECT nit FROM snapshots_score')]
+
+        return sorted(set(empresas_ejemplo) | set(guardados))
+
+    @contextmanager
+    def _exclusivo(self):
+        """
+        Lock de archivo no bloqueante entre procesos
+        Cede True si este proceso lo obtuvo, False si otro está recalculando
+        """
+        with open(ruta_base(LOCK_RECALCULO), 'a') as archivo:
+            try:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+
+    def recalcular(
+        self,
+        nits: Optional[Iterable[str]] = None,
+        max_workers: Optional[int] = None,
+        refrescar: Iterable[str] = ()
+    ) -> int:
+        """
+        Recalcula snapshots en un pool de procesos
+
+        Los NITs con entradas guardadas se vuelven a puntuar con ellas; solo
+        se consultan las fuentes de los que no las tienen y de `refrescar`.
+        Si otro proceso ya está recalculando no hace nada.
+
+        Args:
+            nits: NITs a recalcular (por defecto todos los conocidos)
+            max_workers: Procesos del pool (por defecto SNAPSHOTS_WORKERS)
+            refrescar: NITs que se vuelven a consultar aunque tengan entradas
+
+        Returns:
+            Número de snapshots escritos
+        """
+        with self._exclusivo() as obtenido:
+            if not obtenido:
+                return 0
+            return self._recalcular(nits, max_workers, refrescar)
+
+    def recalcular_si_cambio(self) -> int:
+        """
+        Recalcula todo si cambiaron los pesos o los datos de origen
+        Con varios workers solo uno recalcula; los demás no hacen nada
+        Si solo cambiaron los pesos no se consulta ninguna fuente
+        """
+        with self._exclusivo() as obtenido:
+            if not obtenido:
+                return 0
+
+            version_actual = ComplianceService.huella_configuracion()
+            dataset_actual = self._huella_dataset()
+            if (self._leer_meta('version') == version_actual
+                    and self._leer_meta('huella_dataset') == dataset_actual):
+                return 0
+
+            refrescar = ()
+            if self._leer_meta('huella_dataset') != dataset_actual:
+                refrescar = catalogos.cargar('empresas_ejemplo')
+            return self._recalcular(None, None, refrescar)
+
+    def _recalcular(
+        self,
+        nits: Optional[Iterable[str]],
+        max_workers: Optional[int],
+        refrescar: Iterable[str]
+    ) -> int:
+        nits = list(nits) if nits is not None else self.nits_conocidos()
+        if not nits:
+            return 0
+
+        version = ComplianceService.huella_configuracion()
+        contexto = multiprocessing.get_context('spawn')
+
+        refrescar = set(refrescar)
+        entradas = self.entradas_guardadas(nits)
+        por_puntuar = [entradas[nit] for nit in nits if nit in entradas and nit not in refrescar]
+        por_consultar = [nit for nit in nits if nit not in entradas or nit in refrescar]
+
+        with ProcessPoolExecutor(max_workers=max_workers or SNAPSHOTS_WORKERS, mp_context=contexto) as pool:
+            def consultar(nits_bloque: List[str]) -> list:
+                return [
+                    pool.submit(_calcular_snapshots_worker, nits_bloque[i:i + NITS_POR_TAREA], version)
+                    for i in range(0, len(nits_bloque), NITS_POR_TAREA)
+                ]
+
+            rescoreos = [
+                pool.submit(_rescorear_worker, por_puntuar[i:i + NITS_POR_TAREA], version)
+                for i in range(0, len(por_puntuar), NITS_POR_TAREA)
+            ]
+            consultas = consultar(por_consultar)
+
+            filas = []
+            for tarea in rescoreos:
+                rescoreadas, vencidos = tarea.result()
+                filas.extend(rescoreadas)
+                # Entradas cuyas señales dependientes de la fecha ya cambiaron
+                consultas.extend(consultar(vencidos))
+            filas.extend(fila for tarea in consultas for fila in tarea.result())
+
+        self._guardar_filas(filas)
+        self._guardar_meta('version', version)
+        self._guardar_meta('huella_dataset', self._huella_dataset())
+        return len(filas)
+
+    def _huella_dataset(self) -> str:
+        """Hash de los datos de origen conocidos"""
+        empresas_ejemplo = catalogos.cargar('empresas_ejemplo')
+
+        contenido = json.dumps(empresas_ejemplo, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16]
+
+    def _leer_meta(self, clave: str) -> Optional[str]:
+        with transaccion(BASE_SNAPSHOTS) as con:
+            fila = con.execute(
+                'SELECT valor FROM snapshots_meta WHERE clave = ?', (clave,)
+            ).fetchone()
+        return fila[0] if fila else None
+
+    def _guardar_meta(self, clave: str, valor: str):
+        with transaccion(BASE_SNAPSHOTS) as con:
+            con.execute(
+                'INSERT OR REPLACE INTO snapshots_meta (clave, valor) VALUES (?, ?)',
+                (clave, valor)
+            )
+
+
+# Recalcular desde línea de comandos
+if __name__ == "__main__":
+    print("="*60)
+    print("🧮 RECÁLCULO DE SNAPSHOTS DE SCORE")
+    print("="*60)
+
+    total = SnapshotService().recalcular()
+
+    print(f"\n✅ {total} snapshots calculados")
+    print("="*60)
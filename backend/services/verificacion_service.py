@@ -3,92 +3,454 @@ Servicio de verificación de empresas
 Orquesta múltiples fuentes de datos
 """
 
-from typing import Optional, Dict, List
+import asyncio
+import time
+from collections import Counter, defaultdict
+from contextlib import aclosing
+from datetime import datetime
+from typing import AsyncIterator, Optional, Dict, List, Tuple
+from integrations.base_integration import BaseIntegration
 from integrations.datos_ejemplo_integration import DatosEjemploIntegration
+from integrations.rues_integration import RUESIntegration
+from integrations.almacen_empresas_integration import AlmacenEmpresasIntegration
 from integrations.aduana_integration import AduanaIntegration
-from models.empresa import EmpresaCompleta
+from integrations.dian_integration import DIANIntegration
+from integrations.ica.base import AdaptadorICA
+from integrations.ica.enrutador import adaptador_para, adaptadores as adaptadores_ica
+from integrations.resiliencia import obtener_latencias
+from models.empresa import EmpresaCompleta, SeñalesAduana, SeñalesICA, SeñalesRUT
+from cache.fabrica import obtener_cache
+from config import CACHE_TTL_EMPRESAS, CACHE_TTL_NEGATIVO, PLAZO_CONSULTA_SEGUNDOS, PLAZO_LOTE_SEGUNDOS
+from plazos import Plazo, usar_plazo
+from services.fusion_datos import FusionDatos, campo_lleno
+from services.snapshot_service import SnapshotService
+import ciiu
+import divipola
+import popularidad
+import responsabilidades
+from trazas import obtener_logger
+
+logger = obtener_logger('verificacion')
 
 
 class VerificacionService:
     """
     Orquestador de fuentes de verificación
-    Intenta múltiples fuentes en cascada
+    Consulta las fuentes principales en paralelo y fusiona sus datos
     """
     
     def __init__(self):
-        # Fuentes disponibles ordenadas por prioridad
+        # Fuentes principales (la precedencia por campo está en PRECEDENCIA_FUENTES)
         self.fuentes = [
+            RUESIntegration(),
+            AlmacenEmpresasIntegration(),
             DatosEjemploIntegration(),
-            # Futuro: RUESIntegration(),
-            # Futuro: DIANIntegration(),
-            # Futuro: ICAIntegration(),
         ]
         
         # Fuentes complementarias (no bloquean consulta)
+        # Además, el ICA de la alcaldía del municipio (ver _complementarias_para)
         self.fuentes_complementarias = [
-            AduanaIntegration()
+            AduanaIntegration(),
+            DIANIntegration()
         ]
+        
+        # Cache de empresas verificadas (backend según CACHE_BACKEND)
+        self.cache = obtener_cache('empresas', CACHE_TTL_EMPRESAS)
+        
+        # Cache negativo (acotado): NITs que las fuentes reales no conocen
+        self.nits_inexistentes = obtener_cache('nits_inexistentes', CACHE_TTL_NEGATIVO)
     
-    async def verificar_empresa(self, nit: str) -> Optional[EmpresaCompleta]:
+    async def verificar_empresa(self, nit: str, plazo_segundos: Optional[float] = None) -> Optional[EmpresaCompleta]:
         """
         Verifica empresa intentando múltiples fuentes
         
         Args:
             nit: NIT de la empresa
+            plazo_segundos: Tiempo total disponible (por defecto PLAZO_CONSULTA_SEGUNDOS)
             
         Returns:
             EmpresaCompleta o None si no se encuentra
         """
+        empresa = None
+        async for evento, datos in self.verificar_empresa_progresivo(nit, plazo_segundos):
+            if evento == 'empresa':
+                empresa = datos
+        return empresa
+    
+    async def verificar_empresa_progresivo(
+        self, nit: str, plazo_segundos: Optional[float] = None
+    ) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Verifica empresa emitiendo resultados a medida que llegan
+        
+        Eventos:
+            ('empresa', EmpresaCompleta): datos principales disponibles
+            ('fuente', (nombre, datos)): terminó una fuente complementaria
+                (la empresa ya quedó enriquecida con sus datos)
+            ('omitida', nombre): una fuente no alcanzó a responder en el plazo
+        
+        Las fuentes omitidas quedan en metadata.fuentes_omitidas y el
+        resultado parcial no se guarda en cache
+        
+        Si la empresa no se encuentra no se emite ningún evento
+        
+        Cada llamada cuenta en la popularidad del NIT (la usan la admisión
+        al cache y el calentador); las consultas por lote no cuentan
+        """
+        popularidad.registrar(nit)
+        en_cache = await self.cache.obtener_async(nit)
+        if en_cache:
+            yield 'empresa', EmpresaCompleta(**en_cache)
+            return
+        
+        guardada = (await self._desde_snapshots([nit])).get(nit)
+        if guardada:
+            yield 'empresa', guardada
+            return
+        
+        plazo = Plazo(plazo_segundos or PLAZO_CONSULTA_SEGUNDOS)
+        
         # 1. Obtener datos básicos (fuentes principales)
-        datos_basicos = await self._obtener_datos_basicos(nit)
+        with usar_plazo(plazo):
+            fusion, omitidas = await self._obtener_datos_basicos(nit)
+        
+        empresa = self._armar_empresa(fusion, omitidas)
+        if empresa is None:
+            return
+        yield 'empresa', empresa
+        for nombre in omitidas:
+            yield 'omitida', nombre
+        
+        # 3. Enriquecer con fuentes complementarias (en paralelo)
+        # Cerrar este generador cierra el de enriquecimiento, que cancela
+        # las consultas pendientes
+        async with aclosing(self._enriquecer_progresivo(empresa, nit, plazo)) as enriquecimiento:
+            async for fuente, datos, a_tiempo in enriquecimiento:
+                if a_tiempo:
+                    yield 'fuente', (fuente.nombre, datos)
+                else:
+                    empresa.metadata.fuentes_omitidas.append(fuente.nombre)
+                    yield 'omitida', fuente.nombre
+        
+        if not empresa.metadata.fuentes_omitidas:
+            self.cache.guardar(nit, empresa.dict())
+    
+    async def verificar_lote(
+        self, nits: List[str], plazo_segundos: Optional[float] = None, refrescar: bool = False
+    ) -> Dict[str, Optional[EmpresaCompleta]]:
+        """
+        Verifica varias empresas con una consulta por lote a cada fuente
+        (consultar_lote) en lugar de una por NIT
+        
+        El resultado de cada NIT es el mismo que daría verificar_empresa;
+        el plazo es del lote completo (por defecto PLAZO_LOTE_SEGUNDOS)
+        Con refrescar=True se ignora el cache de empresas (no el de cada fuente)
+        
+        Returns:
+            NIT -> EmpresaCompleta o None si no se encuentra (en el orden recibido)
+        """
+        nits = list(dict.fromkeys(nits))
+        empresas: Dict[str, EmpresaCompleta] = {}
+        pendientes = []
+        en_cache_por_nit = {} if refrescar else await self.cache.obtener_varios_async(nits)
+        for nit in nits:
+            en_cache = en_cache_por_nit.get(nit)
+            if en_cache:
+                empresas[nit] = EmpresaCompleta(**en_cache)
+            else:
+                pendientes.append(nit)
+        
+        if pendientes and not refrescar:
+            guardadas = await self._desde_snapshots(pendientes)
+            empresas.update(guardadas)
+            pendientes = [nit for nit in pendientes if nit not in guardadas]
+        
+        if pendientes:
+            plazo = Plazo(plazo_segundos or PLAZO_LOTE_SEGUNDOS)
+            with usar_plazo(plazo):
+                nuevas = {}
+                for nit, (fusion, omitidas) in (await self._obtener_datos_basicos_lote(pendientes)).items():
+                    empresa = self._armar_empresa(fusion, omitidas)
+                    if empresa is not None:
+                        nuevas[nit] = empresa
+                await self._enriquecer_lote(nuevas)
+            
+            for nit, empresa in nuevas.items():
+                if not empresa.metadata.fuentes_omitidas:
+                    self.cache.guardar(nit, empresa.dict())
+            empresas.update(nuevas)
         
+        return {nit: empresas.get(nit) for nit in nits}
+    
+    async def _desde_snapshots(self, nits: List[str]) -> Dict[str, EmpresaCompleta]:
+        """
+        Empresas cuyas entradas del snapshot se consultaron hace menos de
+        CACHE_TTL_EMPRESAS: se sirven (y se vuelven a poner en cache por el
+        tiempo que les queda) sin consultar las fuentes
+        """
+        guardadas = await asyncio.to_thread(SnapshotService().empresas_vigentes, nits, CACHE_TTL_EMPRESAS)
+        for nit, empresa in guardadas.items():
+            actualizada = datetime.fromisoformat(empresa.metadata.ultima_actualizacion).timestamp()
+            self.cache.guardar(nit, empresa.dict(), actualizada + CACHE_TTL_EMPRESAS - time.time())
+        return guardadas
+    
+    def _armar_empresa(self, fusion: FusionDatos, omitidas: List[str]) -> Optional[EmpresaCompleta]:
+        """
+        EmpresaCompleta a partir de los datos fusionados de las fuentes principales
+        None si ninguna fuente trajo la empresa
+        """
+        datos_basicos = fusion.resultado()
         if not datos_basicos:
             return None
         
+        # Ubicación canónica cualquiera sea la fuente
+        divipola.canonizar(datos_basicos)
+        
+        # Sin código de las fuentes: se asigna por el texto de la actividad
+        if not campo_lleno(datos_basicos.get('codigo_ciiu')):
+            datos_basicos['codigo_ciiu'] = (
+                ciiu.codigo_para(datos_basicos['actividad_principal']) or datos_basicos.get('codigo_ciiu')
+            )
+        
+        # Responsabilidades de las fuentes de registro como códigos DIAN
+        # (el RUT consultado en la DIAN las reemplaza al enriquecer)
+        datos_basicos['codigos_responsabilidades'] = responsabilidades.codigos(
+            datos_basicos.get('responsabilidades_tributarias') or []
+        )
+        
         # 2. Convertir a modelo EmpresaCompleta
         empresa = EmpresaCompleta.desde_datos_ejemplo(datos_basicos)
+        empresa.metadata.fuentes_verificadas = [fuente.lower() for fuente in fusion.fuentes()]
+        empresa.metadata.procedencia_campos = fusion.procedencia
+        empresa.metadata.fuentes_omitidas.extend(omitidas)
+        return empresa
+    
+    async def _obtener_datos_basicos(self, nit: str) -> Tuple[FusionDatos, List[str]]:
+        """
+        Consulta todas las fuentes principales a la vez y fusiona por campo
         
-        # 3. Enriquecer con fuentes complementarias
-        await self._enriquecer_con_complementarias(empresa, nit)
+        Termina antes si los campos requeridos ya vienen de fuentes
+        confiables (las pendientes se cancelan); si no, espera a todas
         
-        return empresa
+        Si todas las fuentes reales consultadas responden que el NIT no
+        existe, se registra en el cache negativo y las siguientes consultas
+        del mismo NIT no vuelven a tocarlas
+        
+        Returns:
+            (fusión de los datos, nombres de las fuentes que no respondieron en el plazo)
+        """
+        inexistente = self.nits_inexistentes.obtener(nit) is not None
+        fusion = FusionDatos(nit)
+        vacias_reales = 0
+        omitidas = []
+        
+        pendientes = {
+            asyncio.ensure_future(self._consultar_fuente(fuente, nit))
+            for fuente in self.fuentes
+            if not (inexistente and fuente.fuente_real)
+        }
+        
+        try:
+            while pendientes and not fusion.completa():
+                terminadas, pendientes = await asyncio.wait(
+                    pendientes, return_when=asyncio.FIRST_COMPLETED
+                )
+                for tarea in terminadas:
+                    fuente, datos, origen = tarea.result()
+                    if datos:
+                        confiable = fuente.fuente_real and origen in ('fuente', 'cache')
+                        fusion.agregar(fuente.nombre, datos, confiable)
+                    elif origen == 'plazo':
+                        omitidas.append(fuente.nombre)
+                    elif fuente.fuente_real and origen == 'fuente':
+                        vacias_reales += 1
+        finally:
+            for tarea in pendientes:
+                tarea.cancel()
+        
+        # Confirmado ausente solo si respondieron todas las reales disponibles
+        reales_disponibles = sum(
+            1 for fuente in self.fuentes if fuente.fuente_real and fuente.disponible
+        )
+        if reales_disponibles and vacias_reales == reales_disponibles:
+            self.nits_inexistentes.guardar(nit, True)
+        
+        return fusion, omitidas
     
-    async def _obtener_datos_basicos(self, nit: str) -> Optional[Dict]:
+    async def _obtener_datos_basicos_lote(self, nits: List[str]) -> Dict[str, Tuple[FusionDatos, List[str]]]:
         """
-        Intenta obtener datos básicos de fuentes principales
+        _obtener_datos_basicos() para varios NITs: cada fuente principal
+        recibe el lote completo y se fusiona por NIT
+        (sin corte anticipado: el lote espera a todas las fuentes)
         """
-        for fuente in self.fuentes:
-            try:
-                datos = await fuente.consultar_con_fallback(nit)
+        inexistentes = {nit for nit in nits if self.nits_inexistentes.obtener(nit) is not None}
+        respuestas = await asyncio.gather(*(
+            self._consultar_fuente_lote(
+                fuente, [nit for nit in nits if not (fuente.fuente_real and nit in inexistentes)]
+            )
+            for fuente in self.fuentes
+        ))
+        
+        resultados = {nit: (FusionDatos(nit), []) for nit in nits}
+        vacias_reales = Counter()
+        for fuente, por_nit in zip(self.fuentes, respuestas):
+            for nit, (datos, origen) in por_nit.items():
+                fusion, omitidas = resultados[nit]
                 if datos:
-                    return datos
-            except Exception as e:
-                print(f"Error consultando {fuente.nombre}: {e}")
-                continue
+                    confiable = fuente.fuente_real and origen in ('fuente', 'cache')
+                    fusion.agregar(fuente.nombre, datos, confiable)
+                elif origen == 'plazo':
+                    omitidas.append(fuente.nombre)
+                elif fuente.fuente_real and origen == 'fuente':
+                    vacias_reales[nit] += 1
         
-        return None
+        reales_disponibles = sum(
+            1 for fuente in self.fuentes if fuente.fuente_real and fuente.disponible
+        )
+        if reales_disponibles:
+            for nit, vacias in vacias_reales.items():
+                if vacias == reales_disponibles:
+                    self.nits_inexistentes.guardar(nit, True)
+        
+        return resultados
     
-    async def _enriquecer_con_complementarias(self, empresa: EmpresaCompleta, nit: str):
-        """
-        Enriquece empresa con datos complementarios
-        (No bloquea si fallan)
-        """
-        for fuente in self.fuentes_complementarias:
-            try:
-                if fuente.nombre == "ADUANA":
-                    datos_aduana = await fuente.consultar_con_fallback(nit)
-                    if datos_aduana and datos_aduana.get('tiene_registro'):
-                        from backend.models.empresa import SeñalesAduana
-                        empresa.señales_aduana = SeñalesAduana(**datos_aduana)
-                        
-                        # Actualizar fuentes verificadas
-                        if empresa.señales_aduana.activo:
-                            empresa.metadata.fuentes_verificadas.append('aduana_simulado')
+    async def _enriquecer_lote(self, empresas: Dict[str, EmpresaCompleta]):
+        """
+        Fuentes complementarias por lote: las comunes reciben todos los
+        NITs y cada alcaldía los de su municipio (en paralelo)
+        """
+        lotes = [(fuente, list(empresas)) for fuente in self.fuentes_complementarias]
+        por_alcaldia = defaultdict(list)
+        for nit, empresa in empresas.items():
+            ica = adaptador_para(empresa.datos_basicos.codigo_municipio)
+            if ica is not None:
+                por_alcaldia[ica].append(nit)
+        lotes.extend(por_alcaldia.items())
+        
+        respuestas = await asyncio.gather(*(
+            self._consultar_fuente_lote(fuente, nits) for fuente, nits in lotes
+        ))
+        
+        for (fuente, _), por_nit in zip(lotes, respuestas):
+            for nit, (datos, origen) in por_nit.items():
+                empresa = empresas[nit]
+                if origen == 'plazo':
+                    empresa.metadata.fuentes_omitidas.append(fuente.nombre)
+                    continue
+                try:
+                    self._aplicar_complementaria(empresa, fuente, datos)
+                except Exception as e:
+                    logger.warning("Error enriqueciendo %s con %s: %s", nit, fuente.nombre, e)
+    
+    async def _enriquecer_progresivo(
+        self, empresa: EmpresaCompleta, nit: str, plazo: Plazo
+    ) -> AsyncIterator[Tuple[BaseIntegration, Optional[Dict], bool]]:
+        """
+        Enriquece empresa con datos complementarios (no bloquea si fallan)
+        Consulta las fuentes en paralelo y aplica cada resultado apenas
+        llega (la más rápida primero)
+        
+        Al vencer el plazo se cancelan las que sigan pendientes y se
+        emiten con a_tiempo=False
+        """
+        # Las tareas heredan el plazo del contexto en que se crean
+        with usar_plazo(plazo):
+            pendientes = {
+                asyncio.ensure_future(self._consultar_fuente(fuente, nit)): fuente
+                for fuente in self._complementarias_para(empresa)
+            }
+        
+        try:
+            while pendientes:
+                terminadas, _ = await asyncio.wait(
+                    pendientes, timeout=plazo.restante(), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not terminadas:
+                    break
+                
+                for tarea in terminadas:
+                    del pendientes[tarea]
+                    fuente, datos, origen = tarea.result()
+                    if origen == 'plazo':
+                        yield fuente, None, False
+                        continue
+                    
+                    try:
+                        self._aplicar_complementaria(empresa, fuente, datos)
+                    except Exception as e:
+                        logger.warning("Error enriqueciendo con %s: %s", fuente.nombre, e)
+                        # No falla la consulta completa
+                    yield fuente, datos, True
+        finally:
+            for tarea in pendientes:
+                tarea.cancel()
+        
+        for fuente in pendientes.values():
+            yield fuente, None, False
+    
+    def _complementarias_para(self, empresa: EmpresaCompleta) -> List[BaseIntegration]:
+        """
+        Fuentes complementarias de una empresa: las comunes más el ICA
+        de su municipio si la alcaldía tiene adaptador
+        (cada alcaldía tiene su propio pool: una lenta no frena a las demás)
+        """
+        fuentes = list(self.fuentes_complementarias)
+        ica = adaptador_para(empresa.datos_basicos.codigo_municipio)
+        if ica is not None:
+            fuentes.append(ica)
+        return fuentes
+    
+    async def _consultar_fuente(
+        self, fuente: BaseIntegration, nit: str
+    ) -> Tuple[BaseIntegration, Optional[Dict], str]:
+        """Consulta una fuente sin propagar errores"""
+        try:
+            datos, origen = await fuente.consultar_con_origen(nit)
+            return fuente, datos, origen
+        except Exception as e:
+            logger.warning("Error consultando %s: %s", fuente.nombre, e)
+            return fuente, None, 'simulado'
+    
+    async def _consultar_fuente_lote(
+        self, fuente: BaseIntegration, nits: List[str]
+    ) -> Dict[str, Tuple[Optional[Dict], str]]:
+        """Consulta por lote sin propagar errores"""
+        if not nits:
+            return {}
+        try:
+            return await fuente.consultar_lote_con_origen(nits)
+        except Exception as e:
+            logger.warning("Error consultando lote en %s: %s", fuente.nombre, e)
+            return {nit: (None, 'simulado') for nit in nits}
+    
+    def _aplicar_complementaria(self, empresa: EmpresaCompleta, fuente: BaseIntegration, datos: Optional[Dict]):
+        """Incorpora a la empresa los datos de una fuente complementaria"""
+        if fuente.nombre == "ADUANA":
+            if datos and datos.get('tiene_registro'):
+                empresa.señales_aduana = SeñalesAduana(**datos)
                 
-            except Exception as e:
-                print(f"Error enriqueciendo con {fuente.nombre}: {e}")
-                # No falla la consulta completa
-                continue
+                # Actualizar fuentes verificadas
+                if empresa.señales_aduana.activo:
+                    empresa.metadata.fuentes_verificadas.append(
+                        'aduana' if fuente.disponible else 'aduana_simulado'
+                    )
+        
+        elif fuente.nombre == "DIAN":
+            if datos:
+                empresa.señales_rut = SeñalesRUT(**datos)
+                if empresa.señales_rut.registrado:
+                    operacionales = empresa.datos_operacionales
+                    operacionales.codigos_responsabilidades = empresa.señales_rut.responsabilidades
+                    operacionales.responsabilidades_tributarias = [
+                        f'{codigo} - {responsabilidades.descripcion(codigo)}'
+                        for codigo in empresa.señales_rut.responsabilidades
+                    ]
+                empresa.metadata.fuentes_verificadas.append('dian')
+        
+        elif isinstance(fuente, AdaptadorICA):
+            if datos:
+                empresa.señales_ica = SeñalesICA(**datos)
+                empresa.metadata.fuentes_verificadas.append('ica')
     
     def obtener_estado_fuentes(self) -> List[Dict]:
         """
@@ -97,11 +459,12 @@ class VerificacionService:
         """
         estado = []
         
-        for fuente in self.fuentes + self.fuentes_complementarias:
+        for fuente in self.fuentes + self.fuentes_complementarias + adaptadores_ica():
             estado.append({
                 'nombre': fuente.nombre,
                 'disponible': fuente.disponible,
-                'tipo': 'principal' if fuente in self.fuentes else 'complementaria'
+                'tipo': 'principal' if fuente in self.fuentes else 'complementaria',
+                'latencia': obtener_latencias(fuente.nombre).estadisticas()
             })
         
         return estado
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""
+Trazas por consulta y logging estructurado sin bloqueo
+Cada request lleva un trace id; las etapas se registran como spans y se
+exportan junto con los logs por una cola que escribe en otro hilo
+
+configurar() se llama al arrancar el servidor (no al importar): sin ella
+los loggers quedan con la configuración por defecto de logging
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import TRAZAS_ARCHIVO, TRAZAS_UMBRAL_MS, LOG_NIVEL
+
+
+class Traza:
+    """Spans de una consulta, con tiempos relativos a su inicio"""
+
+    def __init__(self, trace_id: Optional[str] = None, nombre: str = ''):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.nombre = nombre
+        self.inicio = time.perf_counter()
+        self.spans: List[Dict] = []
+        self.duracion_ms: Optional[float] = None
+
+    def _ms(self, instante: float) -> float:
+        return round((instante - self.inicio) * 1000, 2)
+
+    def terminar(self) -> float:
+        self.duracion_ms = self._ms(time.perf_counter())
+        return self.duracion_ms
+
+    def a_dict(self) -> Dict:
+        return {
+            'trace_id': self.trace_id,
+            'nombre': self.nombre,
+            'duracion_ms': self.duracion_ms,
+            'spans': self.spans
+        }
+
+
+_traza_actual: contextvars.ContextVar = contextvars.ContextVar('traza_actual', default=None)
+
+
+def traza_actual() -> Optional[Traza]:
+    """Traza del request en curso (None fuera de un request)"""
+    return _traza_actual.get()
+
+
+@contextmanager
+def usar_traza(traza: Traza):
+    """Establece la traza para el código y las tareas creadas en el bloque"""
+    token = _traza_actual.set(traza)
+    try:
+        yield traza
+    finally:
+        _traza_actual.reset(token)
+
+
+@contextmanager
+def span(nombre: str, **atributos):
+    """
+    Registra la duración de una etapa en la traza actual
+    Sin traza activa no hace nada (p. ej. en los workers de snapshots)
+
+    Los atributos se pueden completar dentro del bloque:
+        with span('integracion', fuente='RUES') as attrs:
+            attrs['origen'] = 'cache'
+    """
+    traza = _traza_actual.get()
+    if traza is None:
+        yield atributos
+        return
+
+    inicio = time.perf_counter()
+    error = None
+    try:
+        yield atributos
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        registro = {
+            'nombre': nombre,
+            'inicio_ms': traza._ms(inicio),
+            'duracion_ms': round((time.perf_counter() - inicio) * 1000, 2)
+        }
+        if atributos:
+            registro['atributos'] = atributos
+        if error:
+            registro['error'] = error
+        traza.spans.append(registro)
+
+
+def exportar(traza: Traza):
+    """Envía la traza terminada al exportador si supera el umbral"""
+    if traza.duracion_ms is None:
+        traza.terminar()
+    if traza.duracion_ms >= TRAZAS_UMBRAL_MS:
+        _logger_trazas.info(traza.nombre, extra={'traza': traza.a_dict()})
+
+
+# --- Logging ---
+
+class _FiltroTraceId(logging.Filter):
+    """Agrega el trace id del contexto al registro (en el hilo que loguea)"""
+
+    def filter(self, record):
+        traza = _traza_actual.get()
+        record.trace_id = traza.trace_id if traza else '-'
+        return True
+
+
+class _SinTrazas(logging.Filter):
+    """Deja fuera de la consola los registros de trazas completas"""
+
+    def filter(self, record):
+        return not hasattr(record, 'traza')
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro (logs y trazas)"""
+
+    def format(self, record):
+        linea = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(),
+            'tipo': 'traza' if hasattr(record, 'traza') else 'log',
+            'nivel': record.levelname,
+            'logger': record.name,
+            'trace_id': getattr(record, 'trace_id', '-'),
+            'mensaje': record.getMessage()
+        }
+        if hasattr(record, 'traza'):
+            linea.update(record.traza)
+        if record.exc_info:
+            linea['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(linea, ensure_ascii=False)
+
+
+_cola: 'queue.Queue' = queue.Queue(-1)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configurar():
+    """
+    Logger raíz 'corenta' con un QueueHandler: quien loguea solo encola.
+    Un QueueListener en su propio hilo escribe en consola y en el archivo
+    JSON de trazas (si TRAZAS_ARCHIVO no está vacío)
+    Una sola vez por proceso
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    raiz = logging.getLogger('corenta')
+    raiz.setLevel(LOG_NIVEL)
+    raiz.propagate = False
+
+    manejador_cola = logging.handlers.QueueHandler(_cola)
+    manejador_cola.addFilter(_FiltroTraceId())
+    raiz.handlers = [manejador_cola]
+
+    consola = logging.StreamHandler()
+    consola.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(trace_id)s] %(name)s: %(message)s'))
+    consola.addFilter(_SinTrazas())
+    manejadores = [consola]
+
+    if TRAZAS_ARCHIVO:
+        os.makedirs(os.path.dirname(TRAZAS_ARCHIVO) or '.', exist_ok=True)
+        # Varios workers escriben en el mismo archivo (líneas en modo append);
+        # la rotación se deja a logrotate y WatchedFileHandler reabre el archivo
+        archivo = logging.handlers.WatchedFileHandler(TRAZAS_ARCHIVO, encoding='utf-8')
+        archivo.setFormatter(FormatoJSON())
+        manejadores.append(archivo)
+
+    _listener = logging.handlers.QueueListener(_cola, *manejadores, respect_handler_level=True)
+    _listener.start()
+    atexit.register(detener)
+
+
+def detener():
+    """Escribe lo que quede en la cola y detiene el hilo exportador"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def obtener_logger(nombre: str) -> logging.Logger:
+    """Logger de un módulo (hijo de 'corenta')"""
+    return logging.getLogger(f'corenta.{nombre}')
+
+
+_logger_trazas = obtener_logger('trazas')
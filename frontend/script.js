@@ -28,19 +28,49 @@ const emailInput = document.getElementById('emailInput');
 let ultimaConsulta = null;
 
 /**
- * Validar NIT
+ * Calcular dígito de verificación (DV) de un NIT (algoritmo DIAN)
+ */
+function calcularDV(nit) {
+    const pesos = [3, 7, 13, 17, 19, 23, 29, 37, 41, 43, 47, 53, 59, 67, 71];
+    const suma = nit.split('').reverse()
+        .reduce((total, digito, i) => total + Number(digito) * pesos[i], 0);
+    const residuo = suma % 11;
+    return residuo < 2 ? residuo : 11 - residuo;
+}
+
+/**
+ * Validar NIT (acepta NIT-DV)
  */
 function validarNIT(nit) {
-    const nitLimpio = nit.replace(/[-\s]/g, '');
+    let nitLimpio = nit.replace(/[.\s]/g, '');
+    let dv = null;
+    
+    // Guion antes de un solo dígito final: dígito de verificación
+    const conDV = nitLimpio.match(/^(.*)-(\d)$/);
+    if (conDV) {
+        nitLimpio = conDV[1];
+        dv = Number(conDV[2]);
+    }
+    nitLimpio = nitLimpio.replace(/-/g, '');
     
     if (!/^\d+$/.test(nitLimpio)) {
         return { valido: false, mensaje: 'El NIT debe contener solo números' };
     }
     
+    // 10 dígitos sin guion: NIT + DV
+    if (dv === null && nitLimpio.length === 10) {
+        dv = Number(nitLimpio[9]);
+        nitLimpio = nitLimpio.substring(0, 9);
+    }
+    
     if (nitLimpio.length !== 9) {
         return { valido: false, mensaje: 'El NIT debe tener 9 dígitos' };
     }
     
+    if (dv !== null && dv !== calcularDV(nitLimpio)) {
+        return { valido: false, mensaje: 'El dígito de verificación no corresponde al NIT' };
+    }
+    
     return { valido: true, nit: nitLimpio };
 }
 
@@ -108,6 +138,48 @@ async function consultarAPI(nit) {
     }
 }
 
+/**
+ * Consultar API de forma progresiva (Server-Sent Events)
+ * Muestra la empresa apenas llega y resuelve con el resultado completo
+ */
+function consultarProgresivo(nit) {
+    return new Promise((resolve, reject) => {
+        const stream = new EventSource(`${API_URL}/api/consultar/stream/${nit}`);
+        let recibioDatos = false;
+        
+        stream.addEventListener('empresa', (e) => {
+            recibioDatos = true;
+            mostrarEmpresaParcial(JSON.parse(e.data));
+        });
+        
+        stream.addEventListener('fuente', (e) => {
+            const { fuente } = JSON.parse(e.data);
+            console.log(`Fuente ${fuente} completada`);
+        });
+        
+        stream.addEventListener('resultado', (e) => {
+            stream.close();
+            resolve(JSON.parse(e.data));
+        });
+        
+        stream.addEventListener('fallo', (e) => {
+            stream.close();
+            reject(new Error(JSON.parse(e.data).detail || 'Error en la consulta'));
+        });
+        
+        stream.onerror = () => {
+            stream.close();
+            
+            // Sin datos todavía: usar la consulta tradicional
+            if (!recibioDatos) {
+                consultarAPI(nit).then(resolve, reject);
+            } else {
+                reject(new Error('Se perdió la conexión con el servidor'));
+            }
+        };
+    });
+}
+
 /**
  * Formatear NIT con puntos
  */
@@ -297,6 +369,15 @@ function animarScore(targetScore) {
     nivelBadge.innerHTML = `<span class="nivel-badge ${claseNivel}">${nivel}</span>`;
 }
 
+/**
+ * Mostrar la empresa mientras se calcula el score
+ */
+function mostrarEmpresaParcial(datos) {
+    mostrarEmpresa(datos);
+    scoreValue.textContent = '…';
+    resultadosSection.classList.remove('hidden');
+}
+
 /**
  * Mostrar resultados
  */
@@ -337,8 +418,10 @@ consultaForm.addEventListener('submit', async (e) => {
     mostrarLoader();
     
     try {
-        // Consultar API
-        const resultado = await consultarAPI(validacion.nit);
+        // Consultar API (progresiva si el navegador soporta SSE)
+        const resultado = window.EventSource
+            ? await consultarProgresivo(validacion.nit)
+            : await consultarAPI(validacion.nit);
         
         // Mostrar resultados
         mostrarResultados(resultado);
@@ -406,11 +489,11 @@ leadForm.addEventListener('submit', async (e) => {
  * Formatear input de NIT mientras se escribe
  */
 nitInput.addEventListener('input', (e) => {
-    // Remover todo lo que no sea número
-    let valor = e.target.value.replace(/\D/g, '');
+    // Permitir solo números y el guion del DV
+    let valor = e.target.value.replace(/[^\d-]/g, '');
     
-    // Limitar a 9 dígitos
-    valor = valor.substring(0, 9);
+    // Limitar a 9 dígitos + guion + DV
+    valor = valor.substring(0, 11);
     
     e.target.value = valor;
 });
@@ -0,0 +1,21 @@
+"""
+Configuración común de las pruebas
+El backend se importa como en producción (desde backend/), con el almacén
+y los caches en un directorio temporal
+"""
+
+import os
+import sys
+import tempfile
+
+DIRECTORIO_BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+
+# Antes de importar config
+os.environ.setdefault('DIRECTORIO_ALMACEN', tempfile.mkdtemp(prefix='pruebas_almacen_'))
+os.environ.setdefault('CACHE_BACKEND', 'memoria')
+os.environ.setdefault('CACHE_INTEGRACIONES_BACKEND', 'memoria')
+os.environ.setdefault('ARCHIVO_HABILITADO', '0')
+os.environ.setdefault('SNAPSHOTS_HABILITADOS', '0')
+os.environ.setdefault('CALENTADOR_HABILITADO', '0')
+
+sys.path.insert(0, DIRECTORIO_BACKEND)
@@ -0,0 +1,63 @@
+"""
+Pruebas del control de admisión
+El cupo de un request se libera aunque su cuerpo nunca llegue a enviarse
+"""
+
+import asyncio
+import gc
+
+import pytest
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+import admision
+import api
+
+
+def _request(ruta: str) -> Request:
+    return Request({'type': 'http', 'method': 'GET', 'path': ruta, 'headers': [], 'query_string': b''})
+
+
+async def _trozos():
+    yield b'data: uno\n\n'
+    yield b'data: dos\n\n'
+
+
+async def _responder(request):
+    return StreamingResponse(_trozos(), media_type='text/event-stream')
+
+
+@pytest.fixture
+def control(monkeypatch):
+    propio = admision.ControlAdmision(2, 2, 1)
+    monkeypatch.setattr(admision, 'obtener_control', lambda: propio)
+    return propio
+
+
+def test_cuerpo_enviado_libera_el_cupo(control):
+    async def correr():
+        respuesta = await api.controlar_admision(_request('/api/verificar'), _responder)
+        assert control.en_curso == 1
+        return [trozo async for trozo in respuesta.body_iterator]
+
+    assert len(asyncio.run(correr())) == 2
+    assert control.en_curso == 0
+
+
+def test_cuerpo_cerrado_sin_empezar_libera_el_cupo(control):
+    async def correr():
+        respuesta = await api.controlar_admision(_request('/api/verificar'), _responder)
+        await respuesta.body_iterator.aclose()
+
+    asyncio.run(correr())
+    assert control.en_curso == 0
+
+
+def test_cuerpo_descartado_sin_empezar_libera_el_cupo(control):
+    async def correr():
+        # El cliente se fue antes de que el servidor empezara a enviar
+        await api.controlar_admision(_request('/api/verificar'), _responder)
+        gc.collect()
+
+    asyncio.run(correr())
+    assert control.en_curso == 0
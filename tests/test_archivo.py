@@ -0,0 +1,37 @@
+"""
+Pruebas del archivo de respuestas crudas
+La retención no borra un documento que otro proceso acaba de referenciar
+"""
+
+import os
+import threading
+
+import services.archivo_service as archivo_service
+from services.archivo_service import ArchivoService
+
+
+def test_guardar_durante_la_retencion_conserva_el_documento(monkeypatch):
+    archivo = ArchivoService()
+    viejo = b'<html>pagina vieja 710000001</html>'
+    archivo.guardar('RUES', '710000001', viejo)
+    archivo.guardar('RUES', '710000001', b'<html>pagina nueva 710000001</html>')
+
+    remove = os.remove
+    guardados = []
+    hilo = threading.Thread(target=lambda: guardados.append(archivo.guardar('RUES', '710000002', viejo)))
+
+    def remove_con_guardar_concurrente(ruta):
+        # Otro NIT devuelve la misma página justo cuando la retención la borra
+        if not hilo.is_alive() and not guardados:
+            hilo.start()
+            hilo.join(0.5)
+        remove(ruta)
+
+    monkeypatch.setattr(archivo_service.os, 'remove', remove_con_guardar_concurrente)
+    resultado = archivo.aplicar_retencion(dias=3650, max_por_nit=1)
+    hilo.join()
+
+    assert resultado['documentos_borrados'] >= 1
+    hash_viejo, registrada = guardados[0]
+    assert registrada
+    assert archivo.leer(hash_viejo) == viejo
@@ -0,0 +1,108 @@
+"""
+Pruebas del cache negativo de NITs inexistentes
+Solo una respuesta explícita de "sin resultados" de todas las fuentes
+reales lo alimenta; una caída o una página no reconocida no
+"""
+
+import asyncio
+import itertools
+
+import pytest
+import requests
+
+import integrations.rues_integration as rues_integration
+from integrations.rues_integration import RUESIntegration
+from services.verificacion_service import VerificacionService
+
+
+PAGINA_SIN_RESULTADOS = '<html><body><p>No se encontraron resultados para el NIT consultado</p></body></html>'.encode('utf-8')
+PAGINA_MANTENIMIENTO = '<html><body><h1>Estamos en mantenimiento</h1></body></html>'.encode('utf-8')
+
+# Un NIT distinto por prueba: el cache negativo es del proceso
+_nits = (str(nit) for nit in itertools.count(910000001))
+
+
+class _PoolDirecto:
+    """Parseo en el mismo proceso (sin el pool de procesos)"""
+
+    async def extraer_rues(self, html, nit, timeout=None):
+        from rues_scraper import extraer_campos
+        return extraer_campos(html, nit)
+
+
+@pytest.fixture
+def rues(monkeypatch):
+    """RUES habilitado, sin reintentos, con la descarga reemplazada"""
+    monkeypatch.setattr(rues_integration, 'RUES_HABILITADO', True)
+    monkeypatch.setattr(rues_integration, 'obtener_pool_parseo', lambda: _PoolDirecto())
+    monkeypatch.setattr(RUESIntegration, 'reintentos', 0)
+    monkeypatch.setattr(RUESIntegration, 'cobertura', False)
+
+    def descargar_con(respuesta):
+        def descargar(self, nit, timeout):
+            if isinstance(respuesta, Exception):
+                raise respuesta
+            return respuesta
+        monkeypatch.setattr(RUESIntegration, '_descargar', descargar)
+
+    return descargar_con
+
+
+def _verificar(nit):
+    servicio = VerificacionService()
+    asyncio.run(servicio.verificar_empresa(nit))
+    return servicio.nits_inexistentes.obtener(nit) is not None
+
+
+def test_sin_resultados_explicito_registra_inexistente(rues):
+    rues(PAGINA_SIN_RESULTADOS)
+    assert _verificar(next(_nits))
+
+
+def test_caida_del_rues_no_registra_inexistente(rues):
+    rues(requests.HTTPError("El RUES respondió 503"))
+    assert not _verificar(next(_nits))
+
+
+def test_pagina_no_reconocida_no_registra_inexistente(rues):
+    rues(PAGINA_MANTENIMIENTO)
+    assert not _verificar(next(_nits))
+
+
+def test_lote_con_caida_no_registra_inexistentes(rues):
+    rues(requests.HTTPError("El RUES respondió 429"))
+    servicio = VerificacionService()
+    nits = [next(_nits) for _ in range(3)]
+    asyncio.run(servicio.verificar_lote(nits))
+    assert all(servicio.nits_inexistentes.obtener(nit) is None for nit in nits)
+
+
+def test_lote_sin_resultados_registra_inexistentes(rues):
+    rues(PAGINA_SIN_RESULTADOS)
+    servicio = VerificacionService()
+    nits = [next(_nits) for _ in range(3)]
+    asyncio.run(servicio.verificar_lote(nits))
+    assert all(servicio.nits_inexistentes.obtener(nit) is not None for nit in nits)
+
+
+def test_inexistente_no_vuelve_a_consultar_el_rues(rues, monkeypatch):
+    rues(PAGINA_SIN_RESULTADOS)
+    nit = next(_nits)
+    assert _verificar(nit)
+
+    consultas = []
+    monkeypatch.setattr(RUESIntegration, '_descargar', lambda self, nit, timeout: consultas.append(nit))
+    assert _verificar(nit)
+    assert consultas == []
+
+
+def test_obtener_html_falla_con_respuesta_no_200(monkeypatch):
+    from rues_scraper import RUESScraper
+
+    class Respuesta:
+        status_code = 503
+        content = b''
+
+    monkeypatch.setattr(requests, 'post', lambda *args, **kwargs: Respuesta())
+    with pytest.raises(OSError):
+        RUESScraper().obtener_html('890903938')
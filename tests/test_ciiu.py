@@ -0,0 +1,23 @@
+"""
+Pruebas de la clasificación CIIU de textos de actividad
+"""
+
+from ciiu import CatalogoCIIU
+
+
+def _catalogo():
+    return CatalogoCIIU({
+        '4711': 'Comercio al por menor en establecimientos no especializados con surtido compuesto principalmente por alimentos',
+        '4731': 'Comercio al por menor de combustible para automotores',
+        '6201': 'Actividades de desarrollo de sistemas informáticos',
+    })
+
+
+def test_codigo_inicial_del_catalogo_manda():
+    assert _catalogo().clasificar('4731 - cualquier descripción') == '4731'
+
+
+def test_numero_inicial_fuera_del_catalogo_se_clasifica_por_texto():
+    catalogo = _catalogo()
+    assert catalogo.clasificar('2024 comercio al por menor de combustible para automotores') == '4731'
+    assert catalogo.clasificar('1234 desarrollo de sistemas informáticos') == '6201'
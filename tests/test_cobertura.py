@@ -0,0 +1,79 @@
+"""
+Pruebas de la cobertura (hedging) de las integraciones
+Cuando los dos intentos terminan a la vez gana el que terminó bien
+"""
+
+import asyncio
+import itertools
+
+import pytest
+
+from config import COBERTURA_MIN_MUESTRAS
+import integrations.base_integration as base_integration
+from integrations.base_integration import BaseIntegration
+from integrations.resiliencia import PresupuestoReintentos, obtener_latencias
+
+# Un nombre de fuente por prueba: las latencias observadas son del proceso
+_nombres = (f'PRUEBA_COBERTURA_{i}' for i in itertools.count())
+
+
+class _FuenteLenta(BaseIntegration):
+    """
+    Los intentos esperan a que se libere `liberar` y terminan en la misma
+    vuelta del event loop; `fallan` dice cuáles lanzan error (por orden)
+    """
+
+    cobertura = True
+
+    def __init__(self, fallan):
+        self._nombre = next(_nombres)
+        self.fallan = list(fallan)
+        self.intentos = 0
+        self.liberar = None
+        for _ in range(COBERTURA_MIN_MUESTRAS):
+            obtener_latencias(self._nombre).registrar(0.01)
+
+    @property
+    def nombre(self) -> str:
+        return self._nombre
+
+    @property
+    def disponible(self) -> bool:
+        return True
+
+    async def consultar(self, nit):
+        falla = self.fallan[self.intentos]
+        self.intentos += 1
+        await self.liberar
+        if falla:
+            raise ConnectionError("fuente caída")
+        return {'nit': nit}
+
+
+@pytest.fixture(autouse=True)
+def presupuesto(monkeypatch):
+    """Presupuesto de reintentos propio: cada ronda lanza su cobertura"""
+    propio = PresupuestoReintentos(proporcion=0, maximo=1000)
+    monkeypatch.setattr(base_integration, 'obtener_presupuesto', lambda: propio)
+
+
+def _consultar(fuente):
+    async def correr():
+        fuente.liberar = asyncio.get_running_loop().create_future()
+        asyncio.get_running_loop().call_later(0.05, fuente.liberar.set_result, None)
+        return await fuente._consultar_con_cobertura('890903938')
+    return asyncio.run(correr())
+
+
+@pytest.mark.parametrize('fallan', [(True, False), (False, True)])
+def test_gana_el_intento_exitoso_aunque_terminen_juntos(fallan):
+    # Varias rondas: el orden en que asyncio.wait entrega las terminadas varía
+    for _ in range(10):
+        fuente = _FuenteLenta(fallan)
+        assert _consultar(fuente) == {'nit': '890903938'}
+        assert fuente.intentos == 2
+
+
+def test_si_ambos_fallan_se_propaga_el_error():
+    with pytest.raises(ConnectionError):
+        _consultar(_FuenteLenta((True, True)))
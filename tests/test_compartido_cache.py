@@ -0,0 +1,40 @@
+"""
+Pruebas del cache compartido (mmap)
+Un archivo dañado se reconstruye en su lugar: todos los workers siguen
+viendo el mismo archivo
+"""
+
+import os
+
+from cache.compartido_cache import CompartidoCache
+
+
+def test_archivo_dañado_se_reconstruye_sin_separar_a_los_workers(tmp_path):
+    ruta = str(tmp_path / 'cache_compartido.mmap')
+    primero = CompartidoCache(ruta, 64, 512)
+    primero.guardar('antes', 1, ttl=60)
+
+    # Algo dañó la cabecera; el worker que arranca ahora lo reconstruye
+    with open(primero.ruta, 'r+b') as archivo:
+        archivo.write(b'XXXXXXXX')
+    segundo = CompartidoCache(ruta, 64, 512)
+
+    assert segundo.obtener('antes') is None
+    assert primero.obtener('antes') is None
+
+    # Lo que escribe el que ya estaba lo ve el nuevo, y al revés
+    primero.guardar('del_primero', 'a', ttl=60)
+    segundo.guardar('del_segundo', 'b', ttl=60)
+    assert segundo.obtener('del_primero') == 'a'
+    assert primero.obtener('del_segundo') == 'b'
+    assert os.listdir(tmp_path) == [os.path.basename(primero.ruta)]
+
+
+def test_archivo_truncado_recupera_su_tamaño(tmp_path):
+    ruta = str(tmp_path / 'cache_compartido.mmap')
+    ruta_geometria = CompartidoCache(ruta, 64, 512).ruta
+    os.truncate(ruta_geometria, 100)
+
+    cache = CompartidoCache(ruta, 64, 512)
+    cache.guardar('clave', {'valor': 1}, ttl=60)
+    assert cache.obtener('clave') == {'valor': 1}
@@ -0,0 +1,49 @@
+"""
+Pruebas de la consulta del RUT contra el formulario simulado
+Las páginas se parsean en el pool de parseo, no en los hilos de la API
+"""
+
+import asyncio
+
+import pytest
+
+import integrations.dian_integration as dian_integration
+from integrations import dian_simulador
+from integrations.dian_integration import PoolSesionesMUISCA, interpretar_respuesta
+from nit import calcular_dv
+
+
+class _PoolDirecto:
+    """Parsea en el mismo proceso y cuenta las páginas que recibe"""
+
+    def __init__(self):
+        self.paginas = 0
+
+    async def interpretar_dian(self, html: bytes, timeout=None):
+        self.paginas += 1
+        return interpretar_respuesta(html)
+
+
+@pytest.fixture
+def url():
+    servidor = dian_simulador.iniciar(retardo_negociacion=0, retardo_consulta=0)
+    yield f'http://127.0.0.1:{servidor.server_address[1]}/rut'
+    servidor.shutdown()
+
+
+def test_consulta_parsea_en_el_pool_y_trae_el_dv_del_nit(url, monkeypatch):
+    parseo = _PoolDirecto()
+    monkeypatch.setattr(dian_integration, 'obtener_pool_parseo', lambda: parseo)
+    sesiones = PoolSesionesMUISCA(url, 1)
+    # Un NIT que el simulador tiene inscrito
+    nit = next(n for n in (str(900000000 + i) for i in range(100)) if dian_simulador.registro(n))
+
+    try:
+        datos = asyncio.run(sesiones.consultar(nit, 10))
+    finally:
+        sesiones.cerrar()
+
+    assert datos['registrado']
+    assert datos['dv'] == str(calcular_dv(nit))
+    # Negociación (GET del formulario) y consulta
+    assert parseo.paginas == 2
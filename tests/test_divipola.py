@@ -0,0 +1,46 @@
+"""
+Pruebas del nomenclátor DIVIPOLA
+"""
+
+import pytest
+
+import divipola
+
+
+@pytest.mark.parametrize('texto, departamento, codigo', [
+    ('Bogota', None, '11001'),
+    ('BOGOTÁ D.C.', 'Bogotá D.C.', '11001'),
+    ('MEDELLÍN', 'Antioquia', '05001'),
+    ('santiago de cali', None, '76001'),
+    ('Cúcuta (Norte de Santander)', None, '54001'),
+    ('Rionegro', 'Antioquia', '05615'),
+    ('Rionegro', None, '05615'),
+])
+def test_municipio_reconocido(texto, departamento, codigo):
+    assert divipola.municipio(texto, departamento).codigo == codigo
+
+
+@pytest.mark.parametrize('texto, departamento', [
+    ('Rionegro', 'Santander'),
+    ('Mosquera', 'Nariño'),
+])
+def test_municipio_fuera_del_departamento_no_se_resuelve(texto, departamento):
+    assert divipola.municipio(texto, departamento) is None
+
+
+def test_canonizar_no_cambia_el_departamento():
+    datos = divipola.canonizar({'municipio': 'Rionegro', 'departamento': 'santander'})
+    assert datos['departamento'] == 'SANTANDER'
+    assert datos['municipio'] == 'Rionegro'
+    assert 'codigo_municipio' not in datos
+
+    datos = divipola.canonizar({'municipio': 'Mosquera', 'departamento': 'NARIÑO'})
+    assert datos['departamento'] == 'NARIÑO'
+    assert 'codigo_municipio' not in datos
+
+
+def test_canonizar_municipio_del_departamento():
+    datos = divipola.canonizar({'municipio': 'MOSQUERA', 'departamento': 'Cundinamarca'})
+    assert (datos['municipio'], datos['departamento'], datos['codigo_municipio']) == (
+        'MOSQUERA', 'CUNDINAMARCA', '25473'
+    )
@@ -0,0 +1,42 @@
+"""
+Pruebas de la normalización de fechas
+"""
+
+import pytest
+
+from fechas import fecha_a_ordinal, normalizar_fecha
+
+
+@pytest.mark.parametrize('texto, esperada', [
+    ('2025-03-20', '2025-03-20'),
+    ('2025/3/5', '2025-03-05'),
+    ('2025-03-20T10:00:00', '2025-03-20'),
+    ('2025-03-20 10:00', '2025-03-20'),
+    ('20/03/2025', '2025-03-20'),
+    ('5-3-2025', '2025-03-05'),
+    ('20.03.2025', '2025-03-20'),
+    ('20 de marzo de 2025', '2025-03-20'),
+    ('20 DE MARZO DEL 2025', '2025-03-20'),
+    ('20 mar. 2025', '2025-03-20'),
+    ('20-mar-2025', '2025-03-20'),
+    ('1 de septiembre de 2024', '2024-09-01'),
+    ('1 setiembre 2024', '2024-09-01'),
+    ('  3   de   Diciembre   de 2023 ', '2023-12-03'),
+])
+def test_fecha_reconocida(texto, esperada):
+    assert normalizar_fecha(texto) == esperada
+
+
+@pytest.mark.parametrize('texto', [
+    None,
+    '',
+    '31/02/2025',
+    '2025-13-01',
+    '20 de marzzo de 2025',
+    '03/20/2025',
+    'mañana',
+    '20250320',
+])
+def test_fecha_invalida(texto):
+    assert normalizar_fecha(texto) is None
+    assert fecha_a_ordinal(texto) is None
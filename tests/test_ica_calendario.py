@@ -0,0 +1,66 @@
+"""
+Pruebas del calendario del ICA y de la vigencia de sus resultados en cache
+"""
+
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from config import ICA_TTL_PENDIENTE
+from integrations.ica.calendario import ANUAL, BIMESTRAL, CalendarioICA
+from integrations.ica.portales import AdaptadorBogota, AdaptadorMedellin
+
+
+@pytest.mark.parametrize('calendario, hoy, exigible, proximo', [
+    # Anual: el año gravable se declara hasta el 31 de marzo del siguiente
+    (ANUAL, date(2026, 3, 30), '2024', date(2026, 3, 31)),
+    (ANUAL, date(2026, 3, 31), '2025', date(2027, 3, 31)),
+    (ANUAL, date(2026, 12, 31), '2025', date(2027, 3, 31)),
+    # Bimestral: cada bimestre se declara hasta el 19 del mes siguiente
+    (BIMESTRAL, date(2026, 1, 18), '2025-B5', date(2026, 1, 19)),
+    (BIMESTRAL, date(2026, 1, 19), '2025-B6', date(2026, 3, 19)),
+    (BIMESTRAL, date(2026, 3, 19), '2026-B1', date(2026, 5, 19)),
+    (BIMESTRAL, date(2026, 12, 31), '2026-B5', date(2027, 1, 19)),
+])
+def test_periodo_exigible_y_proximo_vencimiento(calendario, hoy, exigible, proximo):
+    assert calendario.etiqueta(calendario.periodo_exigible(hoy)) == exigible
+    assert calendario.proximo_vencimiento(hoy) == proximo
+
+
+def test_vencimiento_se_ajusta_al_ultimo_dia_del_mes():
+    calendario = CalendarioICA(meses_periodo=12, meses_para_declarar=2, dia_vencimiento=31)
+    assert calendario.vencimiento((2025, 1)) == date(2026, 2, 28)
+    assert calendario.vencimiento((2027, 1)) == date(2028, 2, 29)
+
+
+@pytest.mark.parametrize('adaptador', [AdaptadorMedellin(), AdaptadorBogota()])
+def test_resultado_al_dia_vence_con_el_calendario(adaptador):
+    hoy = date.today()
+    exigible = adaptador.calendario.periodo_exigible(hoy)
+    datos = adaptador.resultado([exigible], hoy)
+    assert datos['al_dia']
+
+    # En cache hasta el inicio del día del próximo vencimiento
+    proximo = adaptador.calendario.proximo_vencimiento(hoy)
+    assert datos['proximo_vencimiento'] == proximo.isoformat()
+    hasta = datetime.combine(proximo, datetime.min.time()).timestamp() - time.time()
+    assert adaptador.ttl_resultado(datos) == pytest.approx(max(60.0, hasta), abs=5)
+
+
+def test_resultado_pendiente_o_sin_inscripcion_vence_pronto():
+    adaptador = AdaptadorMedellin()
+    hoy = date.today()
+    exigible = adaptador.calendario.periodo_exigible(hoy)
+    atrasado = (exigible[0] - 1, exigible[1])
+
+    pendiente = adaptador.resultado([atrasado], hoy)
+    assert not pendiente['al_dia']
+    assert adaptador.ttl_resultado(pendiente) == ICA_TTL_PENDIENTE
+    assert adaptador.ttl_resultado(adaptador.resultado(None, hoy)) == ICA_TTL_PENDIENTE
+
+
+def test_vencimiento_inminente_conserva_un_minimo():
+    adaptador = AdaptadorMedellin()
+    datos = {'al_dia': True, 'proximo_vencimiento': (date.today() - timedelta(days=1)).isoformat()}
+    assert adaptador.ttl_resultado(datos) == 60.0
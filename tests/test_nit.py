@@ -0,0 +1,49 @@
+"""
+Pruebas del dígito de verificación y la normalización de NIT
+"""
+
+import pytest
+
+from nit import calcular_dv, normalizar_nit, separar_nit
+
+
+@pytest.mark.parametrize('nit, dv', [
+    ('890903938', 8),  # Bancolombia
+    ('899999068', 1),  # Ecopetrol
+    ('860034313', 7),  # Davivienda
+    ('800197268', 4),  # DIAN
+    ('900000001', 2),
+])
+def test_calcular_dv(nit, dv):
+    assert calcular_dv(nit) == dv
+
+
+@pytest.mark.parametrize('nit, dv', [
+    ('900000009', 0),  # residuo 0
+    ('900000002', 1),  # residuo 1
+])
+def test_calcular_dv_residuos_0_y_1(nit, dv):
+    # Con residuo 0 o 1 el DV es el residuo (no 11 - residuo)
+    assert calcular_dv(nit) == dv
+
+
+@pytest.mark.parametrize('texto', ['890903938', '890.903.938', '890903938-8', '890.903.938-8', '8909039388'])
+def test_normalizar_nit_formatos(texto):
+    assert normalizar_nit(texto) == '890903938'
+
+
+def test_separar_nit_dv():
+    assert separar_nit('890.903.938-8') == ('890903938', 8)
+    assert separar_nit('890903938') == ('890903938', None)
+
+
+@pytest.mark.parametrize('texto', ['890903938-7', '8909039387'])
+def test_normalizar_nit_rechaza_dv_incorrecto(texto):
+    with pytest.raises(ValueError):
+        normalizar_nit(texto)
+
+
+@pytest.mark.parametrize('texto', ['', '12345', 'ABC903938', '8909039381234'])
+def test_normalizar_nit_rechaza_formato(texto):
+    with pytest.raises(ValueError):
+        normalizar_nit(texto)
@@ -0,0 +1,93 @@
+"""
+Pruebas del cache de dos niveles (L1 memoria / L2 disco)
+"""
+
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from cache.niveles_cache import NivelesCache
+
+# Una base de L2 por prueba
+_bases = (f'prueba_niveles_{i}.db' for i in itertools.count())
+
+
+@pytest.fixture
+def crear_cache():
+    """Fábrica de caches sobre una misma base L2 (simula reinicios del proceso)"""
+    base = next(_bases)
+    creados = []
+
+    def crear(ttl_l1: float = 300):
+        cache = NivelesCache(100, base, 10 * 1024 * 1024, ttl_l1)
+        creados.append(cache)
+        return cache
+
+    yield crear
+    for cache in creados:
+        cache.cerrar()
+
+
+def test_promocion_desde_l2_no_sobrevive_a_la_expiracion(crear_cache):
+    anterior = crear_cache()
+    anterior.guardar('clave', {'valor': 1}, ttl=0.3)
+    anterior.l2.vaciar_cola()
+
+    # Tras un reinicio L1 está vacío: la lectura sale de L2 y se promueve
+    cache = crear_cache(ttl_l1=300)
+    assert cache.obtener('clave') == {'valor': 1}
+    assert cache.l1.obtener('clave') == {'valor': 1}
+
+    time.sleep(0.4)
+    assert cache.obtener('clave') is None
+
+
+def test_lecturas_desde_el_event_loop(crear_cache):
+    anterior = crear_cache()
+    anterior.guardar('en_l2', 'disco', ttl=60)
+    anterior.l2.vaciar_cola()
+
+    cache = crear_cache()
+    cache.guardar('en_l1', 'memoria', ttl=60)
+
+    async def leer():
+        return (
+            await cache.obtener_async('en_l2'),
+            await cache.obtener_varios_async(['en_l1', 'en_l2', 'no_existe'])
+        )
+
+    uno, varios = asyncio.run(leer())
+    assert uno == 'disco'
+    assert varios == {'en_l1': 'memoria', 'en_l2': 'disco', 'no_existe': None}
+
+
+def test_escritura_diferida_llega_a_l2(crear_cache):
+    cache = crear_cache()
+    cache.guardar('clave', [1, 2, 3], ttl=60)
+    # L1 la sirve de inmediato, antes de que el escritor la lleve a disco
+    assert cache.l1.obtener('clave') == [1, 2, 3]
+
+    cache.l2.vaciar_cola()
+    assert cache.l2.obtener('clave') == [1, 2, 3]
+
+
+def test_cerrar_escribe_lo_pendiente(crear_cache):
+    anterior = crear_cache()
+    for i in range(50):
+        anterior.guardar(f'clave_{i}', i, ttl=60)
+    anterior.cerrar()
+
+    cache = crear_cache()
+    assert [cache.obtener(f'clave_{i}') for i in range(50)] == list(range(50))
+
+
+def test_eliminar_llega_a_ambos_niveles(crear_cache):
+    anterior = crear_cache()
+    anterior.guardar('clave', 'valor', ttl=60)
+    anterior.eliminar('clave')
+    anterior.l2.vaciar_cola()
+    assert anterior.obtener('clave') is None
+
+    assert crear_cache().obtener('clave') is None
@@ -0,0 +1,54 @@
+"""
+Pruebas del pool de parseo
+Una tarea colgada se detiene terminando solo su proceso; las que estaban
+en curso en el mismo pool fallan con un error reintentable
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from pool_parseo import ParseoInterrumpido, ParseoTimeout, PoolParseo
+
+
+def _vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+@pytest.fixture
+def pool():
+    pool = PoolParseo(max_workers=2, max_pendientes=10, timeout=30)
+    yield pool
+    pool.cerrar()
+
+
+def test_timeout_termina_el_proceso_y_las_demas_se_reintentan(pool):
+    async def correr():
+        # Pool caliente: los dos workers ya arrancaron
+        await asyncio.gather(pool.ejecutar(time.sleep, 0.2), pool.ejecutar(time.sleep, 0.2))
+
+        colgada = asyncio.ensure_future(pool.ejecutar(time.sleep, 30, timeout=1))
+        vecina = asyncio.ensure_future(pool.ejecutar(time.sleep, 5))
+        await asyncio.sleep(0.5)
+        pool._leer_inicios(pool._cola_inicios)
+        pid_colgada = pool._procesos[min(pool._procesos)]  # la primera en curso
+
+        resultados = await asyncio.gather(colgada, vecina, return_exceptions=True)
+        await asyncio.sleep(0.5)
+        return resultados, pid_colgada, await pool.ejecutar(os.getpid)
+
+    (colgada, vecina), pid_colgada, pid_nuevo = asyncio.run(correr())
+
+    assert isinstance(colgada, ParseoTimeout)
+    assert isinstance(vecina, ParseoInterrumpido) and isinstance(vecina, OSError)
+    assert pool.reemplazos == 1
+    assert not _vivo(pid_colgada)
+    # El pool nuevo atiende y no quedaron PIDs registrados
+    assert _vivo(pid_nuevo)
+    assert pool._procesos == {}
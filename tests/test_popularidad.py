@@ -0,0 +1,66 @@
+"""
+Pruebas del sketch de frecuencias (popularidad de los NITs)
+"""
+
+import pytest
+
+from popularidad import SketchFrecuencias, nit_de_clave
+
+
+def _registrar(sketch, clave, veces):
+    for _ in range(veces):
+        sketch.registrar(clave)
+
+
+def _pasar_vidas_medias(sketch, mitades):
+    sketch._ultimo_decaimiento -= mitades * sketch.vida_media
+
+
+@pytest.fixture
+def sketch():
+    return SketchFrecuencias(ancho=1024, profundidad=4, vida_media=3600, max_candidatos=3)
+
+
+def test_estimacion_nunca_menor_que_la_frecuencia(sketch):
+    for i in range(200):
+        _registrar(sketch, f'9000{i:05d}', i % 7 + 1)
+    for i in range(200):
+        assert sketch.estimar(f'9000{i:05d}') >= i % 7 + 1
+
+
+def test_decaimiento_divide_por_dos_cada_vida_media(sketch):
+    _registrar(sketch, 'a', 8)
+    _registrar(sketch, 'b', 1)
+
+    _pasar_vidas_medias(sketch, 2)
+    # Las que llegan a cero dejan de ser candidatas
+    assert sketch.top(3) == [('a', 2)]
+    assert sketch.estimar('a') == 2
+    assert sketch.estimar('b') == 0
+
+    # Menos de una vida media no decae
+    _pasar_vidas_medias(sketch, 0.5)
+    assert sketch.top(3) == [('a', 2)]
+
+
+def test_top_reemplaza_al_candidato_menos_frecuente(sketch):
+    _registrar(sketch, 'a', 5)
+    _registrar(sketch, 'b', 3)
+    _registrar(sketch, 'c', 2)
+
+    # Lista llena: una clave nueva entra solo si supera al menor
+    _registrar(sketch, 'd', 2)
+    assert [clave for clave, _ in sketch.top(3)] == ['a', 'b', 'c']
+
+    _registrar(sketch, 'd', 1)
+    assert sketch.top(3) == [('a', 5), ('b', 3), ('d', 3)]
+    assert sketch.top(1) == [('a', 5)]
+
+
+@pytest.mark.parametrize('clave, nit', [
+    ('empresas:890903938', '890903938'),
+    ('integracion:RUES:890903938', '890903938'),
+    ('otra:clave', None),
+])
+def test_nit_de_clave(clave, nit):
+    assert nit_de_clave(clave) == nit
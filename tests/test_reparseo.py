@@ -0,0 +1,57 @@
+"""
+Pruebas del reparseo de páginas archivadas al almacén de empresas
+"""
+
+import pytest
+
+import services.almacen_empresas_service as almacen_empresas_service
+from services.almacen_empresas_service import AlmacenEmpresasService
+from services.archivo_service import ArchivoService
+
+
+def _pagina(razon_social: str) -> bytes:
+    return f'''<html><body><table>
+      <tr><td>Razón Social</td><td>{razon_social}</td></tr>
+      <tr><td>Estado de la matrícula</td><td>ACTIVA</td></tr>
+    </table></body></html>'''.encode('utf-8')
+
+
+PAGINA_SIN_RESULTADOS = b'<html><body><p>No se encontraron resultados</p></body></html>'
+PAGINA_MANTENIMIENTO = b'<html><body><h1>Estamos en mantenimiento</h1></body></html>'
+
+
+@pytest.fixture
+def almacen():
+    servicio = AlmacenEmpresasService()
+    servicio.reiniciar('RUES')
+    return servicio
+
+
+def _reparsear(almacen):
+    return almacen.reparsear('RUES', max_workers=1)
+
+
+def test_cambio_de_extractor_reinicia_el_punto_de_control(almacen, monkeypatch):
+    ArchivoService().guardar('RUES', '720000001', _pagina('EMPRESA UNO S.A.S.'))
+    assert _reparsear(almacen)['documentos'] >= 1
+    assert _reparsear(almacen)['documentos'] == 0
+
+    monkeypatch.setattr(almacen_empresas_service, 'huella_extractor', lambda fuente: 'otra-version')
+    assert _reparsear(almacen)['documentos'] >= 1
+
+
+def test_sin_resultados_borra_y_pagina_no_reconocida_conserva(almacen):
+    archivo = ArchivoService()
+    archivo.guardar('RUES', '720000002', _pagina('EMPRESA DOS S.A.S.'))
+    archivo.guardar('RUES', '720000003', _pagina('EMPRESA TRES S.A.S.'))
+    _reparsear(almacen)
+    assert almacen.obtener('720000002') and almacen.obtener('720000003')
+
+    archivo.guardar('RUES', '720000002', PAGINA_SIN_RESULTADOS)
+    archivo.guardar('RUES', '720000003', PAGINA_MANTENIMIENTO)
+    almacen.reiniciar('RUES')
+    estadisticas = _reparsear(almacen)
+
+    assert almacen.obtener('720000002') is None
+    assert almacen.obtener('720000003')['razon_social'] == 'EMPRESA TRES S.A.S.'
+    assert estadisticas['sin_resultado'] >= 1 and estadisticas['fallos'] >= 1
@@ -0,0 +1,64 @@
+"""
+Pruebas de los agregados de snapshots
+Cuentan solo las filas de la versión actual de la configuración
+"""
+
+import json
+
+import pytest
+
+from base_datos import transaccion
+from services.compliance_service import ComplianceService
+from services.snapshot_service import BASE_SNAPSHOTS, SIN_EXPIRACION, SnapshotService
+
+
+def _fila(nit, version, departamento, score=50):
+    return (
+        nit, version, 'huella', score, 'MEDIO', json.dumps({'señales_activas': []}), '{}',
+        SIN_EXPIRACION, departamento, 'N/A', '0000', 'PEQUEÑA', '2026-01-01T00:00:00', None
+    )
+
+
+def _agregado(departamento, metrica='empresas'):
+    with transaccion(BASE_SNAPSHOTS) as con:
+        fila = con.execute(
+            "SELECT n FROM snapshots_agregados WHERE dimension = 'departamento' AND valor = ? AND metrica = ?",
+            (departamento, metrica)
+        ).fetchone()
+    return fila[0] if fila else None
+
+
+@pytest.fixture
+def snapshots():
+    servicio = SnapshotService()
+    yield servicio
+    with transaccion(BASE_SNAPSHOTS) as con:
+        con.execute("DELETE FROM snapshots_score WHERE departamento LIKE 'PRUEBA%'")
+    servicio.reconstruir_agregados()
+
+
+def test_reemplazo_mueve_la_empresa_y_borra_el_grupo_vacio(snapshots):
+    version = ComplianceService.huella_configuracion()
+    snapshots._guardar_filas([_fila('700000001', version, 'PRUEBA_A')])
+    assert _agregado('PRUEBA_A') == 1
+
+    snapshots._guardar_filas([_fila('700000001', version, 'PRUEBA_B')])
+    assert _agregado('PRUEBA_A') is None
+    assert _agregado('PRUEBA_B') == 1
+
+
+def test_filas_de_otra_version_no_cuentan(snapshots, monkeypatch):
+    version = ComplianceService.huella_configuracion()
+    snapshots._guardar_filas([_fila('700000002', version, 'PRUEBA_C'), _fila('700000003', version, 'PRUEBA_C')])
+    assert _agregado('PRUEBA_C') == 2
+
+    # Cambian los pesos: las filas guardadas quedan en la versión anterior
+    monkeypatch.setattr(ComplianceService, 'VERSION_MOTOR', 'prueba-otra-version')
+    nueva = ComplianceService.huella_configuracion()
+    snapshots.reconstruir_agregados()
+    assert _agregado('PRUEBA_C') is None
+
+    # Recalculada una, solo ella cuenta; reemplazar la fila vieja no resta nada
+    snapshots._guardar_filas([_fila('700000002', nueva, 'PRUEBA_C', score=80)])
+    assert _agregado('PRUEBA_C') == 1
+    assert _agregado('PRUEBA_C', 'suma_score') == 80
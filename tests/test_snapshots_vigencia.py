@@ -0,0 +1,56 @@
+"""
+Pruebas de la vigencia de los snapshots
+Caducan cuando cambia una señal que las fuentes derivaron de la fecha
+"""
+
+from datetime import date, timedelta
+
+from config import ADUANA_DIAS_ACTIVO
+from models.empresa import (
+    DatosBasicos, DatosOperacionales, DatosRegistrales, EmpresaCompleta,
+    MetadataFuentes, SeñalesAduana, SeñalesICA
+)
+from services.compliance_service import ComplianceService
+from services.snapshot_service import SIN_EXPIRACION, _valido_hasta, vigencia_entradas
+
+
+def _empresa(**señales) -> EmpresaCompleta:
+    hace_un_mes = (date.today() - timedelta(days=30)).isoformat()
+    return EmpresaCompleta(
+        datos_basicos=DatosBasicos(
+            nit='890903938', razon_social='EMPRESA PRUEBA S.A.S.', estado='ACTIVA',
+            municipio='MEDELLIN', departamento='ANTIOQUIA', actividad_principal='N/A'
+        ),
+        datos_registrales=DatosRegistrales(
+            fecha_matricula='2010-01-01', ultima_renovacion=hace_un_mes,
+            tipo_sociedad='SAS', camara='MEDELLIN'
+        ),
+        datos_operacionales=DatosOperacionales(),
+        metadata=MetadataFuentes(),
+        **señales
+    )
+
+
+def test_sin_señales_dependientes_de_la_fecha_no_caduca():
+    assert vigencia_entradas(_empresa()) == SIN_EXPIRACION
+
+
+def test_caduca_en_el_proximo_vencimiento_ica():
+    vencimiento = date.today() + timedelta(days=10)
+    empresa = _empresa(señales_ica=SeñalesICA(inscrito=True, al_dia=True, proximo_vencimiento=vencimiento.isoformat()))
+    score = ComplianceService().calcular_score(empresa)
+
+    # Antes de que caduque la renovación
+    assert _valido_hasta(empresa, score) == vencimiento.toordinal()
+
+
+def test_caduca_cuando_aduana_deja_de_estar_activa():
+    operacion = date.today() - timedelta(days=ADUANA_DIAS_ACTIVO - 5)
+    empresa = _empresa(señales_aduana=SeñalesAduana(
+        tiene_registro=True, tipo='importador', ultima_operacion=operacion.isoformat(), activo=True
+    ))
+    assert vigencia_entradas(empresa) == operacion.toordinal() + ADUANA_DIAS_ACTIVO + 1
+
+    # Inactiva ya no cambia con la fecha
+    empresa.señales_aduana.activo = False
+    assert vigencia_entradas(empresa) == SIN_EXPIRACION
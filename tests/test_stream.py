@@ -0,0 +1,59 @@
+"""
+Pruebas de la verificación progresiva (la que alimenta el stream SSE)
+Cerrarla a mitad de camino cancela las fuentes complementarias en curso
+"""
+
+import asyncio
+from contextlib import aclosing
+
+from integrations.base_integration import BaseIntegration
+from services.verificacion_service import VerificacionService
+
+
+class _FuentePrueba(BaseIntegration):
+    """Fuente complementaria que responde enseguida o nunca (hasta que la cancelen)"""
+
+    fuente_real = False
+
+    def __init__(self, nombre: str, colgada: bool):
+        self._nombre = nombre
+        self.colgada = colgada
+        self.cancelada = False
+
+    @property
+    def nombre(self) -> str:
+        return self._nombre
+
+    @property
+    def disponible(self) -> bool:
+        return True
+
+    async def consultar(self, nit):
+        if not self.colgada:
+            return {}
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelada = True
+            raise
+
+
+def test_cerrar_la_verificacion_cancela_las_complementarias(monkeypatch):
+    rapida = _FuentePrueba('PRUEBA_RAPIDA', colgada=False)
+    colgada = _FuentePrueba('PRUEBA_COLGADA', colgada=True)
+    servicio = VerificacionService()
+    monkeypatch.setattr(servicio, '_complementarias_para', lambda empresa: [rapida, colgada])
+    nit = '890903938'
+    servicio.cache.eliminar(nit)
+
+    async def consultar_y_desconectar():
+        async with aclosing(servicio.verificar_empresa_progresivo(nit, plazo_segundos=30)) as progreso:
+            async for evento, _ in progreso:
+                if evento == 'fuente':
+                    # El cliente se va con la otra consulta complementaria en curso
+                    break
+        # Unos pasos del loop para que la cancelación llegue a la consulta
+        await asyncio.sleep(0.01)
+        return colgada.cancelada
+
+    assert asyncio.run(consultar_y_desconectar())